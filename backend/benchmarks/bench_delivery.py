@@ -0,0 +1,140 @@
+# benchmarks/bench_delivery.py
+# Throughput of delivery-service's service layer (app.services.delivery_service)
+# called directly from many threads: single creates, batch creates, a storm
+# of concurrent duplicate creates, and the per-user / per-rider list
+# queries. Fails if any order ends up with more than one delivery.
+#
+#   python benchmarks/bench_delivery.py --orders 20000 -c 32 --batch-size 500
+#
+# Uses --mongo-url, an ephemeral `mongod` if one is on PATH, else mongomock.
+# mongomock serialises every operation, so run against mongod for numbers.
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_services import BACKEND_DIR, ephemeral_mongod, percentile, _mongo_for
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "delivery-service"))
+
+
+def timed(pool, fn, items):
+    """Run fn over items in the pool; returns (per-call ms, wall seconds)."""
+    def call(item):
+        start = time.perf_counter()
+        fn(item)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    latencies = list(pool.map(call, items))
+    return latencies, time.perf_counter() - start
+
+
+def report(label, count, latencies, elapsed):
+    print(f"{label:<28} {count:>7} in {elapsed:6.2f}s  {count / elapsed:>9.0f}/s"
+          f"  p50 {percentile(latencies, 50):6.2f}ms  p95 {percentile(latencies, 95):6.2f}ms")
+
+
+def run(args, mongo_url):
+    os.environ["MONGO_URL"] = f"{mongo_url or 'mongodb://localhost:27017'}/bench_delivery"
+
+    with _mongo_for(mongo_url):
+        from app.database import client, db
+        from app.indexes import apply_indexes
+        from app.services import delivery_service
+
+        client.drop_database("bench_delivery")
+        apply_indexes(db)
+        users = [f"user-{i}" for i in range(args.users)]
+        riders = [f"rider-{i}" for i in range(args.riders)]
+        problems = []
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            # 1️⃣ One create per request, as POST /delivery/create does
+            singles = [(f"single-{i}", random.choice(users)) for i in range(args.orders)]
+            latencies, elapsed = timed(pool, lambda d: delivery_service.create_delivery(*d), singles)
+            report("create (single)", len(singles), latencies, elapsed)
+
+            # 2️⃣ Outbox-sized batches
+            batched = [(f"batch-{i}", random.choice(users)) for i in range(args.orders)]
+            batches = [batched[i:i + args.batch_size] for i in range(0, len(batched), args.batch_size)]
+            latencies, elapsed = timed(pool, delivery_service.create_deliveries, batches)
+            report(f"create (batch of {args.batch_size})", len(batched), latencies, elapsed)
+
+            # 3️⃣ Every order created by several threads at once
+            dupes = [f"dupe-{i}" for i in range(args.orders // 10)]
+            attempts = [(order_id, "user-dupe") for order_id in dupes for _ in range(args.duplicates)]
+            random.shuffle(attempts)
+            outcomes = Counter()
+            ids = {}
+
+            def create_dupe(d):
+                delivery, created = delivery_service.create_delivery(*d)
+                outcomes["created" if created else "existing"] += 1
+                if ids.setdefault(d[0], delivery["delivery_id"]) != delivery["delivery_id"]:
+                    problems.append(f"{d[0]} returned two different delivery ids")
+
+            latencies, elapsed = timed(pool, create_dupe, attempts)
+            report(f"create (x{args.duplicates} duplicates)", len(attempts), latencies, elapsed)
+            if outcomes["created"] != len(dupes):
+                problems.append(f"{outcomes['created']} creates reported for {len(dupes)} orders")
+
+            # 4️⃣ Riders pick up half the orders, then the list queries
+            assigned = [order_id for order_id, _ in singles[::2]]
+            latencies, elapsed = timed(
+                pool, lambda order_id: delivery_service.assign_rider(order_id, random.choice(riders)), assigned
+            )
+            report("assign rider", len(assigned), latencies, elapsed)
+
+            pages = [random.choice(users) for _ in range(args.queries)]
+            latencies, elapsed = timed(pool, lambda u: delivery_service.get_deliveries(user_id=u, limit=20), pages)
+            report("user deliveries (page 20)", len(pages), latencies, elapsed)
+
+            pages = [random.choice(riders) for _ in range(args.queries)]
+            latencies, elapsed = timed(
+                pool, lambda r: delivery_service.get_deliveries(rider_id=r, statuses=["CREATED"], limit=20), pages
+            )
+            report("rider deliveries (page 20)", len(pages), latencies, elapsed)
+
+        duplicated = list(db.deliveries.aggregate([
+            {"$group": {"_id": "$order_id", "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gt": 1}}},
+            {"$limit": 5}
+        ]))
+        if duplicated:
+            problems.append(f"orders with more than one delivery, e.g. {[d['_id'] for d in duplicated]}")
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delivery service layer throughput benchmark")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--duplicates", type=int, default=4, help="concurrent creates per order in step 3")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--riders", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--mongo-url")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with ephemeral_mongod() as local_url:
+        mongo_url = args.mongo_url or local_url
+        print(f"Mongo: {mongo_url or 'mongomock'}")
+        problems = run(args, mongo_url)
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("One delivery per order")
+
+
+if __name__ == "__main__":
+    main()
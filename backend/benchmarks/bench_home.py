@@ -0,0 +1,99 @@
+# benchmarks/bench_home.py
+# Home-screen cold start over a slow mobile link: the app's old sequence of
+# GET /categories, /products and /cart/{user_id} (one round trip each)
+# against a single GET /home/{user_id} on bff-service, which fans out to
+# the services in parallel over pooled connections.
+#
+#   python benchmarks/bench_home.py --rtt-ms 150 --upstream-ms 8 -n 50
+#
+# The services are simulated: each upstream call takes --upstream-ms and the
+# client link adds --rtt-ms per request, so this isolates round-trip cost.
+# --slow-section makes one section miss its timeout to show partial results.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bench_services import BACKEND_DIR, percentile
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "bff-service"))
+
+import httpx  # noqa: E402
+
+from app import upstream  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routes.home import SECTION_TIMEOUTS  # noqa: E402
+
+BODIES = {
+    "/categories": [{"name": f"Category {i}"} for i in range(12)],
+    "/products": {"items": [{"product_id": f"p{i:03d}", "name": f"Product {i}"} for i in range(50)],
+                  "next_after": "WyJwMDQ5Il0="},
+    "/cart/": {"user_id": "bench", "items": [{"product_id": "p001", "quantity": 2}]},
+    "/deliveries/user/": {"items": [{"order_id": "o1", "status": "PACKED"}], "next_after": None}
+}
+
+
+def upstream_transport(args):
+    async def handler(request):
+        path = request.url.path
+        delay = args.upstream_ms / 1000
+        if args.slow_section and path.startswith(args.slow_section):
+            delay = max(SECTION_TIMEOUTS.values()) * 2
+        await asyncio.sleep(delay)
+        for prefix, body in BODIES.items():
+            if path.startswith(prefix):
+                return httpx.Response(200, json=body)
+        return httpx.Response(404)
+    return httpx.MockTransport(handler)
+
+
+async def over_link(client, rtt, path):
+    # Half the round trip out, half back
+    await asyncio.sleep(rtt / 2)
+    response = await client.get(path)
+    await asyncio.sleep(rtt / 2)
+    return response
+
+
+async def run(args):
+    upstream._client = httpx.AsyncClient(transport=upstream_transport(args))
+    rtt = args.rtt_ms / 1000
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bff") as bff:
+        direct = httpx.AsyncClient(transport=upstream_transport(args), base_url="http://services")
+
+        async def sequential():
+            for path in ("/categories", "/products", "/cart/bench"):
+                await over_link(direct, rtt, path)
+
+        async def aggregated():
+            response = await over_link(bff, rtt, "/home/bench")
+            results["errors"] = response.json()["errors"]
+
+        for label, load in (("sequential (3 calls)", sequential), ("GET /home (1 call)", aggregated)):
+            timings = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                await load()
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{label:<22} p50 {percentile(timings, 50):7.1f}ms  p95 {percentile(timings, 95):7.1f}ms")
+        await direct.aclose()
+    await upstream.close_http_client()
+    print("sections missing:", results["errors"] or "none")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Home screen aggregation benchmark")
+    parser.add_argument("--rtt-ms", type=float, default=150, help="client <-> server round trip")
+    parser.add_argument("--upstream-ms", type=float, default=8, help="latency of each service call")
+    parser.add_argument("-n", "--requests", type=int, default=30)
+    parser.add_argument("--slow-section", choices=["/cart/", "/deliveries/user/", "/products"],
+                        help="make this upstream miss its timeout")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
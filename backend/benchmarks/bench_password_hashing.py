@@ -0,0 +1,59 @@
+# benchmarks/bench_password_hashing.py
+# Login throughput (bcrypt verify) through user-service's hashing pool, for
+# an increasing number of worker processes.
+#
+#   python benchmarks/bench_password_hashing.py [--logins 200] [--rounds 12]
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "user-service"))
+
+
+def run(workers: int, logins: int, rounds: int):
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+    os.environ["HASH_WORKERS"] = str(workers)
+    os.environ["HASH_MAX_PENDING"] = str(logins)
+
+    import importlib
+    from app import hashing
+    hashing = importlib.reload(hashing)
+
+    stored = hashing.pwd_context.hash("secret")
+    hashing.start_pool()
+    # Warm the worker processes up before timing
+    list(ThreadPoolExecutor(workers).map(lambda _: hashing.verify_password("secret", stored), range(workers)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+        results = list(clients.map(lambda _: hashing.verify_password("secret", stored), range(logins)))
+    elapsed = time.perf_counter() - start
+    hashing.shutdown_pool()
+
+    assert all(valid for valid, _ in results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    print(f"bcrypt rounds={args.rounds}, logins per run={args.logins}, cores={cores}")
+    print(f"{'workers':>8} {'logins/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in counts:
+        throughput = run(workers, args.logins, args.rounds)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_repricing.py
+# The cart repricing sweep after a catalog update: every non-empty cart is
+# brought to the new catalog version in batches, one /products/bulk call and
+# one bulk_write per batch. Reports carts/s, product-service calls, and how
+# many calls a lookup per cart line would have needed instead.
+#
+#   python benchmarks/bench_repricing.py --carts 50000 --lines 8 --batch-size 500
+#
+# product-service is simulated: each call takes --product-ms plus
+# --per-id-us per product id. Uses --mongo-url, an ephemeral `mongod` if one
+# is on PATH, else mongomock (much slower per write; compare calls, not time).
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from bench_services import BACKEND_DIR, ephemeral_mongod, _mongo_for
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "cart-order-service"))
+
+NEW_VERSION = 2
+
+
+def product(i, price_bump=0.0):
+    return {
+        "product_id": f"p{i:05d}",
+        "name": f"Product {i}",
+        "price": round(10 + i % 50 + price_bump, 2),
+        "available": i % 97 != 0
+    }
+
+
+def run(args, mongo_url):
+    os.environ["MONGO_URL"] = f"{mongo_url or 'mongodb://localhost:27017'}/bench_repricing"
+    os.environ["CART_REPRICE_BATCH_SIZE"] = str(args.batch_size)
+
+    with _mongo_for(mongo_url):
+        from app.database import client, db
+        from app.indexes import apply_indexes
+        from app.services import cart_ops, cart_repricer, product_client
+
+        client.drop_database("bench_repricing")
+        apply_indexes(db)
+
+        random.seed(args.seed)
+        # A tenth of the catalog changed price in this update
+        catalog = {
+            p["product_id"]: p
+            for p in (product(i, 1.5 if i % 10 == 0 else 0.0) for i in range(args.products))
+        }
+
+        carts = []
+        for u in range(args.carts):
+            items = [
+                {**product(i), "quantity": random.randint(1, 3)}
+                for i in random.sample(range(args.products), args.lines)
+            ]
+            carts.append({"user_id": f"user-{u}", "items": items, "priced_version": NEW_VERSION - 1,
+                          **cart_ops.cart_totals(items)})
+            if len(carts) == 5000:
+                db.carts.insert_many(carts)
+                carts = []
+        if carts:
+            db.carts.insert_many(carts)
+
+        calls = {"requests": 0, "ids": 0}
+
+        def fetch_bulk(product_ids):
+            calls["requests"] += 1
+            calls["ids"] += len(product_ids)
+            time.sleep(args.product_ms / 1000 + len(product_ids) * args.per_id_us / 1e6)
+            found = [catalog[i] for i in product_ids if i in catalog]
+            return product_client.stamp_products(found, {product_client.CATALOG_VERSION_HEADER: str(NEW_VERSION)})
+
+        product_client._fetch_bulk = fetch_bulk
+
+        start = time.perf_counter()
+        repriced = cart_repricer.CartRepricer().sweep(NEW_VERSION)
+        elapsed = time.perf_counter() - start
+
+        stale = db.carts.count_documents(cart_repricer.stale_carts_filter(NEW_VERSION))
+        changed = db.carts.count_documents({"items.previous_price": {"$exists": True}})
+        lines = args.carts * args.lines
+        per_line_seconds = lines * args.product_ms / 1000
+
+        print(f"{args.carts} carts x {args.lines} lines, {args.products} products, batch {args.batch_size}")
+        print(f"sweep           {elapsed:8.2f}s  {repriced / elapsed:9.0f} carts/s  "
+              f"{calls['requests']} product calls ({calls['ids']} ids)")
+        print(f"per-line calls  >= {per_line_seconds:6.0f}s  {lines} product calls")
+        print(f"repriced {repriced}, with a price change {changed}, still stale {stale}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cart repricing sweep benchmark")
+    parser.add_argument("--carts", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=6)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--product-ms", type=float, default=3, help="round trip of one product-service call")
+    parser.add_argument("--per-id-us", type=float, default=2, help="product-service cost per id looked up")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mongo-url")
+    args = parser.parse_args()
+
+    with ephemeral_mongod() as local_url:
+        run(args, args.mongo_url or local_url)
+
+
+if __name__ == "__main__":
+    main()
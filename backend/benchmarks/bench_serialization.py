@@ -0,0 +1,97 @@
+# benchmarks/bench_serialization.py
+# Cost of turning a catalog of product documents into a JSON response body,
+# the way each code path in product-service would do it:
+#
+#   response_model   FastAPI's default: validate into Product, dump to
+#                    JSON-able python, json.dumps (what GET /products did)
+#   pydantic json    validate, then pydantic's own dump_json
+#   jsonable_encoder walk the dicts, then json.dumps (JSONResponse)
+#   orjson           app.fast_json.encode on the Mongo dicts as-is
+#   pre-encoded      a cached encode() blob, as GET /products serves now
+#
+#   python benchmarks/bench_serialization.py --products 10000 --repeat 20
+#
+# Pure CPU: no Mongo and no HTTP, so numbers are per-core ceilings.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+from bench_services import BACKEND_DIR
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "product-service"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.fast_json import encode  # noqa: E402
+from app.schemas import Product  # noqa: E402
+
+CATEGORIES = ["Dairy", "Bakery", "Fruits", "Vegetables", "Beverages", "Snacks", "Household"]
+
+
+def catalog(size):
+    return [
+        {
+            "product_id": f"p{i:06d}",
+            "name": f"Product {i}",
+            "description": f"Description of product {i} " * 3,
+            "price": round(random.uniform(5, 500), 2),
+            "category": random.choice(CATEGORIES),
+            "image_url": f"https://images.example.com/p{i:06d}.jpg?w=400",
+            "available": random.random() > 0.1
+        }
+        for i in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog response serialization benchmark")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    products = catalog(args.products)
+    adapter = TypeAdapter(List[Product])
+    blob = encode(products)
+
+    paths = {
+        "response_model": lambda: json.dumps(
+            adapter.dump_python(adapter.validate_python(products), mode="json")
+        ).encode(),
+        "pydantic json": lambda: adapter.dump_json(adapter.validate_python(products)),
+        "jsonable_encoder": lambda: json.dumps(jsonable_encoder(products)).encode(),
+        "orjson": lambda: encode(products),
+        "pre-encoded": lambda: blob
+    }
+
+    # Every path must produce the same document
+    expected = json.loads(paths["response_model"]())
+    for label, render in paths.items():
+        if json.loads(render()) != expected:
+            print(f"FAIL {label} renders a different document")
+            sys.exit(1)
+
+    print(f"{args.products} products, {len(blob) / 1024:.0f} KB of JSON, best of {args.repeat}")
+    baseline = None
+    for label, render in paths.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            render()
+            timings.append((time.perf_counter() - start) * 1000)
+        best = min(timings)
+        baseline = baseline or best
+        speedup = f"{baseline / best:8.1f}x" if best >= 0.01 else "    (cache hit)"
+        print(f"{label:<18} best {best:8.2f}ms  median {statistics.median(timings):8.2f}ms  {speedup}")
+
+
+if __name__ == "__main__":
+    main()
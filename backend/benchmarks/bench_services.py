@@ -0,0 +1,447 @@
+# benchmarks/bench_services.py
+# Load-test harness for the four services. Each scenario boots one FastAPI
+# app in-process (in its own subprocess, since every service is a package
+# called `app`) against a local Mongo stand-in, stubs the calls it makes to
+# other services, and drives it with a pool of client threads.
+#
+#   python benchmarks/bench_services.py                       # all scenarios
+#   python benchmarks/bench_services.py -s checkout -n 500 -c 8
+#   python benchmarks/bench_services.py --save baseline.json
+#   python benchmarks/bench_services.py --compare baseline.json
+#
+# Mongo stand-in, in order of preference: --mongo-url, an ephemeral `mongod`
+# if one is on PATH, else mongomock. mongomock lacks the aggregation stages
+# and update options cart-order-service uses, so the cart and checkout
+# scenarios only run on a real mongod. A scenario whose service never turns
+# ready fails the run, and --compare counts more errors as a regression.
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# --------------------
+# Measurement
+# --------------------
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Per-endpoint latency samples, error counts and first/last timestamps."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.window = {}
+        self._lock = Lock()
+
+    def call(self, label, fn, expect=(200, 201)):
+        start = time.perf_counter()
+        try:
+            response = fn()
+            ok = response.status_code in expect
+        except Exception:
+            response, ok = None, False
+        end = time.perf_counter()
+
+        with self._lock:
+            self.samples[label].append((end - start) * 1000)
+            if not ok:
+                self.errors[label] += 1
+            first, last = self.window.get(label, (start, end))
+            self.window[label] = (min(first, start), max(last, end))
+        return response
+
+    def summary(self):
+        result = {}
+        for label, samples in self.samples.items():
+            first, last = self.window[label]
+            result[label] = {
+                "count": len(samples),
+                "errors": self.errors[label],
+                "throughput_rps": round(len(samples) / max(last - first, 1e-9), 1),
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+            }
+        return result
+
+
+# --------------------
+# Scenarios
+# --------------------
+# Each scenario names the service it boots and provides setup(client, ctx)
+# and step(client, recorder, i, ctx). Steps run `requests` times across
+# `concurrency` threads.
+
+SKUS = [f"sku-{i:05d}" for i in range(50)]
+# Catalog version the stubbed product-service answers at
+CATALOG_VERSION = 1
+
+
+def _fake_product(product_id):
+    return {
+        "product_id": product_id,
+        "name": f"Product {product_id}",
+        "description": "Benchmark product",
+        "price": 10.0 + int(product_id.rsplit("-", 1)[-1]) % 90,
+        "category": f"Category {int(product_id.rsplit('-', 1)[-1]) % 8}",
+        "image_url": "https://example.com/p.png",
+        "available": True
+    }
+
+
+def _stub_cart_order_calls():
+    """Answer product lookups from memory, grant every stock hold and swallow outbox events."""
+    from app.services import product_client, async_product_client, delivery_outbox
+    from app.services import order_service, async_order_service, cart_repricer
+
+    def fetch_bulk(product_ids):
+        return product_client.stamp_products(
+            [_fake_product(pid) for pid in product_ids if pid.startswith("sku-")],
+            {product_client.CATALOG_VERSION_HEADER: str(CATALOG_VERSION)}
+        )
+
+    async def fetch_bulk_async(product_ids):
+        return fetch_bulk(product_ids)
+
+    async def catalog_version_async():
+        return CATALOG_VERSION
+
+    async def stock_call_async(*args):
+        return None
+
+    product_client._fetch_bulk = fetch_bulk
+    async_product_client._fetch_bulk = fetch_bulk_async
+    for module in (product_client, order_service, cart_repricer):
+        module.get_catalog_version = lambda: CATALOG_VERSION
+    for module in (async_product_client, async_order_service):
+        module.get_catalog_version = catalog_version_async
+    order_service.reserve_stock = order_service.release_stock = lambda *args: None
+    async_order_service.reserve_stock = async_order_service.release_stock = stock_call_async
+    delivery_outbox.OutboxDispatcher._send_chunk = lambda self, events: None
+
+
+def catalog_setup(client, ctx):
+    from app.database import db
+    size = ctx["catalog_size"]
+    db.products.insert_many([_fake_product(f"sku-{i:05d}") for i in range(size)])
+    ctx["ids"] = [f"sku-{i:05d}" for i in range(size)]
+
+
+def catalog_step(client, rec, i, ctx):
+    ids = ctx["ids"]
+    rec.call("GET /products", lambda: client.get("/products"))
+    rec.call("GET /categories", lambda: client.get("/categories"))
+    product_id = random.choice(ids)
+    rec.call("GET /products/{product_id}", lambda: client.get(f"/products/{product_id}"))
+    batch = random.sample(ids, min(10, len(ids)))
+    rec.call("POST /products/bulk", lambda: client.post("/products/bulk", json={"product_ids": batch}))
+
+
+def cart_setup(client, ctx):
+    _stub_cart_order_calls()
+
+
+def cart_step(client, rec, i, ctx):
+    user_id = f"cart-user-{i % ctx['users']}"
+    first, second = random.sample(SKUS, 2)
+    for product_id in (first, second):
+        rec.call("POST /cart/add", lambda: client.post(
+            "/cart/add", json={"user_id": user_id, "product_id": product_id, "quantity": 2}
+        ))
+    rec.call("GET /cart/{user_id}", lambda: client.get(f"/cart/{user_id}"))
+    rec.call("POST /cart/remove", lambda: client.post(
+        "/cart/remove", json={"user_id": user_id, "product_id": first, "quantity": 1}
+    ))
+
+
+def checkout_setup(client, ctx):
+    _stub_cart_order_calls()
+
+
+def checkout_step(client, rec, i, ctx):
+    from app.database import db
+    user_id = f"checkout-user-{i}"
+    items = [
+        {"product_id": p["product_id"], "name": p["name"], "price": p["price"], "quantity": 1}
+        for p in map(_fake_product, random.sample(SKUS, 3))
+    ]
+    db.carts.insert_one({"user_id": user_id, "items": items, "updated_at": datetime.utcnow()})
+    rec.call("POST /order/create", lambda: client.post(
+        "/order/create", json={"user_id": user_id, "idempotency_key": f"bench-{i}"}
+    ))
+    rec.call("GET /order/{user_id}", lambda: client.get(f"/order/{user_id}"))
+
+
+def delivery_setup(client, ctx):
+    pass
+
+
+def delivery_step(client, rec, i, ctx):
+    order_id = f"bench-order-{i}"
+    rec.call("POST /delivery/create", lambda: client.post(
+        "/delivery/create", json={"order_id": order_id, "user_id": f"user-{i % 100}"}
+    ))
+    for _ in range(ctx["polls"]):
+        rec.call("GET /delivery/{order_id}/status", lambda: client.get(f"/delivery/{order_id}/status"))
+    for status in ("PLACED", "PACKED"):
+        rec.call("POST /delivery/{order_id}/update-status", lambda: client.post(
+            f"/delivery/{order_id}/update-status", json={"status": status}
+        ))
+
+
+def login_setup(client, ctx):
+    for n in range(ctx["users"]):
+        client.post("/register", json={
+            "name": f"User {n}", "email": f"user{n}@bench.example.com",
+            "password": "bench-password", "otp": "1234"
+        })
+
+
+def login_step(client, rec, i, ctx):
+    email = f"user{i % ctx['users']}@bench.example.com"
+    response = rec.call("POST /login", lambda: client.post(
+        "/login", json={"email": email, "password": "bench-password"}
+    ))
+    if response is not None and response.status_code == 200:
+        token = response.json()["access_token"]
+        rec.call("GET /profile", lambda: client.get(
+            "/profile", headers={"Authorization": f"Bearer {token}"}
+        ))
+
+
+# Every request would fail under mongomock
+NEEDS_MONGOD = {"cart", "checkout"}
+
+SCENARIOS = {
+    "catalog": ("product-service", catalog_setup, catalog_step),
+    "cart": ("cart-order-service", cart_setup, cart_step),
+    "checkout": ("cart-order-service", checkout_setup, checkout_step),
+    "delivery": ("delivery-service", delivery_setup, delivery_step),
+    "login": ("user-service", login_setup, login_step),
+}
+
+
+# --------------------
+# Mongo stand-ins
+# --------------------
+
+READY_TIMEOUT_SECONDS = 30
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def ephemeral_mongod():
+    """Start a throwaway mongod if one is installed; yields its URL or None."""
+    mongod = shutil.which("mongod")
+    if not mongod:
+        yield None
+        return
+
+    dbpath = tempfile.mkdtemp(prefix="bench-mongo-")
+    port = _free_port()
+    proc = subprocess.Popen(
+        [mongod, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield f"mongodb://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(dbpath, ignore_errors=True)
+
+
+@contextmanager
+def _mongo_for(mongo_url):
+    if mongo_url:
+        yield
+        return
+    import mongomock
+    with mongomock.patch(servers=(("localhost", 27017),)):
+        yield
+
+
+def _run_scenario(name, opts):
+    """Runs in a fresh interpreter so each service's `app` package is isolated."""
+    service, setup, step = SCENARIOS[name]
+    random.seed(opts["seed"])
+    base_url = opts["mongo_url"] or "mongodb://localhost:27017"
+    os.environ["MONGO_URL"] = f"{base_url}/bench_{name}"
+    os.environ.update(opts["env"])
+    sys.path.insert(0, os.path.join(BACKEND_DIR, service))
+
+    with _mongo_for(opts["mongo_url"]):
+        from pymongo import MongoClient
+        MongoClient(os.environ["MONGO_URL"]).drop_database(f"bench_{name}")
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        ctx = dict(opts["ctx"])
+        recorder = Recorder()
+        with TestClient(app) as client:
+            # Indexes and seeds are applied in the background after startup
+            deadline = time.time() + READY_TIMEOUT_SECONDS
+            ready = client.get("/readyz")
+            while ready.status_code != 200:
+                if time.time() > deadline:
+                    raise RuntimeError(
+                        f"{service} not ready after {READY_TIMEOUT_SECONDS}s: {ready.text}"
+                    )
+                time.sleep(0.05)
+                ready = client.get("/readyz")
+            setup(client, ctx)
+            for i in range(min(opts["warmup"], opts["requests"])):
+                step(client, Recorder(), -1 - i, ctx)
+            with ThreadPoolExecutor(max_workers=opts["concurrency"]) as pool:
+                list(pool.map(lambda i: step(client, recorder, i, ctx), range(opts["requests"])))
+        return recorder.summary()
+
+
+# --------------------
+# Reporting
+# --------------------
+
+def print_results(results):
+    print(f"{'scenario':<10} {'endpoint':<40} {'n':>6} {'err':>4} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for scenario, endpoints in results.items():
+        for label, r in endpoints.items():
+            print(
+                f"{scenario:<10} {label:<40} {r['count']:>6} {r['errors']:>4} {r['throughput_rps']:>9.1f}"
+                f" {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+            )
+
+
+def error_rate(result):
+    return result["errors"] / result["count"] if result["count"] else 0.0
+
+
+def compare(results, baseline, threshold):
+    """
+    Endpoints with any more errors, or whose p95 grew or throughput fell by
+    more than `threshold`, and baseline endpoints this run did not cover.
+    """
+    regressions = []
+    for scenario, endpoints in baseline.items():
+        for label in endpoints:
+            if label not in results.get(scenario, {}):
+                regressions.append(f"{scenario} {label}: not measured in this run")
+    for scenario, endpoints in results.items():
+        for label, current in endpoints.items():
+            before = baseline.get(scenario, {}).get(label)
+            if not before:
+                continue
+            if current["errors"] > before["errors"] or error_rate(current) > error_rate(before):
+                regressions.append(
+                    f"{scenario} {label}: errors {before['errors']}/{before['count']}"
+                    f" -> {current['errors']}/{current['count']}"
+                )
+            if before["p95_ms"] and current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"{scenario} {label}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+            if current["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"{scenario} {label}: {before['throughput_rps']} -> {current['throughput_rps']} req/s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run; repeat for several (default: all)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="iterations per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="client threads")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--catalog-size", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=5, help="status polls per delivery")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--async-mode", action="store_true", help="CART_ORDER_ASYNC_MODE=true")
+    parser.add_argument("--mongo-url", help="use this Mongo instead of a local stand-in")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative regression")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    env = {
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "CHECKOUT_USE_TRANSACTIONS": "true" if args.mongo_url else "false",
+        "CART_ORDER_ASYNC_MODE": "true" if args.async_mode else "false",
+    }
+    ctx = {"users": args.users, "catalog_size": args.catalog_size, "polls": args.polls}
+
+    results = {}
+    with ephemeral_mongod() as local_url:
+        mongo_url = args.mongo_url or local_url
+        print(f"Mongo: {mongo_url or 'mongomock'}")
+        scenarios = args.scenario or list(SCENARIOS)
+        if not mongo_url:
+            if NEEDS_MONGOD & set(args.scenario or ()):
+                parser.error(f"{', '.join(sorted(NEEDS_MONGOD))} need a mongod: install one or pass --mongo-url")
+            scenarios = [name for name in scenarios if name not in NEEDS_MONGOD]
+            print(f"Skipping {', '.join(sorted(NEEDS_MONGOD))}: no mongod")
+        spawn = multiprocessing.get_context("spawn")
+        for name in scenarios:
+            opts = {
+                "mongo_url": mongo_url, "env": env, "ctx": ctx, "requests": args.requests,
+                "concurrency": args.concurrency, "warmup": args.warmup, "seed": args.seed,
+            }
+            # Not multiprocessing.Pool: its daemonic workers can't start
+            # user-service's hashing pool
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                results[name] = pool.submit(_run_scenario, name, opts).result()
+
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
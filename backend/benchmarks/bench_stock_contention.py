@@ -0,0 +1,126 @@
+# benchmarks/bench_stock_contention.py
+# Many concurrent checkouts against a handful of hot SKUs, straight through
+# product-service's stock ledger (app.stock). Reports reserve latency and
+# throughput, then checks the ledger: no SKU below zero, no units left held,
+# and units sold == units taken off the shelf.
+#
+#   python benchmarks/bench_stock_contention.py --checkouts 5000 -c 64 --skus 3 --stock 2000
+#
+# Uses --mongo-url, an ephemeral `mongod` if one is on PATH, else mongomock.
+# mongomock serialises every operation, so only the correctness check means
+# anything there; run against mongod for contention numbers.
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from bench_services import BACKEND_DIR, ephemeral_mongod, percentile, _mongo_for
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "product-service"))
+
+
+def run(args, mongo_url):
+    os.environ["MONGO_URL"] = f"{mongo_url or 'mongodb://localhost:27017'}/bench_stock"
+
+    with _mongo_for(mongo_url):
+        from app.database import client, db
+        from app.indexes import apply_indexes
+        from app import stock
+
+        client.drop_database("bench_stock")
+        apply_indexes(db)
+        skus = [f"hot-{i}" for i in range(args.skus)]
+        stock.set_stock_levels([{"product_id": sku, "on_hand": args.stock} for sku in skus])
+
+        latencies = []
+        outcomes = Counter()
+        sold = Counter()
+        lock = Lock()
+
+        def checkout(i):
+            lines = [
+                {"product_id": sku, "quantity": random.randint(1, args.max_quantity)}
+                for sku in random.sample(skus, random.randint(1, min(args.max_lines, len(skus))))
+            ]
+            reservation_id = uuid.uuid4().hex
+            start = time.perf_counter()
+            try:
+                stock.reserve(reservation_id, lines)
+                outcome = "reserved"
+            except stock.InsufficientStock:
+                outcome = "sold_out"
+            elapsed = (time.perf_counter() - start) * 1000
+
+            if outcome == "reserved":
+                if random.random() < args.abandon_rate:
+                    stock.release([reservation_id])
+                    outcome = "released"
+                else:
+                    stock.commit([reservation_id])
+                    outcome = "committed"
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+                if outcome == "committed":
+                    for line in lines:
+                        sold[line["product_id"]] += line["quantity"]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(checkout, range(args.checkouts)))
+        elapsed = time.perf_counter() - start
+
+        print(f"{args.checkouts} checkouts, {args.concurrency} threads, {args.skus} SKUs x {args.stock} units")
+        print(f"throughput {args.checkouts / elapsed:.1f} checkouts/s")
+        print(f"reserve p50 {percentile(latencies, 50):.2f}ms  p95 {percentile(latencies, 95):.2f}ms"
+              f"  p99 {percentile(latencies, 99):.2f}ms")
+        print("outcomes", dict(outcomes))
+
+        problems = []
+        for sku in skus:
+            level = db.stock.find_one({"product_id": sku})
+            taken = args.stock - level["quantity"]
+            print(f"{sku}: sold {sold[sku]}, left {level['quantity']}, reserved {level['reserved']}")
+            if level["quantity"] < 0:
+                problems.append(f"{sku} oversold by {-level['quantity']}")
+            if level["reserved"] or level.get("holds"):
+                problems.append(f"{sku} still has {level['reserved']} units held")
+            if taken != sold[sku]:
+                problems.append(f"{sku}: {taken} units left the shelf but {sold[sku]} were sold")
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock reservation contention benchmark")
+    parser.add_argument("--checkouts", type=int, default=2000)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--skus", type=int, default=3, help="number of hot SKUs")
+    parser.add_argument("--stock", type=int, default=1000, help="units per SKU")
+    parser.add_argument("--max-lines", type=int, default=3)
+    parser.add_argument("--max-quantity", type=int, default=2)
+    parser.add_argument("--abandon-rate", type=float, default=0.1, help="share of reservations released")
+    parser.add_argument("--mongo-url")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with ephemeral_mongod() as local_url:
+        mongo_url = args.mongo_url or local_url
+        print(f"Mongo: {mongo_url or 'mongomock'}")
+        problems = run(args, mongo_url)
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("Ledger consistent: no oversell, no stranded holds")
+
+
+if __name__ == "__main__":
+    main()
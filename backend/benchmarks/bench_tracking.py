@@ -0,0 +1,165 @@
+# benchmarks/bench_tracking.py
+# Holds many idle GET /delivery/{order_id}/events streams open against a
+# real uvicorn delivery-service, then moves every delivery one step and
+# measures how long the push takes to reach each stream. Reports server
+# memory per open stream and checks every stream got every status and
+# was unregistered once closed.
+#
+#   python benchmarks/bench_tracking.py --streams 10000 --orders 2000
+#
+# Uses --mongo-url, an ephemeral `mongod` if one is on PATH, else mongomock.
+# Each stream is one socket on both sides, so raise `ulimit -n` first.
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.request
+
+from bench_services import BACKEND_DIR, ephemeral_mongod, percentile, _free_port, _mongo_for
+
+STEPS = ["PLACED", "PACKED"]
+# What the app's tracking screen used to do instead
+POLL_SECONDS = 10
+
+
+def _serve(port, mongo_url):
+    os.environ["MONGO_URL"] = f"{mongo_url or 'mongodb://localhost:27017'}/bench_tracking"
+    sys.path.insert(0, os.path.join(BACKEND_DIR, "delivery-service"))
+    with _mongo_for(mongo_url):
+        import uvicorn
+        from pymongo import MongoClient
+        MongoClient(os.environ["MONGO_URL"]).drop_database("bench_tracking")
+        from app.main import app
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def _call(base_url, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return int(f.read().split("VmRSS:")[1].split()[0]) / 1024
+    except (OSError, IndexError):
+        return None
+
+
+async def _watch(port, order_id, opened, received):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /delivery/{order_id}/events HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    seen = b""
+    waiting = [s.encode() for s in ["CREATED"] + STEPS]
+    while waiting:
+        chunk = await reader.read(4096)
+        if not chunk:
+            break
+        seen += chunk
+        while waiting and waiting[0] in seen:
+            status = waiting.pop(0).decode()
+            if status == "CREATED":
+                opened.append(time.perf_counter())
+            else:
+                received[status].append(time.perf_counter())
+    writer.close()
+    return not waiting
+
+
+async def run(args, port, server_pid):
+    base_url = f"http://127.0.0.1:{port}"
+    loop = asyncio.get_running_loop()
+    call = lambda path, body=None: loop.run_in_executor(None, _call, base_url, path, body)
+
+    order_ids = [f"track-{i}" for i in range(args.orders)]
+    for i in range(0, len(order_ids), 500):
+        await call("/delivery/batch-create", {"deliveries": [
+            {"order_id": order_id, "user_id": "bench"} for order_id in order_ids[i:i + 500]
+        ]})
+    idle_rss = _rss_mb(server_pid)
+
+    opened = []
+    received = {status: [] for status in STEPS}
+    start = time.perf_counter()
+    streams = []
+    for i in range(args.streams):
+        streams.append(asyncio.create_task(_watch(port, order_ids[i % args.orders], opened, received)))
+        if i % 200 == 199:
+            await asyncio.sleep(0.01)
+    while len(opened) < args.streams:
+        await asyncio.sleep(0.1)
+    print(f"opened {args.streams} streams on {args.orders} orders in {time.perf_counter() - start:.1f}s")
+    print("hub", await call("/tracking/stats"))
+
+    rss = _rss_mb(server_pid)
+    if rss is not None and idle_rss is not None:
+        print(f"server RSS {rss:.0f} MB, {(rss - idle_rss) * 1024 / args.streams:.1f} KB per stream")
+    print(f"polling every {POLL_SECONDS}s instead would be {args.streams / POLL_SECONDS:.0f} req/s")
+
+    for status in STEPS:
+        sent = time.perf_counter()
+        for i in range(0, len(order_ids), 500):
+            await call("/delivery/batch-update-status", {"updates": [
+                {"order_id": order_id, "status": status} for order_id in order_ids[i:i + 500]
+            ]})
+        while len(received[status]) < args.streams and time.perf_counter() - sent < 60:
+            await asyncio.sleep(0.05)
+        lags = [(t - sent) * 1000 for t in received[status]]
+        print(f"{status}: pushed to {len(lags)} streams, p50 {percentile(lags, 50):.0f}ms"
+              f"  p95 {percentile(lags, 95):.0f}ms  max {max(lags, default=0):.0f}ms")
+
+    complete = sum(await asyncio.gather(*streams))
+    await asyncio.sleep(0.5)
+    stats = await call("/tracking/stats")
+    problems = []
+    if complete != args.streams:
+        problems.append(f"{args.streams - complete} streams missed a status")
+    if stats["subscribers"]:
+        problems.append(f"{stats['subscribers']} closed streams still registered")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delivery tracking stream benchmark")
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--mongo-url")
+    args = parser.parse_args()
+
+    with ephemeral_mongod() as local_url:
+        mongo_url = args.mongo_url or local_url
+        print(f"Mongo: {mongo_url or 'mongomock'}")
+        port = _free_port()
+        server = multiprocessing.get_context("spawn").Process(target=_serve, args=(port, mongo_url))
+        server.start()
+        try:
+            deadline = time.time() + 30
+            while True:
+                try:
+                    _call(f"http://127.0.0.1:{port}", "/readyz")
+                    break
+                except OSError:
+                    if time.time() > deadline:
+                        raise
+                    time.sleep(0.2)
+            problems = asyncio.run(run(args, port, server.pid))
+        finally:
+            server.terminate()
+            server.join()
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("Every stream received every status")
+
+
+if __name__ == "__main__":
+    main()
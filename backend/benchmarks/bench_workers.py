@@ -0,0 +1,145 @@
+# benchmarks/bench_workers.py
+# Throughput of one service under its production entry point
+# (`python -m app.server`) as the worker count grows. Each run boots the
+# server with WEB_CONCURRENCY workers, drives it from several client
+# processes over keep-alive connections for a fixed time, then stops it
+# with SIGTERM.
+#
+#   python benchmarks/bench_workers.py --workers 1,2,4,8 --seconds 15
+#   python benchmarks/bench_workers.py --service delivery-service --path /deliveries?limit=20
+#
+# Uses --mongo-url, an ephemeral `mongod` if one is on PATH, else mongomock
+# (every worker then gets its own copy of the data). Scaling stops at the
+# number of CPUs this machine has, so run it on the size of box you deploy.
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench_services import BACKEND_DIR, ephemeral_mongod, percentile, _free_port, _mongo_for
+
+DEFAULT_PATHS = {
+    "product-service": ["/products/search?q=mil", "/products/p001", "/categories"],
+    "delivery-service": ["/deliveries?limit=20"],
+    "cart-order-service": ["/cart/bench-user"],
+    "user-service": ["/healthz"],
+}
+
+
+def _serve(service, port, workers, mongo_url):
+    os.environ.update({
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{port}",
+        "MONGO_URL": f"{mongo_url or 'mongodb://localhost:27017'}/bench_workers",
+    })
+    sys.path.insert(0, os.path.join(BACKEND_DIR, service))
+    with _mongo_for(mongo_url):
+        from app.server import Server, options
+        Server(options()).run()
+
+
+def _get(port, path):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, body
+
+
+def _drive(port, paths, seconds):
+    """One client process: back-to-back requests on one keep-alive connection."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies, errors, i = [], 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", paths[i % len(paths)])
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+    connection.close()
+    return latencies, errors
+
+
+def run(args, workers, mongo_url):
+    port = _free_port()
+    server = multiprocessing.get_context("spawn").Process(
+        target=_serve, args=(args.service, port, workers, mongo_url)
+    )
+    server.start()
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                if _get(port, "/readyz")[0] == 200:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError(f"{args.service} did not become ready")
+            time.sleep(0.2)
+
+        with ProcessPoolExecutor(max_workers=args.clients) as pool:
+            # Warm every worker's caches before measuring
+            list(pool.map(_drive, [port] * args.clients, [args.path] * args.clients, [1] * args.clients))
+            runs = list(pool.map(
+                _drive, [port] * args.clients, [args.path] * args.clients, [args.seconds] * args.clients
+            ))
+    finally:
+        # SIGTERM: the master drains its workers
+        server.terminate()
+        server.join(timeout=60)
+        if server.is_alive():
+            server.kill()
+
+    latencies = [ms for run_latencies, _ in runs for ms in run_latencies]
+    return {
+        "rps": len(latencies) / args.seconds,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "errors": sum(errors for _, errors in runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput by worker count")
+    parser.add_argument("--service", default="product-service", choices=sorted(DEFAULT_PATHS))
+    parser.add_argument("--path", action="append", help="GET path to load; repeatable")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--clients", type=int, help="client processes (default 4 per worker of the largest run)")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mongo-url")
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS[args.service]
+    counts = [int(n) for n in args.workers.split(",")]
+    args.clients = args.clients or 4 * max(counts)
+
+    print(f"{args.service} {args.path}, {args.clients} client processes, {os.cpu_count()} CPUs")
+    results = {}
+    with ephemeral_mongod() as local_url:
+        mongo_url = args.mongo_url or local_url
+        print(f"Mongo: {mongo_url or 'mongomock'}")
+        for workers in counts:
+            results[workers] = result = run(args, workers, mongo_url)
+            # Perfect scaling: the first run's throughput per worker, times workers
+            base = results[counts[0]]["rps"] * workers / counts[0]
+            print(f"{workers:>3} workers  {result['rps']:>9.0f} req/s  p50 {result['p50']:6.2f}ms"
+                  f"  p95 {result['p95']:6.2f}ms  errors {result['errors']}"
+                  f"  scaling {result['rps'] / base:5.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# app/fast_json.py
+# Fast JSON responses. The home page is assembled from other services'
+# JSON responses, already plain lists and dicts, so it goes straight to
+# orjson instead of through jsonable_encoder. Routes opt in by returning
+# FastJSONResponse.
+
+import orjson
+from fastapi.responses import Response
+
+
+def _default(value):
+    # ObjectId, Decimal128 and the like
+    return str(value)
+
+
+def encode(content) -> bytes:
+    """JSON bytes; datetimes come out in the same ISO format FastAPI uses."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        # Pre-encoded bodies are sent untouched
+        if isinstance(content, bytes):
+            return content
+        return encode(content)
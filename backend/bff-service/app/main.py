@@ -0,0 +1,42 @@
+# app/main.py
+# Backend-for-frontend: aggregates reads from the other services so the
+# app can load a screen in one round trip.
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from app.observability import instrument
+from app.routes import home
+from app.upstream import close_http_client
+
+app = FastAPI(title="BFF Service")
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+instrument(app)
+
+# Allow CORS for local testing (Flutter frontend)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"]
+)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_http_client()
+
+
+app.include_router(home.router, tags=["Home"])
+
+
+# Nothing to wait for: upstream failures are reported per section
+@app.get("/healthz", include_in_schema=False)
+@app.get("/readyz", include_in_schema=False)
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/")
+def root():
+    return {"message": "BFF Service Running"}
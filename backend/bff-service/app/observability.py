@@ -0,0 +1,185 @@
+# app/observability.py
+# Metrics, structured logging and an optional sampling profiler. The same
+# module ships with every service, minus the Mongo command metrics here:
+# the BFF has no database. Call instrument(app) in main.py.
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from fastapi import Response
+from fastapi.responses import PlainTextResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+SERVICE_NAME = os.getenv("SERVICE_NAME", "bff-service")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+# Set by app.server: each gunicorn worker writes its metrics to files here
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+# --------------------
+# Structured logging
+# --------------------
+
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "service": SERVICE_NAME,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _configure_logging():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger("app")
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+
+_configure_logging()
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+# --------------------
+# Metrics
+# --------------------
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum")
+OUTBOUND_LATENCY = Histogram(
+    "outbound_request_duration_seconds", "Latency of calls to other services",
+    ["target", "outcome"]
+)
+
+
+@contextmanager
+def observe_outbound(target: str):
+    """Time a call to another service: `with observe_outbound("product-service"):`"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_LATENCY.labels(target, outcome).observe(time.perf_counter() - start)
+
+
+# --------------------
+# Sampling profiler
+# --------------------
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+
+    def run(self, seconds: float) -> Counter:
+        stacks = Counter()
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = traceback.extract_stack(frame)
+                stacks[";".join(f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})" for f in stack)] += 1
+            time.sleep(self.interval)
+        return stacks
+
+
+# --------------------
+# FastAPI wiring
+# --------------------
+
+class RequestMetrics:
+    """
+    Times each request up to its response headers. Plain ASGI rather than
+    @app.middleware("http"), which adds a task group and memory streams to
+    every request for as long as its response streams.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        state = {"status": 500, "recorded": False}
+
+        def record():
+            if state["recorded"]:
+                return
+            state["recorded"] = True
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], route.path if route else "unmatched", str(state["status"])
+            ).observe(time.perf_counter() - start)
+            REQUESTS_IN_FLIGHT.dec()
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                record()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            record()
+
+
+def metrics_registry():
+    """Every worker's metrics when running under app.server, else this process's."""
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def instrument(app):
+    """Add request metrics middleware, /metrics and (if enabled) /debug/profile."""
+
+    app.add_middleware(RequestMetrics)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+    if PROFILER_ENABLED:
+        @app.get("/debug/profile", include_in_schema=False)
+        def profile(seconds: float = 5, interval_ms: float = 5):
+            """Collapsed stacks (flamegraph.pl / speedscope input) over `seconds`."""
+            stacks = SamplingProfiler(interval_ms / 1000).run(min(seconds, 60))
+            body = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+            return PlainTextResponse(body)
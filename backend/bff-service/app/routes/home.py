@@ -0,0 +1,90 @@
+import asyncio
+import os
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.fast_json import FastJSONResponse
+from app.observability import get_logger
+from app.upstream import (
+    CART_ORDER_SERVICE_URL, DELIVERY_SERVICE_URL, PRODUCT_SERVICE_URL, UpstreamError, get_json
+)
+
+log = get_logger(__name__)
+
+router = APIRouter()
+
+HOME_PAGE_SIZE = int(os.getenv("HOME_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 500
+HOME_DELIVERY_LIMIT = int(os.getenv("HOME_DELIVERY_LIMIT", "10"))
+# Every delivery status except DELIVERED
+ACTIVE_DELIVERY_STATUSES = ["CREATED", "PLACED", "PACKED", "OUT_FOR_DELIVERY"]
+
+SECTIONS = ("categories", "products", "cart", "deliveries")
+_DEFAULT_TIMEOUT = float(os.getenv("HOME_SECTION_TIMEOUT_SECONDS", "1.5"))
+# e.g. HOME_CART_TIMEOUT_SECONDS=0.5 to give up on a slow cart sooner
+SECTION_TIMEOUTS = {
+    section: float(os.getenv(f"HOME_{section.upper()}_TIMEOUT_SECONDS", _DEFAULT_TIMEOUT))
+    for section in SECTIONS
+}
+
+
+async def _deliveries(user_id: str, headers):
+    page = await get_json(
+        "delivery-service",
+        f"{DELIVERY_SERVICE_URL}/deliveries/user/{user_id}",
+        params=[("status", s) for s in ACTIVE_DELIVERY_STATUSES] + [("limit", HOME_DELIVERY_LIMIT)],
+        headers=headers
+    )
+    return [
+        {"order_id": d["order_id"], "status": d["status"], "updated_at": d.get("updated_at")}
+        for d in page["items"]
+    ]
+
+
+async def _section(name: str, call):
+    try:
+        return await asyncio.wait_for(call, SECTION_TIMEOUTS[name])
+    except asyncio.TimeoutError:
+        raise UpstreamError(f"timed out after {SECTION_TIMEOUTS[name]}s")
+
+
+@router.get("/home/{user_id}")
+async def get_home(
+    user_id: str,
+    request: Request,
+    limit: int = Query(HOME_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+):
+    """
+    Everything the home screen needs in one round trip: categories, a page
+    of products, the user's cart and their active deliveries. Sections are
+    fetched in parallel, each with its own timeout; one that fails or runs
+    late comes back as null with the reason under `errors`.
+    """
+    headers = {"Authorization": request.headers["authorization"]} if "authorization" in request.headers else None
+    product_params = {"limit": limit, **({"after": after} if after else {})}
+
+    calls = {
+        "categories": get_json("product-service", f"{PRODUCT_SERVICE_URL}/categories", shared=True),
+        "products": get_json(
+            "product-service", f"{PRODUCT_SERVICE_URL}/products", params=product_params, shared=True
+        ),
+        "cart": get_json("cart-order-service", f"{CART_ORDER_SERVICE_URL}/cart/{user_id}", headers=headers),
+        "deliveries": _deliveries(user_id, headers)
+    }
+    results = await asyncio.gather(
+        *(_section(name, call) for name, call in calls.items()), return_exceptions=True
+    )
+
+    body, errors = {}, {}
+    for name, result in zip(calls, results):
+        if isinstance(result, Exception):
+            log.warning("Home section failed", extra={"section": name, "error": str(result)})
+            body[name] = None
+            errors[name] = str(result) if isinstance(result, UpstreamError) else "failed"
+        else:
+            body[name] = result
+    body["errors"] = errors
+
+    if len(errors) == len(calls):
+        raise HTTPException(status_code=502, detail=errors)
+    return FastJSONResponse(body, headers={"Cache-Control": "private, no-store"})
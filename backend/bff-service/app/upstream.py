@@ -0,0 +1,84 @@
+# app/upstream.py
+# One pooled HTTP client for every call to product-service,
+# cart-order-service and delivery-service, so the home endpoint's parallel
+# requests reuse warm keep-alive connections instead of dialling each time.
+
+import os
+from collections import OrderedDict
+
+import httpx
+import orjson
+
+from app.observability import observe_outbound
+
+PRODUCT_SERVICE_URL = os.getenv("PRODUCT_SERVICE_BASE_URL", "http://product-service:8000")
+CART_ORDER_SERVICE_URL = os.getenv("CART_ORDER_SERVICE_BASE_URL", "http://cart-order-service:8000")
+DELIVERY_SERVICE_URL = os.getenv("DELIVERY_SERVICE_BASE_URL", "http://delivery-service:8000")
+
+CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "1.0"))
+READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "3.0"))
+MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "200"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "100"))
+# Catalog responses remembered with their ETag, so a repeat only costs a 304
+SHARED_CACHE_ENTRIES = int(os.getenv("UPSTREAM_SHARED_CACHE_ENTRIES", "256"))
+
+_client = None
+# url -> (etag, body), for responses that are the same for every user
+_shared = OrderedDict()
+
+
+class UpstreamError(Exception):
+    pass
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_json(target: str, url: str, params=None, headers=None, shared: bool = False):
+    """
+    GET a JSON body from another service. `shared` responses (public
+    catalog reads) are revalidated with If-None-Match rather than re-sent.
+    """
+    client = get_http_client()
+    request = client.build_request("GET", url, params=params, headers=headers)
+    key = str(request.url)
+    cached = _shared.get(key) if shared else None
+    if cached:
+        request.headers["If-None-Match"] = cached[0]
+
+    try:
+        with observe_outbound(target):
+            response = await client.send(request)
+    except httpx.HTTPError as e:
+        raise UpstreamError(f"{target} unavailable: {e!r}")
+
+    if response.status_code == 304 and cached:
+        _shared.move_to_end(key)
+        return orjson.loads(cached[1])
+    if response.status_code != 200:
+        raise UpstreamError(f"{target} returned {response.status_code}")
+
+    etag = response.headers.get("etag")
+    if shared and etag:
+        _shared[key] = (etag, response.content)
+        _shared.move_to_end(key)
+        while len(_shared) > SHARED_CACHE_ENTRIES:
+            _shared.popitem(last=False)
+    return orjson.loads(response.content)
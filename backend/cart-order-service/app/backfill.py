@@ -0,0 +1,88 @@
+# app/backfill.py
+# Builds order_summaries for orders placed before the summaries existed, and
+# subtotals for carts created before carts kept them. Both run
+# automatically at startup until one run has finished; `python -m
+# app.backfill` re-runs them (they never overwrite existing data).
+
+from datetime import datetime
+
+from app.services.cart_ops import TOTALS_STAGE
+from app.services.checkout import SUMMARY_PREVIEW_ITEMS
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+# Server-side equivalent of checkout.order_summary
+SUMMARY_PIPELINE = [
+    {"$project": {
+        "_id": 0,
+        "order_id": 1,
+        "user_id": 1,
+        "total_amount": 1,
+        "item_count": {"$size": "$items"},
+        "preview": {"$map": {
+            "input": {"$slice": ["$items", SUMMARY_PREVIEW_ITEMS]},
+            "as": "item",
+            "in": {"name": "$$item.name", "quantity": "$$item.quantity"}
+        }},
+        "status": 1,
+        "created_at": 1
+    }},
+    {"$merge": {
+        "into": "order_summaries",
+        "on": "order_id",
+        "whenMatched": "keepExisting",
+        "whenNotMatched": "insert"
+    }},
+]
+
+
+ORDER_SUMMARY_MARKER = {"_id": "order_summaries"}
+
+
+def backfill_order_summaries(db):
+    # keepExisting: only orders without a summary get one
+    db["orders"].aggregate(SUMMARY_PIPELINE)
+    db["backfills"].update_one(
+        ORDER_SUMMARY_MARKER, {"$set": {"done_at": datetime.utcnow()}}, upsert=True
+    )
+    log.info("Order summaries backfilled", extra={
+        "summaries": db["order_summaries"].estimated_document_count()
+    })
+
+
+def backfill_order_summaries_once(db):
+    # Set only after a whole run, so a start that stopped halfway (or that
+    # took orders before the backfill got to them) runs it again
+    if db["backfills"].find_one(ORDER_SUMMARY_MARKER) is None:
+        backfill_order_summaries(db)
+
+
+# Older carts get their totals, and a priced_version below any real one so
+# the repricing sweep picks them up
+CART_PRICING_PIPELINE = [TOTALS_STAGE, {"$set": {"priced_version": -1}}]
+CART_PRICING_MARKER = {"_id": "backfill"}
+
+
+def backfill_cart_pricing(db):
+    result = db["carts"].update_many({"item_count": {"$exists": False}}, CART_PRICING_PIPELINE)
+    db["cart_repricing"].update_one(
+        CART_PRICING_MARKER, {"$set": {"done_at": datetime.utcnow()}}, upsert=True
+    )
+    log.info("Cart subtotals backfilled", extra={"carts": result.modified_count})
+
+
+def backfill_cart_pricing_once(db):
+    # The marker saves every later start a scan of the whole carts collection
+    if db["cart_repricing"].find_one(CART_PRICING_MARKER) is None:
+        backfill_cart_pricing(db)
+
+
+if __name__ == "__main__":
+    from app.database import db
+    from app.indexes import apply_indexes
+
+    # $merge needs the unique order_id index on order_summaries
+    apply_indexes(db)
+    backfill_order_summaries(db)
+    backfill_cart_pricing(db)
@@ -1,8 +1,36 @@
-from pymongo import MongoClient
 import os
 
+from app.lifecycle import MONGO_OPTIONS, create_client, pool_stats
+from app.observability import mongo_listener
+
 MONGO_URL = os.getenv("MONGO_URL")
 if not MONGO_URL:
     raise ValueError("MONGO_URL not set")
-client = MongoClient(MONGO_URL)
-db = client.get_database()
\ No newline at end of file
+# Pool limits and timeouts live in app/lifecycle.py; no I/O happens here
+client = create_client(MONGO_URL)
+db = client.get_database()
+
+# Async client for CART_ORDER_ASYNC_MODE, created on first use so it binds
+# to the running event loop.
+async_client = None
+
+
+def get_async_client():
+    global async_client
+    if async_client is None:
+        from pymongo import AsyncMongoClient
+        async_client = AsyncMongoClient(
+            MONGO_URL, event_listeners=[mongo_listener, pool_stats], **MONGO_OPTIONS
+        )
+    return async_client
+
+
+def get_async_db():
+    return get_async_client().get_database()
+
+
+async def close_async_client():
+    global async_client
+    if async_client is not None:
+        await async_client.close()
+        async_client = None
@@ -0,0 +1,49 @@
+# app/http_cache.py
+# Conditional GET: ETags, If-None-Match -> 304 and Cache-Control headers.
+# Carts have no version counter (checkout clears them without touching
+# updated_at), so their ETag is a hash of the rendered body.
+
+import hashlib
+import os
+
+from fastapi import Request, Response
+
+from app.fast_json import FastJSONResponse, encode
+
+# Per-user data: browsers may keep it but must revalidate every time
+CART_CACHE_CONTROL = "private, no-cache"
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+
+def etag_for(value) -> str:
+    # Weak: the same ETag covers gzip and identity encodings
+    return f'W/"{value}"'
+
+
+def matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str):
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
+
+
+def conditional_json(request: Request, content, cache_control: str) -> Response:
+    """Render `content` once, tag it with a hash of the bytes, and 304 if the client has them."""
+    body = encode(content)
+    etag = etag_for(hashlib.blake2b(body, digest_size=12).hexdigest())
+    if matches(request, etag):
+        return not_modified(etag, cache_control)
+    return FastJSONResponse(body, headers=cache_headers(etag, cache_control))
@@ -1,11 +1,59 @@
+import os
 from fastapi import FastAPI
-from app.routes import cart, order
+from fastapi.middleware.gzip import GZipMiddleware
+from app.database import client, db
+from app.indexes import apply_indexes
+from app.backfill import backfill_order_summaries_once, backfill_cart_pricing_once
+from app.lifecycle import add_health_checks, startup
+from app.observability import instrument
+from app.http_cache import GZIP_MIN_BYTES
+from app.services.cart_repricer import repricer
+from app.services.delivery_outbox import dispatcher
+
+# "true" serves cart/order through the async Mongo + HTTP stack
+ASYNC_MODE = os.getenv("CART_ORDER_ASYNC_MODE", "false").lower() == "true"
 
 app = FastAPI()
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=6)
+instrument(app)
+add_health_checks(app, client)
+
+
+@app.on_event("startup")
+def startup_event():
+    # The backfill's $merge needs the order_summaries index, so indexes go first
+    startup.run(
+        ("indexes", lambda: apply_indexes(db)),
+        ("backfill", lambda: backfill_order_summaries_once(db)),
+        ("cart_pricing", lambda: backfill_cart_pricing_once(db))
+    )
+    dispatcher.start()
+    repricer.start()
+
+
+@app.on_event("shutdown")
+def stop_dispatcher():
+    dispatcher.stop()
+    repricer.stop()
+    startup.stop()
+    client.close()
+
+
+if ASYNC_MODE:
+    from app.routes import cart_async as cart, order_async as order
+    from app.database import close_async_client
+    from app.services.async_http import close_http_client
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await close_http_client()
+        await close_async_client()
+else:
+    from app.routes import cart, order
 
 app.include_router(cart.router, prefix="/cart", tags=["Cart"])
 app.include_router(order.router, prefix="/order", tags=["Order"])
 
 @app.get("/")
 def root():
-    return {"message": "Cart-Order Service Running"}
\ No newline at end of file
+    return {"message": "Cart-Order Service Running", "async_mode": ASYNC_MODE}
@@ -0,0 +1,111 @@
+# app/pagination.py
+# Keyset pagination and NDJSON streaming over Mongo cursors.
+
+import base64
+
+from bson import json_util
+
+from app.fast_json import encode
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_filter(sort, values):
+    """
+    Match documents strictly after `values` in `sort` order, e.g. for
+    [("created_at", -1), ("order_id", -1)]:
+    created_at < v0 OR (created_at == v0 AND order_id < v1)
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _page_query(query, sort, after):
+    if not after:
+        return query
+    return {"$and": [query, keyset_filter(sort, decode_cursor(after))]}
+
+
+def _next_cursor(items, sort, limit):
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor([last[field] for field, _ in sort])
+
+
+def paginate(collection, query, sort, limit, after=None, projection=None):
+    """
+    One page of `collection` in `sort` order. Sort fields must be included
+    in the projection; `next_after` is None on the last page.
+    """
+    items = list(
+        collection.find(_page_query(query, sort, after), projection)
+        .sort(sort)
+        .limit(limit + 1)
+    )
+    return {"items": items[:limit], "next_after": _next_cursor(items, sort, limit)}
+
+
+async def paginate_async(collection, query, sort, limit, after=None, projection=None):
+    cursor = collection.find(_page_query(query, sort, after), projection).sort(sort).limit(limit + 1)
+    items = await cursor.to_list(length=limit + 1)
+    return {"items": items[:limit], "next_after": _next_cursor(items, sort, limit)}
+
+
+def ndjson_line(doc) -> bytes:
+    return encode(doc) + b"\n"
+
+
+def stream_ndjson(collection, query, sort, after=None, projection=None):
+    """
+    Iterator of NDJSON lines, yielded as the Mongo cursor returns documents.
+    The cursor is decoded up front so a bad `after` fails before streaming.
+    """
+    cursor = (
+        collection.find(_page_query(query, sort, after), projection)
+        .sort(sort)
+        .batch_size(STREAM_BATCH_SIZE)
+    )
+
+    def lines():
+        try:
+            for doc in cursor:
+                yield ndjson_line(doc)
+        finally:
+            cursor.close()
+
+    return lines()
+
+
+def stream_ndjson_async(collection, query, sort, after=None, projection=None):
+    cursor = (
+        collection.find(_page_query(query, sort, after), projection)
+        .sort(sort)
+        .batch_size(STREAM_BATCH_SIZE)
+    )
+
+    async def lines():
+        try:
+            async for doc in cursor:
+                yield ndjson_line(doc)
+        finally:
+            await cursor.close()
+
+    return lines()
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from app.services.cart_service import add_to_cart, get_cart, remove_from_cart
-from app.schemas import AddToCartRequest
+from fastapi import APIRouter, HTTPException, Request
+from app.http_cache import CART_CACHE_CONTROL, conditional_json
+from app.services.cart_service import (
+    add_to_cart,
+    get_cart,
+    remove_from_cart,
+    apply_cart_ops,
+    reprice_user_carts
+)
+from app.services.cart_repricer import repricer
+from app.schemas import AddToCartRequest, BulkCartRequest, RepriceRequest
 
 router = APIRouter()
 
@@ -18,14 +26,39 @@ def add_item(request: AddToCartRequest):
 
 
 @router.get("/{user_id}")
-def fetch_cart(user_id: str):
-    return get_cart(user_id)
+def fetch_cart(user_id: str, request: Request):
+    return conditional_json(request, get_cart(user_id), CART_CACHE_CONTROL)
 
 
 @router.post("/remove")
 def remove_item(request: AddToCartRequest):
-    return remove_from_cart(
-        request.product_id,
-        request.quantity,
-        request.user_id
-    )
+    try:
+        return remove_from_cart(
+            request.product_id,
+            request.quantity,
+            request.user_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/bulk")
+def apply_ops(request: BulkCartRequest):
+    try:
+        return apply_cart_ops(request.ops)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/reprice")
+def reprice(request: RepriceRequest):
+    """Reprice these users' carts now, with one product lookup for all of them."""
+    try:
+        return reprice_user_carts(request.user_ids)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/reprice/stats")
+def reprice_stats():
+    return repricer.stats()
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Request
+from app.http_cache import CART_CACHE_CONTROL, conditional_json
+from app.services.async_cart_service import (
+    add_to_cart,
+    get_cart,
+    remove_from_cart,
+    apply_cart_ops,
+    reprice_user_carts
+)
+from app.services.cart_repricer import repricer
+from app.schemas import AddToCartRequest, BulkCartRequest, RepriceRequest
+
+router = APIRouter()
+
+
+@router.post("/add")
+async def add_item(request: AddToCartRequest):
+    try:
+        return await add_to_cart(
+            request.product_id,
+            request.quantity,
+            request.user_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{user_id}")
+async def fetch_cart(user_id: str, request: Request):
+    return conditional_json(request, await get_cart(user_id), CART_CACHE_CONTROL)
+
+
+@router.post("/remove")
+async def remove_item(request: AddToCartRequest):
+    try:
+        return await remove_from_cart(
+            request.product_id,
+            request.quantity,
+            request.user_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/bulk")
+async def apply_ops(request: BulkCartRequest):
+    try:
+        return await apply_cart_ops(request.ops)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/reprice")
+async def reprice(request: RepriceRequest):
+    """Reprice these users' carts now, with one product lookup for all of them."""
+    try:
+        return await reprice_user_carts(request.user_ids)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/reprice/stats")
+def reprice_stats():
+    return repricer.stats()
@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.services.async_order_service import place_order, get_orders, get_order, stream_orders
+from app.services.delivery_outbox import dispatcher
+from app.schemas import PlaceOrderRequest
+from app.pagination import MAX_PAGE_SIZE
+from app.fast_json import FastJSONResponse
+
+router = APIRouter()
+
+
+@router.post("/create")
+async def create_order(
+    request: PlaceOrderRequest,
+    idempotency_key: Optional[str] = Header(None)
+):
+    try:
+        order = await place_order(request.user_id, request.idempotency_key or idempotency_key)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The outbox dispatcher creates the delivery off the request path
+    dispatcher.wake()
+    return order
+
+
+@router.get("/{user_id}")
+async def fetch_orders(
+    user_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    try:
+        if stream:
+            return StreamingResponse(
+                stream_orders(user_id, after),
+                media_type="application/x-ndjson"
+            )
+        return FastJSONResponse(await get_orders(user_id, limit, after))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{user_id}/{order_id}")
+async def fetch_order(user_id: str, order_id: str):
+    order = await get_order(user_id, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return FastJSONResponse(order)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -17,12 +17,33 @@ class CartItem(BaseModel):
     product_id: str
     name: str
     price: float
+    available: bool = True
+    # Set when the last repricing changed this line's price
+    previous_price: Optional[float] = None
     quantity: int
 
 
 class CartResponse(BaseModel):
     user_id: str
     items: List[CartItem]
+    subtotal: float
+    item_count: int
+    priced_version: Optional[int] = None
+
+
+class CartOp(BaseModel):
+    op: Literal["add", "remove"]
+    product_id: str
+    quantity: int = Field(gt=0)
+    user_id: str
+
+
+class BulkCartRequest(BaseModel):
+    ops: List[CartOp]
+
+
+class RepriceRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=1000)
 
 
 # --------------------
@@ -31,6 +52,8 @@ class CartResponse(BaseModel):
 
 class PlaceOrderRequest(BaseModel):
     user_id: str
+    # Retries with the same key return the original order
+    idempotency_key: Optional[str] = None
 
 
 class OrderResponse(BaseModel):
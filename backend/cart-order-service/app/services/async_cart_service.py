@@ -0,0 +1,103 @@
+# app/services/async_cart_service.py
+# Async counterpart of cart_service, used when CART_ORDER_ASYNC_MODE is on.
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.database import get_async_db
+from app.services.checkout import CartChangedError
+from app.services.async_product_client import fetch_products, get_product, get_products
+from app.services.cart_ops import (
+    add_item_update,
+    remove_item_update,
+    cart_filter,
+    build_bulk_ops,
+    empty_cart,
+    product_ids_of,
+    reprice_ops,
+    repricing_summary
+)
+
+
+def _carts():
+    return get_async_db()["carts"]
+
+
+async def add_to_cart(product_id: str, quantity: int, user_id: str = "default_user"):
+    product = await get_product(product_id)
+
+    if not product:
+        raise Exception("Product not found")
+
+    try:
+        await _carts().update_one(
+            cart_filter(user_id),
+            add_item_update(product, quantity),
+            upsert=True
+        )
+    except DuplicateKeyError:
+        await _carts().update_one(
+            cart_filter(user_id),
+            add_item_update(product, quantity)
+        )
+
+    return {"message": "Item added to cart"}
+
+
+async def get_cart(user_id: str = "default_user"):
+    cart = await _carts().find_one({"user_id": user_id}, {"_id": 0})
+    return cart if cart else empty_cart(user_id)
+
+
+async def remove_from_cart(product_id: str, quantity: int, user_id: str):
+    carts = _carts()
+    cart = await carts.find_one_and_update(
+        cart_filter(user_id, product_id),
+        remove_item_update(product_id, quantity),
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+    if not cart:
+        if not await carts.find_one({"user_id": user_id}, {"_id": 1}):
+            raise Exception("Cart not found")
+        raise Exception("Product not in cart")
+
+    return {"message": "Cart updated successfully"}
+
+
+async def apply_cart_ops(ops):
+    product_ids = [op.product_id for op in ops if op.op == "add"]
+    products = await get_products(product_ids) if product_ids else {}
+
+    requests, errors = build_bulk_ops(ops, products)
+    if not requests:
+        return {"matched": 0, "upserted": 0, "errors": errors}
+
+    result = await _carts().bulk_write(requests, ordered=True)
+    return {
+        "matched": result.matched_count,
+        "upserted": result.upserted_count,
+        "errors": errors
+    }
+
+
+async def reprice_carts(carts):
+    products, version = await fetch_products(product_ids_of(carts))
+    requests, repriced = reprice_ops(carts, products, version)
+    result = await _carts().bulk_write(requests, ordered=False)
+    return repriced, result.matched_count, version
+
+
+async def reprice_cart(cart):
+    repriced, written, _ = await reprice_carts([cart])
+    if not written:
+        raise CartChangedError("Cart changed during checkout, please retry")
+    return repriced[0]
+
+
+async def reprice_user_carts(user_ids):
+    carts = await _carts().find({"user_id": {"$in": user_ids}}, {"_id": 0}).to_list(length=None)
+    if not carts:
+        return repricing_summary(user_ids, [], 0, None)
+    repriced, written, version = await reprice_carts(carts)
+    return repricing_summary(user_ids, repriced, written, version)
@@ -0,0 +1,33 @@
+# app/services/async_http.py
+
+import os
+
+import httpx
+
+from app.services.product_client import CONNECT_TIMEOUT, READ_TIMEOUT
+
+MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "50"))
+
+_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared connection pool for calls to product-service and delivery-service."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
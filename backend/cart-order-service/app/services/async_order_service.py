@@ -0,0 +1,111 @@
+# app/services/async_order_service.py
+# Async counterpart of order_service, used when CART_ORDER_ASYNC_MODE is on.
+
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from app.database import get_async_db, get_async_client
+from app.pagination import paginate_async, stream_ndjson_async, DEFAULT_PAGE_SIZE
+from app.services import checkout
+from app.services.async_cart_service import get_cart, reprice_cart
+from app.services.async_product_client import get_catalog_version
+from app.services.async_stock_client import reserve_stock, release_stock
+from app.services.checkout import CartChangedError
+from app.services.delivery_outbox import order_events
+from app.services.order_service import ORDER_SORT
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+
+async def _commit_order(order: dict, cart_items, session=None):
+    db = get_async_db()
+    result = await db["carts"].update_one(
+        checkout.clear_cart_filter(order["user_id"], cart_items),
+        checkout.CLEAR_CART_UPDATE,
+        session=session
+    )
+    if result.matched_count == 0:
+        raise CartChangedError("Cart changed during checkout, please retry")
+
+    await db["orders"].insert_one(order, session=session)
+    await db["order_summaries"].insert_one(checkout.order_summary(order), session=session)
+    await db["delivery_outbox"].insert_many(order_events(order), session=session)
+
+
+async def _commit_order_atomically(order: dict, cart_items):
+    if checkout.USE_TRANSACTIONS:
+        try:
+            async with get_async_client().start_session() as session:
+                await session.with_transaction(
+                    lambda s: _commit_order(order, cart_items, session=s)
+                )
+            return
+        except OperationFailure as e:
+            if e.code != checkout.TRANSACTIONS_UNSUPPORTED:
+                raise
+            log.warning("MongoDB does not support transactions here, committing orders without them")
+            checkout.USE_TRANSACTIONS = False
+
+    await _commit_order(order, cart_items)
+
+
+async def place_order(user_id: str, idempotency_key: str = None):
+    orders = get_async_db()["orders"]
+    if idempotency_key:
+        existing = await orders.find_one(
+            checkout.idempotency_filter(user_id, idempotency_key), {"_id": 0}
+        )
+        if existing:
+            return checkout.order_response(existing)
+
+    cart = await get_cart(user_id)
+    if not cart or not cart.get("items"):
+        raise Exception("Cart is empty")
+
+    if cart.get("priced_version", -1) < await get_catalog_version():
+        cart = await reprice_cart(cart)
+    items, total_amount = checkout.order_lines(cart)
+
+    order = checkout.build_order(user_id, items, total_amount, idempotency_key)
+
+    if checkout.RESERVE_STOCK:
+        await reserve_stock(order["order_id"], items)
+
+    try:
+        await _commit_order_atomically(order, cart["items"])
+    except Exception as e:
+        if checkout.RESERVE_STOCK:
+            await release_stock(order["order_id"])
+        if not idempotency_key or not isinstance(e, (DuplicateKeyError, CartChangedError)):
+            raise
+        existing = await orders.find_one(
+            checkout.idempotency_filter(user_id, idempotency_key), {"_id": 0}
+        )
+        if not existing:
+            raise
+        return checkout.order_response(existing)
+
+    return checkout.order_response(order)
+
+
+async def get_orders(user_id: str, limit: int = None, after: str = None):
+    summaries = get_async_db()["order_summaries"]
+    if limit is None and after is None:
+        cursor = summaries.find({"user_id": user_id}, {"_id": 0}).sort(ORDER_SORT)
+        return await cursor.to_list(length=DEFAULT_PAGE_SIZE)
+    return await paginate_async(
+        summaries, {"user_id": user_id}, ORDER_SORT,
+        limit or DEFAULT_PAGE_SIZE, after, {"_id": 0}
+    )
+
+
+def stream_orders(user_id: str, after: str = None):
+    return stream_ndjson_async(
+        get_async_db()["order_summaries"], {"user_id": user_id}, ORDER_SORT, after, {"_id": 0}
+    )
+
+
+async def get_order(user_id: str, order_id: str):
+    return await get_async_db()["orders"].find_one(
+        {"order_id": order_id, "user_id": user_id}, {"_id": 0}
+    )
@@ -0,0 +1,154 @@
+# app/services/async_product_client.py
+
+import asyncio
+
+import httpx
+
+from app.observability import observe_outbound
+from app.services.async_http import get_http_client
+from app.services.product_client import (
+    PRODUCT_BULK_URL,
+    CATALOG_VERSION_URL,
+    BATCH_WINDOW_SECONDS,
+    BATCH_MAX_SIZE,
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    ProductServiceError,
+    _cache_get,
+    _cache_put_many,
+    stamp_products,
+)
+
+# product_id -> Future resolved by the batch that fetches it
+_pending = {}
+_open_ids = []
+# Running batch tasks; the loop only keeps weak references to them
+_tasks = set()
+
+
+async def _fetch_bulk(product_ids):
+    try:
+        response = await get_http_client().post(
+            PRODUCT_BULK_URL,
+            json={"product_ids": product_ids}
+        )
+    except httpx.HTTPError as e:
+        raise ProductServiceError(f"Product service unavailable: {str(e)}")
+
+    if response.status_code != 200:
+        raise ProductServiceError(f"Product service returned {response.status_code}")
+
+    return stamp_products(response.json(), response.headers)
+
+
+async def _dispatch(product_ids):
+    products = {}
+    error = ProductServiceError("Product lookup was cancelled")
+    try:
+        with observe_outbound("product-service"):
+            products, _ = await _fetch_bulk(product_ids)
+        _cache_put_many(products)
+        error = None
+    except ProductServiceError as e:
+        error = e
+    except Exception as e:
+        # e.g. a malformed response: fail this batch, not every later caller
+        error = ProductServiceError(f"Product lookup failed: {e!r}")
+    finally:
+        # Always resolve the batch, so no id stays joined to a dead future
+        for product_id in product_ids:
+            future = _pending.pop(product_id, None)
+            if future is None or future.done():
+                continue
+            if error is None:
+                future.set_result(products.get(product_id))
+            else:
+                future.set_exception(error)
+
+
+def _consume(future):
+    if not future.cancelled():
+        future.exception()
+
+
+def _spawn(coro):
+    task = asyncio.ensure_future(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _flush_after_window():
+    global _open_ids
+    await asyncio.sleep(BATCH_WINDOW_SECONDS)
+    product_ids, _open_ids = _open_ids, []
+    if product_ids:
+        await _dispatch(product_ids)
+
+
+async def get_products(product_ids, use_cache: bool = True) -> dict:
+    """
+    Async counterpart of product_client.get_products. Shares its snapshot
+    cache; concurrent misses on the event loop join one /products/bulk call.
+    """
+    global _open_ids
+    result = {}
+    futures = {}
+    loop = asyncio.get_running_loop()
+
+    for product_id in dict.fromkeys(product_ids):
+        product = _cache_get(product_id) if use_cache else None
+        if product is not None:
+            result[product_id] = product
+            continue
+
+        future = _pending.get(product_id)
+        if future is None:
+            future = loop.create_future()
+            # Callers may stop waiting (first error, timeout); don't log it as unhandled
+            future.add_done_callback(_consume)
+            _pending[product_id] = future
+            if not _open_ids:
+                _spawn(_flush_after_window())
+            _open_ids.append(product_id)
+            if len(_open_ids) >= BATCH_MAX_SIZE:
+                full_batch, _open_ids = _open_ids, []
+                _spawn(_dispatch(full_batch))
+        futures[product_id] = future
+
+    for product_id, future in futures.items():
+        try:
+            # Shielded: other callers may be waiting on the same batch
+            product = await asyncio.wait_for(
+                asyncio.shield(future), CONNECT_TIMEOUT + READ_TIMEOUT + BATCH_WINDOW_SECONDS
+            )
+        except asyncio.TimeoutError:
+            raise ProductServiceError("Timed out waiting for product service")
+        if product is not None:
+            result[product_id] = product
+
+    return result
+
+
+async def get_product(product_id: str):
+    return (await get_products([product_id])).get(product_id)
+
+
+async def fetch_products(product_ids):
+    """Async counterpart of product_client.fetch_products."""
+    with observe_outbound("product-service"):
+        products, version = await _fetch_bulk(list(dict.fromkeys(product_ids)))
+    _cache_put_many(products)
+    return products, version
+
+
+async def get_catalog_version() -> int:
+    try:
+        with observe_outbound("product-service"):
+            response = await get_http_client().get(CATALOG_VERSION_URL)
+    except httpx.HTTPError as e:
+        raise ProductServiceError(f"Product service unavailable: {str(e)}")
+
+    if response.status_code != 200:
+        raise ProductServiceError(f"Product service returned {response.status_code}")
+
+    return response.json()["version"]
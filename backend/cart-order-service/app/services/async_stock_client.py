@@ -0,0 +1,39 @@
+# app/services/async_stock_client.py
+# Async counterpart of stock_client for CART_ORDER_ASYNC_MODE.
+
+import httpx
+
+from app.observability import get_logger, observe_outbound
+from app.services.async_http import get_http_client
+from app.services.product_client import ProductServiceError
+from app.services.stock_client import (
+    STOCK_RESERVE_URL,
+    STOCK_RELEASE_URL,
+    reserve_payload,
+    check_reserve_response,
+)
+
+log = get_logger(__name__)
+
+
+async def reserve_stock(reservation_id: str, items):
+    try:
+        with observe_outbound("product-service"):
+            response = await get_http_client().post(
+                STOCK_RESERVE_URL, json=reserve_payload(reservation_id, items)
+            )
+    except httpx.HTTPError as e:
+        raise ProductServiceError(f"Product service unavailable: {str(e)}")
+    check_reserve_response(response)
+
+
+async def release_stock(reservation_id: str):
+    try:
+        with observe_outbound("product-service"):
+            await get_http_client().post(
+                STOCK_RELEASE_URL, json={"reservation_ids": [reservation_id]}
+            )
+    except httpx.HTTPError as e:
+        log.warning("Could not release stock reservation", extra={
+            "reservation_id": reservation_id, "error": str(e)
+        })
@@ -0,0 +1,206 @@
+# app/services/cart_ops.py
+# Single-round-trip cart mutations, shared by the sync and async services.
+# Each one is an aggregation-pipeline update, so MongoDB applies the whole
+# read-modify-write to the cart document atomically, subtotal included.
+#
+# Carts also carry `priced_version`: the catalog version every line's price
+# is at least as new as. Repricing (below) brings lines up to the current
+# catalog in batches of carts, one /products/bulk call per batch.
+
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+# Lines whose product is unavailable stay in the cart but cost nothing
+TOTALS_STAGE = {"$set": {
+    "subtotal": {"$round": [{"$sum": {"$map": {
+        "input": "$items",
+        "as": "item",
+        "in": {"$cond": [
+            {"$eq": ["$$item.available", False]},
+            0,
+            {"$multiply": ["$$item.price", "$$item.quantity"]}
+        ]}
+    }}}, 2]},
+    "item_count": {"$size": "$items"}
+}}
+
+
+def cart_totals(items):
+    """Python equivalent of TOTALS_STAGE."""
+    subtotal = sum(
+        item["price"] * item["quantity"] for item in items if item.get("available", True)
+    )
+    return {"subtotal": round(subtotal, 2), "item_count": len(items)}
+
+
+def add_item_update(product: dict, quantity: int):
+    """Increment the product's line, or append it if the cart doesn't have it yet."""
+    product_id = {"$literal": product["product_id"]}
+    items = {"$ifNull": ["$items", []]}
+    line = {
+        "product_id": product["product_id"],
+        "name": product["name"],
+        "price": product["price"],
+        "available": product["available"],
+        "quantity": quantity
+    }
+    # Never newer than the snapshot this line was priced from
+    version = product.get("catalog_version", 0)
+    return [
+        {"$set": {
+            "items": {"$cond": [
+                {"$in": [product_id, {"$ifNull": ["$items.product_id", []]}]},
+                {"$map": {
+                    "input": items,
+                    "as": "item",
+                    "in": {"$cond": [
+                        {"$eq": ["$$item.product_id", product_id]},
+                        {"$mergeObjects": [
+                            "$$item",
+                            {"quantity": {"$add": ["$$item.quantity", quantity]}}
+                        ]},
+                        "$$item"
+                    ]}
+                }},
+                {"$concatArrays": [items, [{"$literal": line}]]}
+            ]},
+            "priced_version": {"$min": [{"$ifNull": ["$priced_version", version]}, version]},
+            "updated_at": "$$NOW"
+        }},
+        TOTALS_STAGE
+    ]
+
+
+def remove_item_update(product_id: str, quantity: int):
+    """Decrement the product's line and drop it once the quantity reaches zero."""
+    product_id = {"$literal": product_id}
+    return [
+        {"$set": {
+            "items": {"$filter": {
+                "input": {"$map": {
+                    "input": "$items",
+                    "as": "item",
+                    "in": {"$cond": [
+                        {"$eq": ["$$item.product_id", product_id]},
+                        {"$mergeObjects": [
+                            "$$item",
+                            {"quantity": {"$subtract": ["$$item.quantity", quantity]}}
+                        ]},
+                        "$$item"
+                    ]}
+                }},
+                "as": "item",
+                "cond": {"$gt": ["$$item.quantity", 0]}
+            }},
+            "updated_at": "$$NOW"
+        }},
+        TOTALS_STAGE
+    ]
+
+
+def empty_cart(user_id: str):
+    return {"user_id": user_id, "items": [], "subtotal": 0, "item_count": 0}
+
+
+def cart_filter(user_id: str, product_id: str = None):
+    if product_id is None:
+        return {"user_id": user_id}
+    return {"user_id": user_id, "items.product_id": product_id}
+
+
+def build_bulk_ops(ops, products: dict):
+    """
+    Turn a list of CartOp into bulk_write requests. Returns the requests and
+    the errors for ops that reference unknown products.
+    """
+    requests = []
+    errors = []
+    for index, op in enumerate(ops):
+        if op.op == "add":
+            product = products.get(op.product_id)
+            if not product:
+                errors.append({"index": index, "detail": "Product not found"})
+                continue
+            requests.append(UpdateOne(
+                cart_filter(op.user_id),
+                add_item_update(product, op.quantity),
+                upsert=True
+            ))
+        else:
+            requests.append(UpdateOne(
+                cart_filter(op.user_id, op.product_id),
+                remove_item_update(op.product_id, op.quantity)
+            ))
+    return requests, errors
+
+
+# --------------------
+# Repricing
+# --------------------
+
+def reprice_lines(items, products: dict):
+    """
+    Lines at current catalog prices. A line whose price moved keeps the old
+    one in `previous_price` until the next repricing; a line whose product
+    is gone or unavailable is marked `available: False`.
+    """
+    lines = []
+    for item in items:
+        product = products.get(item["product_id"])
+        line = {
+            "product_id": item["product_id"],
+            "name": product["name"] if product else item["name"],
+            "price": product["price"] if product else item["price"],
+            "available": bool(product and product["available"]),
+            "quantity": item["quantity"]
+        }
+        if line["price"] != item["price"]:
+            line["previous_price"] = item["price"]
+        lines.append(line)
+    return lines
+
+
+def reprice_ops(carts, products: dict, version: int):
+    """
+    One UpdateOne per cart, bringing it to `version`, and the carts as they
+    will read afterwards. An update only applies if the cart's lines are
+    still the ones that were priced, so a concurrent add or checkout wins.
+    """
+    now = datetime.utcnow()
+    requests = []
+    repriced = []
+    for cart in carts:
+        items = reprice_lines(cart["items"], products)
+        update = {"priced_version": version, "priced_at": now}
+        if items != cart["items"] or "subtotal" not in cart:
+            update.update(items=items, **cart_totals(items))
+        else:
+            # Keep the stored lines as read: checkout matches them field for field
+            items = cart["items"]
+        requests.append(UpdateOne(
+            {"user_id": cart["user_id"], "items": cart["items"]},
+            {"$set": update}
+        ))
+        repriced.append({**cart, **cart_totals(items), **update, "items": items})
+    return requests, repriced
+
+
+def repricing_summary(user_ids, repriced, written: int, version):
+    found = {cart["user_id"] for cart in repriced}
+    lines = [item for cart in repriced for item in cart["items"]]
+    return {
+        "catalog_version": version,
+        "repriced": written,
+        # Changed while being repriced; they keep their old pricing
+        "conflicts": len(repriced) - written,
+        "price_changes": sum("previous_price" in item for item in lines),
+        "unavailable": sum(not item["available"] for item in lines),
+        "not_found": [user_id for user_id in user_ids if user_id not in found]
+    }
+
+
+def product_ids_of(carts):
+    return list(dict.fromkeys(
+        item["product_id"] for cart in carts for item in cart["items"]
+    ))
@@ -0,0 +1,131 @@
+# app/services/cart_repricer.py
+# Background sweep that brings carts up to the current catalog. Every
+# worker polls product-service's catalog version; when non-empty carts are
+# priced at an older one, the worker holding the sweep lease reprices them
+# in batches: one /products/bulk call and one bulk_write per batch, never
+# one call per line. Checkout reprices a cart the sweep has not reached yet.
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.database import db
+from app.services.cart_service import CART_COLLECTION, reprice_carts
+from app.services.product_client import ProductServiceError, get_catalog_version
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+REPRICING_COLLECTION = db["cart_repricing"]
+SWEEP_ID = "sweep"
+
+BATCH_SIZE = int(os.getenv("CART_REPRICE_BATCH_SIZE", "500"))
+POLL_SECONDS = float(os.getenv("CART_REPRICE_POLL_SECONDS", "10"))
+LEASE_SECONDS = float(os.getenv("CART_REPRICE_LEASE_SECONDS", "60"))
+
+# Fields repricing reads; the rest of the cart is left alone
+CART_PROJECTION = {"_id": 0, "user_id": 1, "items": 1, "subtotal": 1}
+
+
+def stale_carts_filter(version: int):
+    """Non-empty carts priced before `version`; served by the partial carts index."""
+    return {"item_count": {"$gt": 0}, "priced_version": {"$lt": version}}
+
+
+class CartRepricer:
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._owner = str(uuid.uuid4())
+
+    def _hold_lease(self) -> bool:
+        """Take or renew the sweep lease; False while another worker holds it."""
+        now = datetime.utcnow()
+        try:
+            REPRICING_COLLECTION.update_one(
+                {"_id": SWEEP_ID, "$or": [{"lease_until": {"$lte": now}}, {"owner": self._owner}]},
+                {"$set": {"owner": self._owner, "lease_until": now + timedelta(seconds=LEASE_SECONDS)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def _release_lease(self, summary: dict = None):
+        update = {"lease_until": datetime.utcnow()}
+        if summary:
+            update["last_sweep"] = summary
+        REPRICING_COLLECTION.update_one({"_id": SWEEP_ID, "owner": self._owner}, {"$set": update})
+
+    def sweep(self, version: int) -> int:
+        """Reprice every stale cart in batches. Returns how many were repriced."""
+        started = time.perf_counter()
+        repriced = batches = 0
+        while not self._stop.is_set() and self._hold_lease():
+            carts = list(
+                CART_COLLECTION.find(stale_carts_filter(version), CART_PROJECTION).limit(BATCH_SIZE)
+            )
+            if not carts:
+                break
+            _, written, priced_at = reprice_carts(carts)
+            repriced += written
+            batches += 1
+            # Nothing written (every cart changed under us) or product-service
+            # answered from an older catalog: try again on the next poll
+            if not written or priced_at < version:
+                break
+
+        summary = {
+            "catalog_version": version,
+            "carts": repriced,
+            "batches": batches,
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": datetime.utcnow()
+        }
+        if batches:
+            log.info("Carts repriced", extra=summary)
+        self._release_lease(summary if batches else None)
+        return repriced
+
+    def run_once(self) -> int:
+        version = get_catalog_version()
+        if CART_COLLECTION.find_one(stale_carts_filter(version), {"_id": 1}) is None:
+            return 0
+        return self.sweep(version)
+
+    def stats(self):
+        sweep = REPRICING_COLLECTION.find_one({"_id": SWEEP_ID}, {"_id": 0}) or {}
+        return {
+            "batch_size": BATCH_SIZE,
+            "poll_seconds": POLL_SECONDS,
+            "lease_until": sweep.get("lease_until"),
+            "last_sweep": sweep.get("last_sweep"),
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except (ProductServiceError, PyMongoError) as e:
+                log.warning("Cart repricing sweep failed", extra={"error": str(e)})
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cart-repricer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+repricer = CartRepricer()
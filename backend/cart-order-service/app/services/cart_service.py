@@ -1,58 +1,43 @@
 # app/services/cart_service.py
 
-import requests
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.database import db
-from datetime import datetime
+from app.services.cart_ops import (
+    add_item_update,
+    remove_item_update,
+    cart_filter,
+    build_bulk_ops,
+    empty_cart,
+    product_ids_of,
+    reprice_ops,
+    repricing_summary
+)
+from app.services.checkout import CartChangedError
+from app.services.product_client import fetch_products, get_product, get_products
 
 CART_COLLECTION = db["carts"]
 
-PRODUCT_SERVICE_URL = "http://product-service:8000/products"
-
 
 def add_to_cart(product_id: str, quantity: int, user_id: str = "default_user"):
     # 1️⃣ Validate product exists via product-service
-    response = requests.get(f"{PRODUCT_SERVICE_URL}/{product_id}")
+    product = get_product(product_id)
 
-    if response.status_code != 200:
+    if not product:
         raise Exception("Product not found")
 
-    product = response.json()
-
-    # 2️⃣ Find user's cart
-    cart = CART_COLLECTION.find_one({"user_id": user_id})
-
-    if not cart:
-        cart = {
-            "user_id": user_id,
-            "items": [],
-            "updated_at": datetime.utcnow()
-        }
-        CART_COLLECTION.insert_one(cart)
-
-    # 3️⃣ Check if item already in cart
-    existing_item = next(
-        (item for item in cart["items"] if item["product_id"] == product_id),
-        None
-    )
-
-    if existing_item:
+    # 2️⃣ Create the cart, bump the line or append it — one atomic upsert
+    try:
         CART_COLLECTION.update_one(
-            {"user_id": user_id, "items.product_id": product_id},
-            {"$inc": {"items.$.quantity": quantity}}
+            cart_filter(user_id),
+            add_item_update(product, quantity),
+            upsert=True
         )
-    else:
+    except DuplicateKeyError:
+        # Lost the race to create this user's cart; it exists now
         CART_COLLECTION.update_one(
-            {"user_id": user_id},
-            {
-                "$push": {
-                    "items": {
-                        "product_id": product_id,
-                        "name": product["name"],
-                        "price": product["price"],
-                        "quantity": quantity
-                    }
-                }
-            }
+            cart_filter(user_id),
+            add_item_update(product, quantity)
         )
 
     return {"message": "Item added to cart"}
@@ -60,34 +45,69 @@ def add_to_cart(product_id: str, quantity: int, user_id: str = "default_user"):
 
 def get_cart(user_id: str = "default_user"):
     cart = CART_COLLECTION.find_one({"user_id": user_id}, {"_id": 0})
-    return cart if cart else {"user_id": user_id, "items": []}
+    return cart if cart else empty_cart(user_id)
 
 
 def remove_from_cart(product_id: str, quantity: int, user_id: str):
-    cart = CART_COLLECTION.find_one({"user_id": user_id})
-
-    if not cart:
-        raise Exception("Cart not found")
-
-    item = next(
-        (item for item in cart["items"] if item["product_id"] == product_id),
-        None
+    cart = CART_COLLECTION.find_one_and_update(
+        cart_filter(user_id, product_id),
+        remove_item_update(product_id, quantity),
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER
     )
 
-    if not item:
+    if not cart:
+        # Only the failure path pays for a second lookup
+        if not CART_COLLECTION.find_one({"user_id": user_id}, {"_id": 1}):
+            raise Exception("Cart not found")
         raise Exception("Product not in cart")
 
-    if item["quantity"] > quantity:
-        # Decrease quantity
-        CART_COLLECTION.update_one(
-            {"user_id": user_id, "items.product_id": product_id},
-            {"$inc": {"items.$.quantity": -quantity}}
-        )
-    else:
-        # Remove item completely
-        CART_COLLECTION.update_one(
-            {"user_id": user_id},
-            {"$pull": {"items": {"product_id": product_id}}}
-        )
-
-    return {"message": "Cart updated successfully"}
\ No newline at end of file
+    return {"message": "Cart updated successfully"}
+
+
+def apply_cart_ops(ops):
+    """
+    Apply many add/remove ops in order with one product lookup and one
+    bulk_write.
+    """
+    product_ids = [op.product_id for op in ops if op.op == "add"]
+    products = get_products(product_ids) if product_ids else {}
+
+    requests, errors = build_bulk_ops(ops, products)
+    if not requests:
+        return {"matched": 0, "upserted": 0, "errors": errors}
+
+    result = CART_COLLECTION.bulk_write(requests, ordered=True)
+    return {
+        "matched": result.matched_count,
+        "upserted": result.upserted_count,
+        "errors": errors
+    }
+
+
+def reprice_carts(carts):
+    """
+    Reprice every line of `carts` with one /products/bulk call and one
+    bulk_write, however many carts there are. Returns the carts as
+    repriced, how many of them were written (a cart changed since it was
+    read keeps its old pricing) and the catalog version they are now at.
+    """
+    products, version = fetch_products(product_ids_of(carts))
+    requests, repriced = reprice_ops(carts, products, version)
+    result = CART_COLLECTION.bulk_write(requests, ordered=False)
+    return repriced, result.matched_count, version
+
+
+def reprice_cart(cart):
+    repriced, written, _ = reprice_carts([cart])
+    if not written:
+        raise CartChangedError("Cart changed during checkout, please retry")
+    return repriced[0]
+
+
+def reprice_user_carts(user_ids):
+    carts = list(CART_COLLECTION.find({"user_id": {"$in": user_ids}}, {"_id": 0}))
+    if not carts:
+        return repricing_summary(user_ids, [], 0, None)
+    repriced, written, version = reprice_carts(carts)
+    return repricing_summary(user_ids, repriced, written, version)
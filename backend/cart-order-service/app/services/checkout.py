@@ -0,0 +1,96 @@
+# app/services/checkout.py
+# Pure checkout steps shared by the sync and async order services.
+
+import os
+import uuid
+from datetime import datetime
+
+USE_TRANSACTIONS = os.getenv("CHECKOUT_USE_TRANSACTIONS", "true").lower() == "true"
+# Reserve stock in product-service before an order is committed
+RESERVE_STOCK = os.getenv("CHECKOUT_RESERVE_STOCK", "true").lower() == "true"
+
+# Raised by servers that are neither a replica set member nor mongos
+TRANSACTIONS_UNSUPPORTED = 20
+
+
+class CartChangedError(Exception):
+    pass
+
+
+def order_lines(cart: dict):
+    """
+    The order's lines and total from a cart repriced at the current catalog
+    version. Raises if any line is gone or unavailable.
+    """
+    unavailable = [
+        item["product_id"] for item in cart["items"] if not item.get("available", True)
+    ]
+    if unavailable:
+        raise Exception(f"Products unavailable: {', '.join(unavailable)}")
+
+    items = [
+        {
+            "product_id": item["product_id"],
+            "name": item["name"],
+            "price": item["price"],
+            "quantity": item["quantity"]
+        }
+        for item in cart["items"]
+    ]
+    return items, cart["subtotal"]
+
+
+def build_order(user_id: str, items, total_amount: float, idempotency_key: str = None):
+    order = {
+        "order_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "items": items,
+        "total_amount": total_amount,
+        "created_at": datetime.utcnow(),
+        "status": "PLACED"
+    }
+    if idempotency_key:
+        order["idempotency_key"] = idempotency_key
+    return order
+
+
+# Lines shown on the order list card; the rest are only in the full order
+SUMMARY_PREVIEW_ITEMS = 3
+
+
+def order_summary(order: dict):
+    """Fixed-size row for the order history list, written next to the order."""
+    return {
+        "order_id": order["order_id"],
+        "user_id": order["user_id"],
+        "total_amount": order["total_amount"],
+        "item_count": len(order["items"]),
+        "preview": [
+            {"name": item["name"], "quantity": item["quantity"]}
+            for item in order["items"][:SUMMARY_PREVIEW_ITEMS]
+        ],
+        "status": order["status"],
+        "created_at": order["created_at"]
+    }
+
+
+def order_response(order: dict):
+    return {
+        "message": "Order placed successfully",
+        "order_id": order["order_id"],
+        "total_amount": order["total_amount"],
+        "created_at": order["created_at"]
+    }
+
+
+def idempotency_filter(user_id: str, idempotency_key: str):
+    return {"user_id": user_id, "idempotency_key": idempotency_key}
+
+
+# An empty cart has nothing to price
+CLEAR_CART_UPDATE = {"$set": {"items": [], "subtotal": 0, "item_count": 0}}
+
+
+def clear_cart_filter(user_id: str, items):
+    # Only clear the cart we priced; a concurrent add makes this match nothing
+    return {"user_id": user_id, "items": items}
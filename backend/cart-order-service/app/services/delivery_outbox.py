@@ -0,0 +1,227 @@
+# app/services/delivery_outbox.py
+# Transactional outbox for what must happen after an order is placed:
+# creating its delivery and committing its stock reservation. place_order
+# writes the events in the same transaction as the order; the dispatcher
+# thread below sends pending events in batches per type and retries them
+# with backoff until they are acknowledged.
+
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from pymongo import UpdateOne
+
+from app.database import db
+from app.services import checkout
+from app.services.stock_client import STOCK_COMMIT_URL
+from app.observability import get_logger, observe_outbound
+
+log = get_logger(__name__)
+
+OUTBOX_COLLECTION = db["delivery_outbox"]
+
+DELIVERY_SERVICE_URL = os.getenv("DELIVERY_SERVICE_URL", "http://delivery-service:8000/delivery/create")
+DELIVERY_BATCH_URL = os.getenv(
+    "DELIVERY_BATCH_URL",
+    DELIVERY_SERVICE_URL.rsplit("/", 1)[0] + "/batch-create"
+)
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+CHUNK_SIZE = int(os.getenv("OUTBOX_CHUNK_SIZE", "25"))
+CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "4"))
+POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "30"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "0.5"))
+BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "60"))
+REQUEST_TIMEOUT = float(os.getenv("OUTBOX_REQUEST_TIMEOUT", "5"))
+RETENTION_SECONDS = int(os.getenv("OUTBOX_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+PENDING = "PENDING"
+IN_FLIGHT = "IN_FLIGHT"
+DONE = "DONE"
+FAILED = "FAILED"
+
+
+def delivery_event(order: dict):
+    """Outbox document for an order; keyed by order_id so it is written once."""
+    return {
+        "_id": order["order_id"],
+        "type": "delivery.create",
+        "payload": {"order_id": order["order_id"], "user_id": order["user_id"]},
+        "status": PENDING,
+        "attempts": 0,
+        "next_attempt_at": order["created_at"],
+        "created_at": order["created_at"]
+    }
+
+
+def stock_commit_event(order: dict):
+    return {
+        "_id": f"stock.commit:{order['order_id']}",
+        "type": "stock.commit",
+        "payload": {"reservation_id": order["order_id"]},
+        "status": PENDING,
+        "attempts": 0,
+        "next_attempt_at": order["created_at"],
+        "created_at": order["created_at"]
+    }
+
+
+def order_events(order: dict):
+    """Outbox events written together with an order."""
+    events = [delivery_event(order)]
+    if checkout.RESERVE_STOCK:
+        events.append(stock_commit_event(order))
+    return events
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_BASE_SECONDS * (2 ** attempts), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+# --------------------
+# Dispatcher
+# --------------------
+
+class OutboxDispatcher:
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=CONCURRENCY))
+        self._pool = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="outbox-send")
+
+    def claim_batch(self):
+        """Lease up to BATCH_SIZE due events to this dispatcher."""
+        now = datetime.utcnow()
+        due = {"$or": [
+            {"status": PENDING, "next_attempt_at": {"$lte": now}},
+            {"status": IN_FLIGHT, "lease_until": {"$lte": now}}
+        ]}
+        ids = [e["_id"] for e in OUTBOX_COLLECTION.find(due, {"_id": 1}).limit(BATCH_SIZE)]
+        if not ids:
+            return []
+
+        lease = str(uuid.uuid4())
+        OUTBOX_COLLECTION.update_many(
+            {"$and": [{"_id": {"$in": ids}}, due]},
+            {"$set": {
+                "status": IN_FLIGHT,
+                "lease": lease,
+                "lease_until": now + timedelta(seconds=LEASE_SECONDS)
+            }}
+        )
+        return list(OUTBOX_COLLECTION.find({"lease": lease}))
+
+    def _send_deliveries(self, events):
+        payload = {"deliveries": [e["payload"] for e in events]}
+        with observe_outbound("delivery-service"):
+            response = self._session.post(DELIVERY_BATCH_URL, json=payload, timeout=REQUEST_TIMEOUT)
+            if response.status_code not in (200, 201):
+                raise Exception(f"Delivery service returned {response.status_code}: {response.text}")
+
+    def _send_stock_commits(self, events):
+        payload = {"reservation_ids": [e["payload"]["reservation_id"] for e in events]}
+        with observe_outbound("product-service"):
+            response = self._session.post(STOCK_COMMIT_URL, json=payload, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                raise Exception(f"Product service returned {response.status_code}: {response.text}")
+        # Released or unknown reservations won't succeed on a retry either
+        for reservation_id, error in response.json()["failed"].items():
+            log.error("Stock reservation not committed", extra={
+                "reservation_id": reservation_id, "error": error
+            })
+
+    def _send_chunk(self, events):
+        if events[0]["type"] == "stock.commit":
+            self._send_stock_commits(events)
+        else:
+            self._send_deliveries(events)
+
+    def dispatch_once(self) -> int:
+        events = self.claim_batch()
+        if not events:
+            return 0
+
+        by_type = {}
+        for event in events:
+            by_type.setdefault(event["type"], []).append(event)
+        chunks = [
+            group[i:i + CHUNK_SIZE]
+            for group in by_type.values()
+            for i in range(0, len(group), CHUNK_SIZE)
+        ]
+        futures = [(chunk, self._pool.submit(self._send_chunk, chunk)) for chunk in chunks]
+
+        now = datetime.utcnow()
+        updates = []
+        for chunk, future in futures:
+            try:
+                future.result()
+                error = None
+            except Exception as e:
+                error = str(e)
+                log.warning("Failed to send outbox events", extra={
+                    "type": chunk[0]["type"], "events": len(chunk), "error": error
+                })
+
+            for event in chunk:
+                if error is None:
+                    update = {"$set": {"status": DONE, "sent_at": now}}
+                else:
+                    attempts = event["attempts"] + 1
+                    status = FAILED if attempts >= MAX_ATTEMPTS else PENDING
+                    update = {"$set": {
+                        "status": status,
+                        "attempts": attempts,
+                        "last_error": error,
+                        "next_attempt_at": now + _backoff(attempts)
+                    }}
+                    if status == FAILED:
+                        log.error("Giving up on outbox event", extra={
+                            "event_id": event["_id"], "type": event["type"], "attempts": attempts
+                        })
+                update["$unset"] = {"lease": "", "lease_until": ""}
+                updates.append(UpdateOne({"_id": event["_id"], "lease": event["lease"]}, update))
+
+        OUTBOX_COLLECTION.bulk_write(updates, ordered=False)
+        return len(events)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sent = self.dispatch_once()
+            except Exception:
+                # Anything escaping here would end the thread, and with it
+                # every delivery and stock commit, while the service looks healthy
+                log.exception("Outbox dispatch failed")
+                sent = 0
+            # Keep draining while there is a backlog
+            if sent < BATCH_SIZE:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+dispatcher = OutboxDispatcher()
@@ -1,76 +1,118 @@
 # app/services/order_service.py
-import uuid
-from datetime import datetime
-import requests
-from app.database import db
-from app.services.cart_service import get_cart
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.database import db, client
+from app.pagination import paginate, stream_ndjson, DEFAULT_PAGE_SIZE
+from app.services import checkout
+from app.services.cart_service import get_cart, reprice_cart
+from app.services.checkout import CartChangedError
+from app.services.delivery_outbox import order_events
+from app.services.product_client import get_catalog_version
+from app.services.stock_client import reserve_stock, release_stock
+from app.observability import get_logger
+
+log = get_logger(__name__)
 
 ORDER_COLLECTION = db["orders"]
+SUMMARY_COLLECTION = db["order_summaries"]
 CART_COLLECTION = db["carts"]
-DELIVERY_COLLECTION = db["deliveries"]  # optional local check
-DELIVERY_SERVICE_URL = "http://delivery-service:8000/delivery/create"
-
-
-def notify_delivery_service(order_id: str, user_id: str):
-    """
-    Call the delivery service to create a delivery for the order.
-    Prevent duplicates by checking locally first.
-    """
-    # Check local delivery collection first (optional)
-    existing = DELIVERY_COLLECTION.find_one({"order_id": order_id})
-    if existing:
-        print(f"Delivery already exists for order {order_id}")
-        return
-
-    payload = {"order_id": order_id, "user_id": user_id}
-    try:
-        response = requests.post(DELIVERY_SERVICE_URL, json=payload, timeout=5)
-        if response.status_code == 201 or response.status_code == 200:
-            print(f"Delivery created for order {order_id}")
-            # Optionally store locally as reference
-            DELIVERY_COLLECTION.insert_one({"order_id": order_id, "user_id": user_id})
-        else:
-            print(f"Delivery service returned {response.status_code}: {response.text}")
-    except Exception as e:
-        print(f"Failed to notify delivery service: {str(e)}")
+OUTBOX_COLLECTION = db["delivery_outbox"]
+
+# Newest first; order_id breaks ties between orders created in the same ms
+ORDER_SORT = [("created_at", -1), ("order_id", -1)]
+
+
+def _commit_order(order: dict, cart_items, session=None):
+    result = CART_COLLECTION.update_one(
+        checkout.clear_cart_filter(order["user_id"], cart_items),
+        checkout.CLEAR_CART_UPDATE,
+        session=session
+    )
+    if result.matched_count == 0:
+        raise CartChangedError("Cart changed during checkout, please retry")
+
+    ORDER_COLLECTION.insert_one(order, session=session)
+    SUMMARY_COLLECTION.insert_one(checkout.order_summary(order), session=session)
+    OUTBOX_COLLECTION.insert_many(order_events(order), session=session)
+
 
+def _commit_order_atomically(order: dict, cart_items):
+    if checkout.USE_TRANSACTIONS:
+        try:
+            with client.start_session() as session:
+                session.with_transaction(
+                    lambda s: _commit_order(order, cart_items, session=s)
+                )
+            return
+        except OperationFailure as e:
+            if e.code != checkout.TRANSACTIONS_UNSUPPORTED:
+                raise
+            log.warning("MongoDB does not support transactions here, committing orders without them")
+            checkout.USE_TRANSACTIONS = False
+
+    _commit_order(order, cart_items)
+
+
+def place_order(user_id: str, idempotency_key: str = None):
+    # 1️⃣ A retried request returns the order it already placed
+    if idempotency_key:
+        existing = ORDER_COLLECTION.find_one(
+            checkout.idempotency_filter(user_id, idempotency_key), {"_id": 0}
+        )
+        if existing:
+            return checkout.order_response(existing)
 
-def place_order(user_id: str):
     cart = get_cart(user_id)
     if not cart or not cart.get("items"):
         raise Exception("Cart is empty")
 
-    total_amount = sum(item["price"] * item["quantity"] for item in cart["items"])
+    # 2️⃣ Carts are repriced when the catalog changes, so one priced at the
+    # current version is used as stored; only a stale one needs a bulk call
+    if cart.get("priced_version", -1) < get_catalog_version():
+        cart = reprice_cart(cart)
+    items, total_amount = checkout.order_lines(cart)
+
+    order = checkout.build_order(user_id, items, total_amount, idempotency_key)
 
-    order = {
-        "order_id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "items": cart["items"],
-        "total_amount": total_amount,
-        "created_at": datetime.utcnow(),
-        "status": "PLACED"
-    }
+    # 3️⃣ Hold stock for every line in one call, keyed by the order id
+    if checkout.RESERVE_STOCK:
+        reserve_stock(order["order_id"], items)
 
-    ORDER_COLLECTION.insert_one(order)
+    # 4️⃣ Insert the order, its outbox events and clear the cart together
+    try:
+        _commit_order_atomically(order, cart["items"])
+    except Exception as e:
+        if checkout.RESERVE_STOCK:
+            release_stock(order["order_id"])
+        # A concurrent retry with the same key may have won the race
+        if not idempotency_key or not isinstance(e, (DuplicateKeyError, CartChangedError)):
+            raise
+        existing = ORDER_COLLECTION.find_one(
+            checkout.idempotency_filter(user_id, idempotency_key), {"_id": 0}
+        )
+        if not existing:
+            raise
+        return checkout.order_response(existing)
 
-    # Notify delivery service safely
-    notify_delivery_service(order["order_id"], user_id)
+    return checkout.order_response(order)
 
-    # Clear cart after order
-    CART_COLLECTION.update_one(
-        {"user_id": user_id},
-        {"$set": {"items": []}}
+
+def get_orders(user_id: str, limit: int = None, after: str = None):
+    """Order summaries, newest first. Without paging params: the first page as a list."""
+    if limit is None and after is None:
+        return list(
+            SUMMARY_COLLECTION.find({"user_id": user_id}, {"_id": 0})
+            .sort(ORDER_SORT)
+            .limit(DEFAULT_PAGE_SIZE)
+        )
+    return paginate(
+        SUMMARY_COLLECTION, {"user_id": user_id}, ORDER_SORT,
+        limit or DEFAULT_PAGE_SIZE, after, {"_id": 0}
     )
 
-    return {
-        "message": "Order placed successfully",
-        "order_id": order["order_id"],
-        "total_amount": total_amount,
-        "created_at": order["created_at"]
-    }
+
+def stream_orders(user_id: str, after: str = None):
+    return stream_ndjson(SUMMARY_COLLECTION, {"user_id": user_id}, ORDER_SORT, after, {"_id": 0})
 
 
-def get_orders(user_id: str):
-    return list(
-        ORDER_COLLECTION.find({"user_id": user_id}, {"_id": 0})
-    )
\ No newline at end of file
+def get_order(user_id: str, order_id: str):
+    return ORDER_COLLECTION.find_one({"order_id": order_id, "user_id": user_id}, {"_id": 0})
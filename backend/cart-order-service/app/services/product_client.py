@@ -0,0 +1,250 @@
+# app/services/product_client.py
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.observability import observe_outbound
+
+PRODUCT_SERVICE_URL = os.getenv("PRODUCT_SERVICE_URL", "http://product-service:8000/products")
+PRODUCT_BULK_URL = f"{PRODUCT_SERVICE_URL}/bulk"
+CATALOG_VERSION_URL = os.getenv(
+    "CATALOG_VERSION_URL",
+    PRODUCT_SERVICE_URL.rsplit("/", 1)[0] + "/catalog/version"
+)
+# Catalog version the prices in a /products/bulk response were read at
+CATALOG_VERSION_HEADER = "X-Catalog-Version"
+
+CONNECT_TIMEOUT = float(os.getenv("PRODUCT_CLIENT_CONNECT_TIMEOUT", "0.5"))
+READ_TIMEOUT = float(os.getenv("PRODUCT_CLIENT_READ_TIMEOUT", "2"))
+POOL_SIZE = int(os.getenv("PRODUCT_CLIENT_POOL_SIZE", "50"))
+
+CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "5"))
+CACHE_MAX_ENTRIES = int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "2000"))
+
+# How long the first caller waits for others to join its /products/bulk call
+BATCH_WINDOW_SECONDS = float(os.getenv("PRODUCT_BATCH_WINDOW_MS", "2")) / 1000
+BATCH_MAX_SIZE = int(os.getenv("PRODUCT_BATCH_MAX_SIZE", "200"))
+
+
+class ProductServiceError(Exception):
+    pass
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _build_session()
+
+
+# --------------------
+# Snapshot cache
+# --------------------
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_get(product_id: str):
+    entry = _cache.get(product_id)
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def _cache_put_many(products: dict):
+    expires_at = time.monotonic() + CACHE_TTL_SECONDS
+    with _cache_lock:
+        if len(_cache) + len(products) > CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            for product_id in [k for k, v in _cache.items() if v[1] <= now]:
+                del _cache[product_id]
+            while _cache and len(_cache) + len(products) > CACHE_MAX_ENTRIES:
+                del _cache[next(iter(_cache))]
+        for product_id, product in products.items():
+            _cache[product_id] = (product, expires_at)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# --------------------
+# Request coalescing
+# --------------------
+
+class _Batch:
+    def __init__(self):
+        self.ids = set()
+        self.done = threading.Event()
+        self.products = {}
+        self.error = None
+        # Set when the request is sent; a leader sends its batches in turn
+        self.deadline = None
+
+
+_batch_lock = threading.Lock()
+_open_batch = None
+_inflight = {}  # product_id -> _Batch already sent to product-service
+
+
+def _fetch_bulk(product_ids):
+    try:
+        response = _session.post(
+            PRODUCT_BULK_URL,
+            json={"product_ids": list(product_ids)},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+        )
+    except requests.RequestException as e:
+        raise ProductServiceError(f"Product service unavailable: {str(e)}")
+
+    if response.status_code != 200:
+        raise ProductServiceError(f"Product service returned {response.status_code}")
+
+    return stamp_products(response.json(), response.headers)
+
+
+def stamp_products(products, headers):
+    """
+    Products by id, each tagged with the catalog version its price was read
+    at, and that version.
+    """
+    version = int(headers.get(CATALOG_VERSION_HEADER, 0))
+    return {p["product_id"]: {**p, "catalog_version": version} for p in products}, version
+
+
+def _finish(batch: _Batch, error: Exception = None):
+    global _open_batch
+    if error is not None:
+        batch.error = error
+    with _batch_lock:
+        if _open_batch is batch:
+            _open_batch = None
+        for product_id in batch.ids:
+            if _inflight.get(product_id) is batch:
+                del _inflight[product_id]
+    batch.done.set()
+
+
+def _dispatch(batch: _Batch):
+    batch.deadline = time.monotonic() + CONNECT_TIMEOUT + READ_TIMEOUT
+    error = None
+    try:
+        with observe_outbound("product-service"):
+            batch.products, _ = _fetch_bulk(batch.ids)
+        _cache_put_many(batch.products)
+    except ProductServiceError as e:
+        error = e
+    except Exception as e:
+        # Followers would otherwise read a missing result as "not found"
+        error = ProductServiceError(f"Product lookup failed: {e!r}")
+    finally:
+        _finish(batch, error)
+
+
+def _wait(batch: _Batch):
+    while not batch.done.is_set():
+        if batch.deadline is None:
+            # Not sent yet: its leader is still sending an earlier batch
+            batch.done.wait(BATCH_WINDOW_SECONDS)
+        elif not batch.done.wait(max(0.0, batch.deadline - time.monotonic())):
+            raise ProductServiceError("Timed out waiting for product service")
+    if batch.error:
+        raise batch.error
+
+
+def get_products(product_ids, use_cache: bool = True) -> dict:
+    """
+    Look up many products at once. Cached snapshots are returned directly
+    unless use_cache is False; everything else is merged with concurrent
+    callers into one /products/bulk request. Unknown ids are absent from
+    the result.
+    """
+    result = {}
+    missing = []
+    for product_id in dict.fromkeys(product_ids):
+        product = _cache_get(product_id) if use_cache else None
+        if product is None:
+            missing.append(product_id)
+        else:
+            result[product_id] = product
+
+    if not missing:
+        return result
+
+    global _open_batch
+    waiting = set()
+    leader_batches = []
+    with _batch_lock:
+        for product_id in missing:
+            batch = _inflight.get(product_id)
+            if batch is None:
+                if _open_batch is None or len(_open_batch.ids) >= BATCH_MAX_SIZE:
+                    _open_batch = _Batch()
+                    leader_batches.append(_open_batch)
+                batch = _open_batch
+                batch.ids.add(product_id)
+                _inflight[product_id] = batch
+            waiting.add(batch)
+
+    if leader_batches:
+        try:
+            # Give concurrent callers a moment to join before sending
+            time.sleep(BATCH_WINDOW_SECONDS)
+            with _batch_lock:
+                if _open_batch in leader_batches:
+                    _open_batch = None
+            for batch in leader_batches:
+                _dispatch(batch)
+        finally:
+            # Never leave followers waiting on a batch that will not be sent
+            for batch in leader_batches:
+                if not batch.done.is_set():
+                    _finish(batch, ProductServiceError("Product lookup was cancelled"))
+
+    for batch in waiting:
+        _wait(batch)
+        for product_id in missing:
+            if product_id in batch.products:
+                result[product_id] = batch.products[product_id]
+
+    return result
+
+
+def get_product(product_id: str):
+    return get_products([product_id]).get(product_id)
+
+
+def fetch_products(product_ids):
+    """
+    One uncached /products/bulk call for all of `product_ids`, however many:
+    cart repricing sends a whole batch of carts at once. Returns the products
+    by id and the catalog version they were read at.
+    """
+    with observe_outbound("product-service"):
+        products, version = _fetch_bulk(list(dict.fromkeys(product_ids)))
+    _cache_put_many(products)
+    return products, version
+
+
+def get_catalog_version() -> int:
+    """Current catalog version; cheaper than repricing to find out a cart is still current."""
+    try:
+        with observe_outbound("product-service"):
+            response = _session.get(CATALOG_VERSION_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    except requests.RequestException as e:
+        raise ProductServiceError(f"Product service unavailable: {str(e)}")
+
+    if response.status_code != 200:
+        raise ProductServiceError(f"Product service returned {response.status_code}")
+
+    return response.json()["version"]
@@ -0,0 +1,71 @@
+# app/services/stock_client.py
+# Stock reservations in product-service. Checkout reserves every line in
+# one call; the commit is sent later through the outbox (stock.commit).
+
+import os
+
+import requests
+
+from app.observability import get_logger, observe_outbound
+from app.services.product_client import (
+    PRODUCT_SERVICE_URL,
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    ProductServiceError,
+    _session,
+)
+
+log = get_logger(__name__)
+
+STOCK_SERVICE_URL = os.getenv("STOCK_SERVICE_URL", PRODUCT_SERVICE_URL.rsplit("/", 1)[0] + "/stock")
+STOCK_RESERVE_URL = f"{STOCK_SERVICE_URL}/reserve"
+STOCK_COMMIT_URL = f"{STOCK_SERVICE_URL}/commit"
+STOCK_RELEASE_URL = f"{STOCK_SERVICE_URL}/release"
+
+
+class InsufficientStockError(Exception):
+    pass
+
+
+def reserve_payload(reservation_id: str, items):
+    return {
+        "reservation_id": reservation_id,
+        "items": [{"product_id": i["product_id"], "quantity": i["quantity"]} for i in items]
+    }
+
+
+def check_reserve_response(response):
+    """Works for both requests and httpx responses."""
+    if response.status_code == 409:
+        raise InsufficientStockError(response.json()["detail"]["message"])
+    if response.status_code != 200:
+        raise ProductServiceError(f"Stock reservation failed with {response.status_code}")
+
+
+def reserve_stock(reservation_id: str, items):
+    """Hold stock for every line, or raise InsufficientStockError."""
+    try:
+        with observe_outbound("product-service"):
+            response = _session.post(
+                STOCK_RESERVE_URL,
+                json=reserve_payload(reservation_id, items),
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
+    except requests.RequestException as e:
+        raise ProductServiceError(f"Product service unavailable: {str(e)}")
+    check_reserve_response(response)
+
+
+def release_stock(reservation_id: str):
+    """Best effort: a reservation that isn't released here expires on its own."""
+    try:
+        with observe_outbound("product-service"):
+            _session.post(
+                STOCK_RELEASE_URL,
+                json={"reservation_ids": [reservation_id]},
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
+    except requests.RequestException as e:
+        log.warning("Could not release stock reservation", extra={
+            "reservation_id": reservation_id, "error": str(e)
+        })
@@ -0,0 +1,29 @@
+# app/fast_json.py
+# Fast JSON responses. Deliveries are validated by the request schemas
+# when they are written, so read paths can hand Mongo dicts straight to
+# orjson instead of re-validating them through response_model and walking
+# them with jsonable_encoder. Routes opt in by returning FastJSONResponse;
+# the declared response_model still documents the shape.
+
+import orjson
+from fastapi.responses import Response
+
+
+def _default(value):
+    # ObjectId, Decimal128 and the like
+    return str(value)
+
+
+def encode(content) -> bytes:
+    """JSON bytes; datetimes come out in the same ISO format FastAPI uses."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        # Pre-encoded bodies are sent untouched
+        if isinstance(content, bytes):
+            return content
+        return encode(content)
@@ -0,0 +1,118 @@
+# app/indexes.py
+# Every index delivery-service relies on, and the queries that must use them.
+# Indexes are applied at startup; `python -m app.indexes --check` also
+# explain()s the canonical queries and exits non-zero on any COLLSCAN.
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+INDEXES = {
+    "deliveries": [
+        # One delivery per order: creates upsert on it
+        IndexModel([("order_id", ASCENDING)], unique=True),
+        IndexModel([("delivery_id", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+        IndexModel([("rider_id", ASCENDING), ("created_at", DESCENDING), ("delivery_id", DESCENDING)],
+                   partialFilterExpression={"rider_id": {"$exists": True}}),
+        IndexModel([("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+    ],
+}
+
+# (collection, filter, sort)
+CANONICAL_QUERIES = [
+    ("deliveries", {"order_id": "o1"}, None),
+    ("deliveries", {"order_id": {"$in": ["o1", "o2"]}}, None),
+    ("deliveries", {"delivery_id": "d1"}, None),
+    ("deliveries", {"user_id": "u1"}, [("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+    ("deliveries", {"user_id": "u1", "status": {"$in": ["PACKED"]}},
+     [("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+    ("deliveries", {"rider_id": "r1"}, [("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+    ("deliveries", {"rider_id": "r1", "status": {"$in": ["PACKED", "OUT_FOR_DELIVERY"]}},
+     [("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+    ("deliveries", {}, [("created_at", DESCENDING), ("delivery_id", DESCENDING)]),
+]
+
+
+# --------------------
+# Apply / check
+# --------------------
+
+class IndexBuildError(Exception):
+    pass
+
+
+def _index_batches(models):
+    # A unique index blocked by duplicate data fails its whole
+    # create_indexes call, so each one gets a call of its own
+    shared = [model for model in models if not model.document.get("unique")]
+    if shared:
+        yield shared
+    for model in models:
+        if model.document.get("unique"):
+            yield [model]
+
+
+def apply_indexes(db):
+    """
+    Create every index in INDEXES; existing ones are left untouched. Raises
+    IndexBuildError once the rest are built if any failed, so the startup
+    step keeps retrying and /readyz stays 503 until the data is fixed.
+    """
+    failed = []
+    for collection, models in INDEXES.items():
+        for batch in _index_batches(models):
+            try:
+                db[collection].create_indexes(batch)
+            except OperationFailure as e:
+                names = [model.document["name"] for model in batch]
+                log.error("Could not create indexes", extra={
+                    "collection": collection, "indexes": names, "error": str(e)
+                })
+                failed.extend(f"{collection}.{name}" for name in names)
+    if failed:
+        raise IndexBuildError(f"Could not create indexes: {', '.join(failed)}")
+
+
+def _stages(plan):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+def check_query_plans(db):
+    """explain() each canonical query; returns the ones that still COLLSCAN."""
+    failures = []
+    for collection, query, sort in CANONICAL_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in _stages(plan):
+            failures.append({"collection": collection, "query": query, "sort": sort})
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+    from app.database import db
+
+    try:
+        apply_indexes(db)
+        build_failed = False
+    except IndexBuildError as e:
+        print(e)
+        build_failed = True
+    if "--check" in sys.argv:
+        failures = check_query_plans(db)
+        for failure in failures:
+            print(f"COLLSCAN: {failure}")
+        print(f"{len(CANONICAL_QUERIES) - len(failures)}/{len(CANONICAL_QUERIES)} canonical queries use an index")
+        build_failed = build_failed or bool(failures)
+    sys.exit(1 if build_failed else 0)
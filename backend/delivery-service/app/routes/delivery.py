@@ -1,26 +1,200 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import CreateDeliveryRequest, UpdateStatusRequest
-from app.services.delivery_service import (
-    create_delivery,
-    get_deliveries,
-    update_delivery_status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from app import status_flow
+from app.fast_json import FastJSONResponse
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.schemas import (
+    DeliveryCreate, DeliveryBatchCreate, DeliveryStatusUpdate, DeliveryStatusBatchUpdate, RiderAssignment
 )
+from app.services import delivery_service
+from app.tracking import tracking_hub, sse_stream, status_event, TooManySubscribers
 
 router = APIRouter()
 
-@router.post("/create")
-def create(request: CreateDeliveryRequest):
+
+def _list(user_id=None, rider_id=None, statuses=None, limit=DEFAULT_PAGE_SIZE, after=None, stream=False):
+    try:
+        if stream:
+            return StreamingResponse(
+                delivery_service.stream_deliveries(user_id, rider_id, statuses, after),
+                media_type="application/x-ndjson"
+            )
+        return FastJSONResponse(delivery_service.get_deliveries(user_id, rider_id, statuses, limit, after))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/delivery/create", status_code=201)
+def create_delivery(delivery: DeliveryCreate):
+    """
+    Create a delivery for a given order. Creating it again returns 200 with
+    the existing delivery_id.
+    """
+    created, is_new = delivery_service.create_delivery(delivery.order_id, delivery.user_id)
+    if not is_new:
+        return JSONResponse(
+            {"message": "Delivery already exists", "delivery_id": created["delivery_id"]}
+        )
+    return FastJSONResponse(created, status_code=201)
+
+
+@router.post("/delivery/batch-create", status_code=201)
+def create_deliveries(batch: DeliveryBatchCreate):
+    """
+    Create deliveries for many orders at once. Orders that already have a
+    delivery are reported as existing, so retried batches are safe; like
+    /delivery/create, a batch that creates nothing returns 200.
+    """
+    result = delivery_service.create_deliveries((d.order_id, d.user_id) for d in batch.deliveries)
+    return JSONResponse(result, status_code=201 if result["created"] else 200)
+
+
+@router.get("/deliveries")
+def list_deliveries(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    """
+    List deliveries, newest first, one page at a time. Pass the returned
+    `next_after` to fetch the next page, or `stream=true` for all of them
+    as NDJSON.
+    """
+    return _list(limit=limit, after=after, stream=stream)
+
+
+@router.get("/deliveries/user/{user_id}")
+def list_user_deliveries(
+    user_id: str,
+    status: Optional[List[str]] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    """A user's deliveries, newest first; `status` may be repeated."""
+    return _list(user_id=user_id, statuses=status, limit=limit, after=after, stream=stream)
+
+
+@router.get("/deliveries/rider/{rider_id}")
+def list_rider_deliveries(
+    rider_id: str,
+    status: Optional[List[str]] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    """Deliveries assigned to a rider, newest first; `status` may be repeated."""
+    return _list(rider_id=rider_id, statuses=status, limit=limit, after=after, stream=stream)
+
+
+@router.get("/delivery/{order_id}/status")
+def get_delivery_status(order_id: str):
+    """
+    Get current status of a delivery by order_id.
+    """
+    delivery = delivery_service.get_delivery(order_id, {"_id": 0, "order_id": 1, "status": 1})
+    if not delivery:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return {"order_id": delivery["order_id"], "status": delivery["status"]}
+
+
+@router.get("/delivery/{order_id}/events")
+async def stream_delivery_status(order_id: str):
+    """
+    Server-sent events for one delivery: the current status first, then
+    every change until it is delivered. Idle streams get a `: ping` comment
+    every TRACKING_HEARTBEAT_SECONDS.
+    """
     try:
-        return create_delivery(request.order_id, request.user_id)
-    except Exception as e:
+        subscription = tracking_hub.subscribe(order_id)
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Subscribed before reading, so a change in between is not missed
+    delivery = await run_in_threadpool(
+        delivery_service.get_delivery, order_id, {"_id": 0, "status": 1, "updated_at": 1}
+    )
+    if not delivery:
+        tracking_hub.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    subscription.offer(status_event(order_id, delivery["status"], delivery.get("updated_at")))
+
+    return StreamingResponse(
+        sse_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/tracking/stats")
+def tracking_stats():
+    return tracking_hub.stats()
+
+
+@router.get("/delivery/{order_id}/history")
+def get_delivery_history(order_id: str):
+    """
+    Get every status a delivery has been through, oldest first.
+    """
+    delivery = delivery_service.get_delivery(
+        order_id, {"_id": 0, "order_id": 1, "status": 1, "status_history": 1}
+    )
+    if not delivery:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return {
+        "order_id": delivery["order_id"],
+        "status": delivery["status"],
+        "status_history": delivery.get("status_history", [])
+    }
+
+
+@router.post("/delivery/{order_id}/assign")
+def assign_rider(order_id: str, assignment: RiderAssignment):
+    """
+    Assign (or reassign) the rider carrying a delivery.
+    """
+    delivery = delivery_service.assign_rider(order_id, assignment.rider_id)
+    if not delivery:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return delivery
+
+
+@router.post("/delivery/{order_id}/update-status")
+def update_delivery_status(order_id: str, update: DeliveryStatusUpdate):
+    """
+    Move a delivery to the next status. Repeating the current status is a
+    no-op; skipping or going back a step is rejected with 409.
+    """
+    try:
+        delivery = status_flow.advance(order_id, update.status)
+    except status_flow.InvalidStatus as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except status_flow.DeliveryNotFound:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    except status_flow.IllegalTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
+    tracking_hub.publish(order_id, delivery["status"], delivery.get("updated_at"))
+    return {"order_id": order_id, "status": delivery["status"]}
 
-@router.get("/{user_id}")
-def fetch(user_id: str):
-    return get_deliveries(user_id)
 
+@router.post("/delivery/batch-update-status")
+def update_delivery_statuses(batch: DeliveryStatusBatchUpdate):
+    """
+    Apply up to 500 status changes at once, e.g. a packing station's scans.
+    Each change is checked like a single update; the response lists which
+    were updated, already at that status, not found or rejected (with why).
+    """
+    changes = {u.order_id: u.status for u in batch.updates}
+    try:
+        results = status_flow.advance_many([(u.order_id, u.status) for u in batch.updates])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.put("/update-status")
-def update(request: UpdateStatusRequest):
-    return update_delivery_status(request.delivery_id, request.status)
\ No newline at end of file
+    now = datetime.utcnow()
+    for order_id in results["updated"]:
+        tracking_hub.publish(order_id, changes[order_id], now)
+    return results
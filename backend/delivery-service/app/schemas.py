@@ -1,10 +1,28 @@
 # app/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 
 class DeliveryCreate(BaseModel):
     order_id: str
     user_id: str
 
 
+class DeliveryBatchCreate(BaseModel):
+    deliveries: List[DeliveryCreate]
+
+
 class DeliveryStatusUpdate(BaseModel):
-    status: str
\ No newline at end of file
+    status: str
+
+
+class DeliveryStatusChange(BaseModel):
+    order_id: str
+    status: str
+
+
+class DeliveryStatusBatchUpdate(BaseModel):
+    updates: List[DeliveryStatusChange] = Field(min_length=1, max_length=500)
+
+
+class RiderAssignment(BaseModel):
+    rider_id: str = Field(min_length=1)
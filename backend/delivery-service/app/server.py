@@ -0,0 +1,123 @@
+# app/server.py
+# Production entry point: gunicorn supervising uvicorn workers.
+#
+#   python -m app.server
+#
+# One worker per CPU this container may use (WEB_CONCURRENCY overrides).
+# The app is imported once in the master and forked, so workers share its
+# code and module data copy-on-write; the Mongo client is created with
+# connect=False, so nothing is connected before the fork. On SIGTERM the
+# master stops accepting, in-flight requests get GRACEFUL_TIMEOUT seconds
+# to finish, then shutdown hooks run. Workers are replaced after
+# MAX_REQUESTS requests (plus jitter, so they do not all restart at once).
+# Each worker writes its Prometheus metrics to files under
+# PROMETHEUS_MULTIPROC_DIR and /metrics, whichever worker serves it,
+# reports them all merged.
+# For local development use `uvicorn app.main:app --reload` instead.
+
+import gc
+import glob
+import math
+import os
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+
+
+def _cgroup_cpu_quota():
+    """CPUs allowed by a container CPU limit, or None if unlimited."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as q, open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as p:
+            quota = int(q.read())
+            return quota / int(p.read()) if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "0")) or available_cpus()
+BIND = os.getenv("BIND", "0.0.0.0:8000")
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "10000"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", str(MAX_REQUESTS // 10)))
+KEEPALIVE_SECONDS = int(os.getenv("KEEPALIVE_SECONDS", "5"))
+
+
+def when_ready(server):
+    # Runs in the master just before the first fork. Frozen objects are
+    # skipped by the collector, so it never writes to (and un-shares) them.
+    gc.freeze()
+
+
+def prepare_metrics_dir():
+    # Must run before the app, and so prometheus_client, is imported
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.path.join(tempfile.gettempdir(), f"metrics-{os.getpid()}")
+    os.makedirs(path, exist_ok=True)
+    _clear_metrics(path)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+
+def _clear_metrics(path):
+    for name in glob.glob(os.path.join(path, "*.db")):
+        os.remove(name)
+
+
+def child_exit(server, worker):
+    # Drop the worker's live gauges (in-flight requests, pool checkouts);
+    # its counters and histograms stay in the totals
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    _clear_metrics(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+class Server(BaseApplication):
+    def __init__(self, options):
+        prepare_metrics_dir()
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+
+def options():
+    return {
+        "bind": BIND,
+        "workers": WORKERS,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "max_requests": MAX_REQUESTS,
+        "max_requests_jitter": MAX_REQUESTS_JITTER,
+        "keepalive": KEEPALIVE_SECONDS,
+        "when_ready": when_ready,
+        "child_exit": child_exit,
+        "on_exit": on_exit,
+        "accesslog": None,
+    }
+
+
+if __name__ == "__main__":
+    Server(options()).run()
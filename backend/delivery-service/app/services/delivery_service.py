@@ -1,42 +1,130 @@
-from app.database import db
-from datetime import datetime
+# app/services/delivery_service.py
+# Creating and reading deliveries. order_id is unique, so a create is one
+# upsert that inserts the delivery or returns the one already there;
+# retries and concurrent creates for the same order cannot duplicate it.
+# Status changes live in app/status_flow.py.
+
 import uuid
+from datetime import datetime
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.database import db
+from app.pagination import paginate, stream_ndjson, DEFAULT_PAGE_SIZE
+from app.status_flow import STATUS_FLOW, history_entry
 
 DELIVERY_COLLECTION = db["deliveries"]
 
-def create_delivery(order_id: str, user_id: str):
-    delivery = {
+# Newest first; delivery_id breaks ties between deliveries created in the same ms
+DELIVERY_SORT = [("created_at", -1), ("delivery_id", -1)]
+
+DUPLICATE_KEY = 11000
+
+
+def _new_delivery(user_id: str, now: datetime):
+    """Fields set when a delivery is first inserted (order_id comes from the filter)."""
+    return {
         "delivery_id": str(uuid.uuid4()),
-        "order_id": order_id,
         "user_id": user_id,
-        "status": "CREATED",
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "status": STATUS_FLOW[0],
+        "status_history": [history_entry(STATUS_FLOW[0], now)],
+        "created_at": now,
+        "updated_at": now
     }
 
-    DELIVERY_COLLECTION.insert_one(delivery)
-    delivery.pop("_id", None)
-    return delivery
 
+def create_delivery(order_id: str, user_id: str):
+    """Returns (delivery, created); an order that already has one gets it back."""
+    fields = _new_delivery(user_id, datetime.utcnow())
+    for attempt in range(2):
+        try:
+            delivery = DELIVERY_COLLECTION.find_one_and_update(
+                {"order_id": order_id},
+                {"$setOnInsert": fields},
+                projection={"_id": 0},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return delivery, delivery["delivery_id"] == fields["delivery_id"]
+        except DuplicateKeyError:
+            # Two upserts raced to insert; the loser finds the winner's
+            if attempt:
+                raise
 
-def get_deliveries(user_id: str):
-    return list(
-        DELIVERY_COLLECTION.find(
-            {"user_id": user_id},
-            {"_id": 0}
-        )
-    )
 
+def create_deliveries(deliveries):
+    """
+    Upsert many (order_id, user_id) pairs in one bulk write. Returns
+    {"created": {order_id: delivery_id}, "existing": {order_id: delivery_id}}.
+    """
+    now = datetime.utcnow()
+    requested = {}
+    for order_id, user_id in deliveries:
+        requested[order_id] = _new_delivery(user_id, now)
+    if not requested:
+        return {"created": {}, "existing": {}}
 
-def update_delivery_status(delivery_id: str, status: str):
-    DELIVERY_COLLECTION.update_one(
-        {"delivery_id": delivery_id},
-        {
-            "$set": {
-                "status": status,
-                "updated_at": datetime.utcnow()
-            }
+    order_ids = list(requested)
+    ops = [
+        UpdateOne({"order_id": order_id}, {"$setOnInsert": fields}, upsert=True)
+        for order_id, fields in requested.items()
+    ]
+    try:
+        upserted = DELIVERY_COLLECTION.bulk_write(ops, ordered=False).upserted_ids
+    except BulkWriteError as e:
+        # Lost a race on some order_ids; anything else is a real failure
+        if any(err["code"] != DUPLICATE_KEY for err in e.details["writeErrors"]):
+            raise
+        upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+
+    created = {order_ids[i]: requested[order_ids[i]]["delivery_id"] for i in upserted}
+    existing = {}
+    if len(created) < len(order_ids):
+        existing = {
+            d["order_id"]: d["delivery_id"]
+            for d in DELIVERY_COLLECTION.find(
+                {"order_id": {"$in": [o for o in order_ids if o not in created]}},
+                {"_id": 0, "order_id": 1, "delivery_id": 1}
+            )
         }
+    return {"created": created, "existing": existing}
+
+
+def get_delivery(order_id: str, projection=None):
+    return DELIVERY_COLLECTION.find_one({"order_id": order_id}, projection or {"_id": 0})
+
+
+def assign_rider(order_id: str, rider_id: str):
+    """Returns the updated delivery, or None if there is no such delivery."""
+    return DELIVERY_COLLECTION.find_one_and_update(
+        {"order_id": order_id},
+        {"$set": {"rider_id": rider_id, "updated_at": datetime.utcnow()}},
+        projection={"_id": 0, "order_id": 1, "rider_id": 1, "status": 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _query(user_id: str = None, rider_id: str = None, statuses=None):
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if rider_id:
+        query["rider_id"] = rider_id
+    if statuses:
+        query["status"] = {"$in": statuses}
+    return query
+
+
+def get_deliveries(user_id: str = None, rider_id: str = None, statuses=None,
+                   limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """One page of deliveries, newest first, optionally for one user or rider."""
+    return paginate(
+        DELIVERY_COLLECTION, _query(user_id, rider_id, statuses), DELIVERY_SORT, limit, after, {"_id": 0}
     )
 
-    return {"message": "Delivery status updated"}
\ No newline at end of file
+
+def stream_deliveries(user_id: str = None, rider_id: str = None, statuses=None, after: str = None):
+    return stream_ndjson(
+        DELIVERY_COLLECTION, _query(user_id, rider_id, statuses), DELIVERY_SORT, after, {"_id": 0}
+    )
@@ -0,0 +1,137 @@
+# app/status_flow.py
+# Delivery status transitions. A delivery only moves one step forward
+# through STATUS_FLOW, and each move is a single conditional update on the
+# status it is coming from, so concurrent updates cannot skip, repeat or
+# reverse a step. Every move is appended to the delivery's status_history.
+
+from collections import defaultdict
+from datetime import datetime
+
+from pymongo import ReturnDocument, UpdateMany
+
+from app.database import db
+
+DELIVERY_COLLECTION = db["deliveries"]
+
+# Order status flow
+STATUS_FLOW = ["CREATED", "PLACED", "PACKED", "OUT_FOR_DELIVERY", "DELIVERED"]
+# status -> the only status it may be reached from
+PREVIOUS_STATUS = dict(zip(STATUS_FLOW[1:], STATUS_FLOW))
+
+STATUS_PROJECTION = {"_id": 0, "order_id": 1, "status": 1, "updated_at": 1}
+
+
+class InvalidStatus(Exception):
+    def __init__(self, status: str):
+        super().__init__(f"Invalid status: {status}")
+
+
+class DeliveryNotFound(Exception):
+    pass
+
+
+class IllegalTransition(Exception):
+    def __init__(self, current: str, status: str):
+        super().__init__(f"Cannot move delivery from {current} to {status}")
+
+
+def history_entry(status: str, at: datetime):
+    return {"status": status, "at": at}
+
+
+def _advance_update(status: str, now: datetime):
+    return {
+        "$set": {"status": status, "updated_at": now},
+        "$push": {"status_history": history_entry(status, now)}
+    }
+
+
+def advance(order_id: str, status: str):
+    """
+    Move one delivery to `status`. Setting the status it already has is a
+    no-op, so retried scans are safe.
+    """
+    if status not in STATUS_FLOW:
+        raise InvalidStatus(status)
+
+    previous = PREVIOUS_STATUS.get(status)
+    if previous:
+        delivery = DELIVERY_COLLECTION.find_one_and_update(
+            {"order_id": order_id, "status": previous},
+            _advance_update(status, datetime.utcnow()),
+            projection=STATUS_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if delivery:
+            return delivery
+
+    # Not applied: work out why
+    current = DELIVERY_COLLECTION.find_one({"order_id": order_id}, STATUS_PROJECTION)
+    if not current:
+        raise DeliveryNotFound(order_id)
+    if current["status"] != status:
+        raise IllegalTransition(current["status"], status)
+    return current
+
+
+def advance_many(changes):
+    """
+    Apply many (order_id, status) changes with one read and one bulk write.
+    Each order_id may appear once. Returns {"updated", "unchanged",
+    "not_found", "rejected": {order_id: reason}}.
+    """
+    results = {"updated": [], "unchanged": [], "not_found": [], "rejected": {}}
+
+    wanted = {}
+    for order_id, status in changes:
+        if order_id in wanted or order_id in results["rejected"]:
+            raise ValueError(f"Duplicate order_id in batch: {order_id}")
+        if status not in STATUS_FLOW:
+            results["rejected"][order_id] = str(InvalidStatus(status))
+        else:
+            wanted[order_id] = status
+    if not wanted:
+        return results
+
+    # 1️⃣ Check every change against the current status
+    current = {
+        d["order_id"]: d["status"]
+        for d in DELIVERY_COLLECTION.find({"order_id": {"$in": list(wanted)}}, STATUS_PROJECTION)
+    }
+    by_status = defaultdict(list)
+    for order_id, status in wanted.items():
+        have = current.get(order_id)
+        if have is None:
+            results["not_found"].append(order_id)
+        elif have == status:
+            results["unchanged"].append(order_id)
+        elif PREVIOUS_STATUS.get(status) != have:
+            results["rejected"][order_id] = str(IllegalTransition(have, status))
+        else:
+            by_status[status].append(order_id)
+    if not by_status:
+        return results
+
+    # 2️⃣ One conditional update per target status
+    now = datetime.utcnow()
+    result = DELIVERY_COLLECTION.bulk_write([
+        UpdateMany({"order_id": {"$in": ids}, "status": PREVIOUS_STATUS[status]}, _advance_update(status, now))
+        for status, ids in by_status.items()
+    ], ordered=False)
+
+    candidates = [order_id for ids in by_status.values() for order_id in ids]
+    if result.modified_count == len(candidates):
+        results["updated"] += candidates
+        return results
+
+    # 3️⃣ A concurrent update got to some of them first: re-check those
+    after = {
+        d["order_id"]: d["status"]
+        for d in DELIVERY_COLLECTION.find({"order_id": {"$in": candidates}}, STATUS_PROJECTION)
+    }
+    for order_id in candidates:
+        if after.get(order_id) == wanted[order_id]:
+            results["updated"].append(order_id)
+        else:
+            results["rejected"][order_id] = str(IllegalTransition(after.get(order_id), wanted[order_id]))
+    return results
@@ -0,0 +1,215 @@
+# app/tracking.py
+# Push delivery status to clients instead of having them poll. Each open
+# GET /delivery/{order_id}/events stream is a Subscription registered under
+# its order_id in the process-wide TrackingHub. Status changes reach the hub
+# from the update routes on this pod and, when Mongo supports change
+# streams, from a watcher thread that sees updates made by every pod.
+#
+# A subscription is a small bounded buffer plus an asyncio.Event; it costs
+# nothing while idle apart from a heartbeat every HEARTBEAT_SECONDS.
+# Statuses only move forward, so events that are not newer than the last
+# one queued are dropped, which also de-duplicates the two feeds.
+
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+
+from prometheus_client import Counter, Gauge
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.database import db
+from app.observability import get_logger
+from app.status_flow import STATUS_FLOW
+
+log = get_logger(__name__)
+
+HEARTBEAT_SECONDS = float(os.getenv("TRACKING_HEARTBEAT_SECONDS", "15"))
+MAX_SUBSCRIBERS = int(os.getenv("TRACKING_MAX_SUBSCRIBERS", "50000"))
+BUFFER_SIZE = int(os.getenv("TRACKING_BUFFER_SIZE", "8"))
+# Client reconnect delay sent in the stream
+RETRY_MS = 5000
+
+STATUS_RANK = {status: rank for rank, status in enumerate(STATUS_FLOW)}
+FINAL_STATUS = STATUS_FLOW[-1]
+
+SUBSCRIBERS = Gauge("tracking_subscribers", "Open delivery tracking streams", multiprocess_mode="livesum")
+EVENTS_SENT = Counter("tracking_events_total", "Status events queued to tracking streams")
+EVENTS_DROPPED = Counter("tracking_events_dropped_total", "Events dropped from full stream buffers")
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+def status_event(order_id: str, status: str, at: datetime):
+    return {"order_id": order_id, "status": status, "at": at}
+
+
+class Subscription:
+    __slots__ = ("order_id", "events", "ready", "last_rank")
+
+    def __init__(self, order_id: str, buffer_size: int):
+        self.order_id = order_id
+        self.events = deque(maxlen=buffer_size)
+        self.ready = asyncio.Event()
+        self.last_rank = -1
+
+    def offer(self, event: dict):
+        """Queue an event; must run on the event loop."""
+        rank = STATUS_RANK.get(event["status"], -1)
+        if rank <= self.last_rank:
+            return
+        self.last_rank = rank
+        if len(self.events) == self.events.maxlen:
+            # Slow reader: keep the newest statuses
+            EVENTS_DROPPED.inc()
+        self.events.append(event)
+        EVENTS_SENT.inc()
+        self.ready.set()
+
+    async def next_events(self, timeout: float):
+        """Everything queued since the last call, or [] after `timeout`."""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+
+class TrackingHub:
+    """Per-order registry of open tracking streams for this process."""
+
+    def __init__(self, max_subscribers: int = MAX_SUBSCRIBERS, buffer_size: int = BUFFER_SIZE):
+        self.max_subscribers = max_subscribers
+        self.buffer_size = buffer_size
+        self.mode = "local"
+        self._subscriptions = defaultdict(set)
+        self._count = 0
+        self._loop = None
+        self.published = 0
+
+    def subscribe(self, order_id: str) -> Subscription:
+        """Register a stream; must run on the event loop."""
+        if self._count >= self.max_subscribers:
+            raise TooManySubscribers("Too many tracking streams, poll the status instead")
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(order_id, self.buffer_size)
+        self._subscriptions[order_id].add(subscription)
+        self._count += 1
+        SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.order_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.order_id]
+        self._count -= 1
+        SUBSCRIBERS.dec()
+
+    def publish(self, order_id: str, status: str, at: datetime):
+        """Fan a status change out to the order's streams; safe from any thread."""
+        if self._loop is None or order_id not in self._subscriptions:
+            return
+        self.published += 1
+        self._loop.call_soon_threadsafe(self._deliver, status_event(order_id, status, at))
+
+    def _deliver(self, event: dict):
+        for subscription in list(self._subscriptions.get(event["order_id"], ())):
+            subscription.offer(event)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "subscribers": self._count,
+            "orders": len(self._subscriptions),
+            "published": self.published,
+        }
+
+
+tracking_hub = TrackingHub()
+
+
+def sse_message(event: dict) -> str:
+    return f"event: status\ndata: {json.dumps(event, default=datetime.isoformat)}\n\n"
+
+
+async def sse_stream(subscription: Subscription):
+    """Yield SSE messages until the delivery is complete or the client leaves."""
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            events = await subscription.next_events(HEARTBEAT_SECONDS)
+            if not events:
+                yield ": ping\n\n"
+                continue
+            for event in events:
+                yield sse_message(event)
+            if events[-1]["status"] == FINAL_STATUS:
+                return
+    finally:
+        tracking_hub.unsubscribe(subscription)
+
+
+# --------------------
+# Change stream feed
+# --------------------
+
+_stop_event = threading.Event()
+_watcher_thread = None
+
+
+def _watch_change_stream():
+    pipeline = [
+        {"$match": {
+            "operationType": "update",
+            "updateDescription.updatedFields.status": {"$exists": True}
+        }},
+        {"$project": {"fullDocument.order_id": 1, "updateDescription.updatedFields": 1}},
+    ]
+    with db["deliveries"].watch(pipeline, full_document="updateLookup", max_await_time_ms=1000) as stream:
+        tracking_hub.mode = "change_stream"
+        while not _stop_event.is_set() and stream.alive:
+            change = stream.try_next()
+            if change is None or not change.get("fullDocument"):
+                continue
+            fields = change["updateDescription"]["updatedFields"]
+            tracking_hub.publish(
+                change["fullDocument"]["order_id"], fields["status"], fields.get("updated_at")
+            )
+
+
+def _run_watcher():
+    while not _stop_event.is_set():
+        try:
+            _watch_change_stream()
+        except OperationFailure as e:
+            # Standalone mongod: only this pod's own updates are pushed
+            log.info("Change streams unavailable, tracking local updates only", extra={"error": str(e)})
+            tracking_hub.mode = "local"
+            return
+        except PyMongoError as e:
+            log.warning("Delivery change stream interrupted", extra={"error": str(e)})
+            tracking_hub.mode = "local"
+        _stop_event.wait(1)
+
+
+def start_tracking_watcher():
+    global _watcher_thread
+    if _watcher_thread is not None and _watcher_thread.is_alive():
+        return
+    _stop_event.clear()
+    _watcher_thread = threading.Thread(target=_run_watcher, name="tracking-watcher", daemon=True)
+    _watcher_thread.start()
+
+
+def stop_tracking_watcher():
+    _stop_event.set()
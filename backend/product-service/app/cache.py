@@ -0,0 +1,215 @@
+# app/cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.database import db
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "10000"))
+VERSION_POLL_SECONDS = float(os.getenv("CATALOG_VERSION_POLL_SECONDS", "2"))
+
+META_COLLECTION = db["catalog_meta"]
+CATALOG_META_ID = "catalog"
+
+_MISSING = object()
+
+
+class CatalogCache:
+    """
+    Read-through LRU cache for catalog reads.
+    Entries expire after `ttl` seconds and are dropped wholesale whenever the
+    catalog changes (see `invalidate`).
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.mode = "stopped"
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Catalog version the entries were preloaded at (app/server.py)
+        self.preloaded_version = None
+        self._listeners = []
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        return default
+
+    def set(self, key, value, generation: int = None):
+        with self._lock:
+            # A load that started before an invalidation must not repopulate
+            # the cache with pre-change data.
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        generation = self.generation
+        value = loader()
+        if value is not None:
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+            self.preloaded_version = None
+        for listener in self._listeners:
+            listener()
+
+    def on_invalidate(self, listener):
+        """Call `listener()` after every invalidation, e.g. to rebuild derived data."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "generation": self.generation,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+catalog_cache = CatalogCache()
+
+
+# --------------------
+# Catalog version
+# --------------------
+
+def get_catalog_version() -> int:
+    meta = META_COLLECTION.find_one({"_id": CATALOG_META_ID})
+    return meta["version"] if meta else 0
+
+
+def current_catalog_version() -> int:
+    """The catalog version, cached like any other catalog read and dropped on every invalidation."""
+    return catalog_cache.get_or_load("catalog_version", get_catalog_version)
+
+
+def bump_catalog_version() -> int:
+    """
+    Call after any write to the products collection. Other pods pick the
+    new version up through the watcher below.
+    """
+    meta = META_COLLECTION.find_one_and_update(
+        {"_id": CATALOG_META_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    catalog_cache.invalidate()
+    return meta["version"]
+
+
+# --------------------
+# Invalidation watcher
+# --------------------
+
+_stop_event = threading.Event()
+_watcher_thread = None
+
+
+def _watch_change_stream():
+    pipeline = [{"$match": {"ns.coll": {"$in": ["products", META_COLLECTION.name]}}}]
+    with db.watch(pipeline, max_await_time_ms=1000) as stream:
+        catalog_cache.mode = "change_stream"
+        # Anything cached before the stream was open may already be stale,
+        # unless it was preloaded at the version that is still current
+        if catalog_cache.preloaded_version != get_catalog_version():
+            catalog_cache.invalidate()
+        while not _stop_event.is_set() and stream.alive:
+            if stream.try_next() is not None:
+                catalog_cache.invalidate()
+
+
+def _poll_catalog_version():
+    catalog_cache.mode = "polling"
+    last_version = get_catalog_version()
+    if catalog_cache.preloaded_version not in (None, last_version):
+        catalog_cache.invalidate()
+    while not _stop_event.wait(VERSION_POLL_SECONDS):
+        try:
+            version = get_catalog_version()
+        except PyMongoError as e:
+            log.warning("Catalog version poll failed", extra={"error": str(e)})
+            continue
+        if version != last_version:
+            last_version = version
+            catalog_cache.invalidate()
+
+
+def _run_watcher():
+    while not _stop_event.is_set():
+        try:
+            _watch_change_stream()
+        except OperationFailure as e:
+            # Standalone mongod: change streams are unavailable, fall back
+            # to polling the catalog version counter.
+            log.info("Change streams unavailable, polling catalog version", extra={"error": str(e)})
+            try:
+                _poll_catalog_version()
+            except PyMongoError as e:
+                log.warning("Catalog version polling stopped", extra={"error": str(e)})
+        except PyMongoError as e:
+            log.warning("Catalog change stream interrupted", extra={"error": str(e)})
+            catalog_cache.invalidate()
+        _stop_event.wait(1)
+    catalog_cache.mode = "stopped"
+
+
+def start_catalog_watcher():
+    global _watcher_thread
+    if _watcher_thread is not None and _watcher_thread.is_alive():
+        return
+    _stop_event.clear()
+    _watcher_thread = threading.Thread(target=_run_watcher, name="catalog-watcher", daemon=True)
+    _watcher_thread.start()
+
+
+def stop_catalog_watcher():
+    _stop_event.set()
@@ -0,0 +1,162 @@
+# app/catalog_import.py
+# Streaming catalog import: CSV or NDJSON rows are validated against the
+# product schema and upserted in batches keyed on product_id. Used by the
+# seeder, POST /products/import and `python -m app.catalog_import FILE`.
+
+import csv
+import json
+import os
+from datetime import datetime
+from itertools import islice
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.cache import bump_catalog_version
+from app.database import db
+from app.schemas import Product, ProductUpdate
+from app.stock import ensure_stock_rows
+
+IMPORT_BATCH_SIZE = int(os.getenv("CATALOG_IMPORT_BATCH_SIZE", "1000"))
+# POST /products/import requires it in the X-Import-Token header, and is
+# disabled while it is unset
+IMPORT_TOKEN = os.getenv("CATALOG_IMPORT_TOKEN")
+# Per-batch error details beyond this are only counted
+MAX_ERRORS_PER_BATCH = 20
+
+FORMATS = ("csv", "ndjson")
+
+
+def read_rows(lines, fmt: str):
+    """Yield (row_number, dict or error string) from an iterable of text lines."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            # Empty cells mean "not provided", which matters for partial feeds
+            yield number, {k: v for k, v in row.items() if k and v not in (None, "")}
+    elif fmt == "ndjson":
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, f"Invalid JSON: {str(e)}"
+    else:
+        raise ValueError(f"Unsupported format {fmt}, expected one of {', '.join(FORMATS)}")
+
+
+def format_for(filename: str) -> str:
+    return "csv" if filename.lower().endswith(".csv") else "ndjson"
+
+
+def _build_ops(rows, partial: bool, now: datetime):
+    """Validate a batch of rows; returns ({product_id: (row_number, op)}, errors)."""
+    schema = ProductUpdate if partial else Product
+    ops = {}
+    errors = []
+    for number, row in rows:
+        if isinstance(row, str):
+            errors.append({"row": number, "error": row})
+            continue
+        try:
+            product = schema.model_validate(row)
+        except ValidationError as e:
+            first = e.errors(include_url=False)[0]
+            field = ".".join(str(part) for part in first["loc"])
+            errors.append({"row": number, "error": f"{field}: {first['msg']}"})
+            continue
+
+        fields = product.model_dump(exclude_none=partial)
+        # A later row for the same product in the batch wins
+        ops[product.product_id] = (number, UpdateOne(
+            {"product_id": product.product_id},
+            {"$set": fields, "$setOnInsert": {"created_at": now}},
+            upsert=not partial
+        ))
+    return ops, errors
+
+
+def _write_batch(ops: dict):
+    numbers = [number for number, _ in ops.values()]
+    requests = [op for _, op in ops.values()]
+    try:
+        result = db.products.bulk_write(requests, ordered=False)
+        details = result.bulk_api_result
+        errors = []
+    except BulkWriteError as e:
+        details = e.details
+        errors = [
+            {"row": numbers[err["index"]], "error": err["errmsg"]}
+            for err in details.get("writeErrors", [])
+        ]
+    return {
+        "upserted": details.get("nUpserted", 0),
+        "matched": details.get("nMatched", 0),
+        "modified": details.get("nModified", 0),
+    }, errors
+
+
+def import_rows(rows, partial: bool = False, batch_size: int = IMPORT_BATCH_SIZE):
+    """
+    Upsert (row_number, row) pairs in batches. Yields one progress report
+    per batch and a final summary; the catalog version is bumped once at
+    the end if anything changed.
+    """
+    totals = {"rows": 0, "upserted": 0, "matched": 0, "modified": 0, "error_count": 0}
+    rows = iter(rows)
+    batch_number = 0
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        batch_number += 1
+
+        ops, errors = _build_ops(batch, partial, datetime.utcnow())
+        counts = {"upserted": 0, "matched": 0, "modified": 0}
+        if ops:
+            counts, write_errors = _write_batch(ops)
+            errors += write_errors
+
+        totals["rows"] += len(batch)
+        totals["error_count"] += len(errors)
+        for key, value in counts.items():
+            totals[key] += value
+
+        yield {
+            "batch": batch_number,
+            "rows": len(batch),
+            **counts,
+            "error_count": len(errors),
+            "errors": errors[:MAX_ERRORS_PER_BATCH]
+        }
+
+    if totals["upserted"]:
+        # New products start with the default stock level
+        totals["stock_rows_created"] = ensure_stock_rows()
+    if totals["upserted"] or totals["modified"]:
+        totals["catalog_version"] = bump_catalog_version()
+    yield {"done": True, **totals}
+
+
+def import_lines(lines, fmt: str, partial: bool = False, batch_size: int = IMPORT_BATCH_SIZE):
+    return import_rows(read_rows(lines, fmt), partial, batch_size)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Import a CSV/NDJSON catalog file")
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--partial", action="store_true",
+                        help="rows update existing products only, missing fields are kept")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with open(args.file, newline="", encoding="utf-8-sig") as f:
+        for report in import_lines(f, args.format or format_for(args.file), args.partial, args.batch_size):
+            print(json.dumps(report, default=str))
+    sys.exit(1 if report["error_count"] else 0)
@@ -1,11 +1,10 @@
-from pymongo import MongoClient
 import os
 
+from app.lifecycle import create_client
+
 MONGO_URL = os.getenv("MONGO_URL")
 if not MONGO_URL:
     raise ValueError("MONGO_URL is not set")
-client = MongoClient(MONGO_URL)
-db = client.get_database()
-
-# Ensure unique product_id
-db.products.create_index("product_id", unique=True)
\ No newline at end of file
+# Pool limits and timeouts live in app/lifecycle.py; no I/O happens here
+client = create_client(MONGO_URL)
+db = client.get_database()
\ No newline at end of file
@@ -0,0 +1,45 @@
+# app/http_cache.py
+# Conditional GET: ETags, If-None-Match -> 304 and Cache-Control headers.
+# Catalog responses are tagged with the catalog version, so a client that
+# already has the current catalog gets a bodyless 304 without the server
+# loading or serialising anything.
+
+import os
+
+from fastapi import Request, Response
+
+from app.cache import current_catalog_version
+
+CATALOG_MAX_AGE_SECONDS = int(os.getenv("CATALOG_MAX_AGE_SECONDS", "30"))
+CATALOG_CACHE_CONTROL = f"public, max-age={CATALOG_MAX_AGE_SECONDS}"
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+
+def etag_for(value) -> str:
+    # Weak: the same ETag covers gzip and identity encodings
+    return f'W/"{value}"'
+
+
+def matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str):
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
+
+
+def catalog_etag() -> str:
+    # Read before the data it tags, so the body is never older than the tag
+    return etag_for(f"catalog-{current_catalog_version()}")
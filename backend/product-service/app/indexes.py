@@ -0,0 +1,128 @@
+# app/indexes.py
+# Every index product-service relies on, and the queries that must use them.
+# Indexes are applied at startup; `python -m app.indexes --check` also
+# explain()s the canonical queries and exits non-zero on any COLLSCAN.
+
+from datetime import datetime
+
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.observability import get_logger
+from app.stock import RESERVATION_RETENTION_SECONDS
+
+log = get_logger(__name__)
+
+INDEXES = {
+    "products": [
+        IndexModel([("product_id", ASCENDING)], unique=True),
+        IndexModel([("category", ASCENDING)]),
+        # Search fallback while the in-memory index is being built
+        IndexModel([("name", TEXT), ("description", TEXT)], weights={"name": 3, "description": 1}),
+    ],
+    "stock": [
+        IndexModel([("product_id", ASCENDING)], unique=True),
+    ],
+    "stock_reservations": [
+        IndexModel([("status", ASCENDING), ("expires_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)],
+                   partialFilterExpression={"settled": False}),
+        IndexModel([("settled_at", ASCENDING)], expireAfterSeconds=RESERVATION_RETENTION_SECONDS),
+    ],
+}
+
+_NOW = datetime(2024, 1, 1)
+
+# (collection, filter, sort)
+CANONICAL_QUERIES = [
+    ("products", {"product_id": "p001"}, None),
+    ("products", {"product_id": {"$in": ["p001", "p002"]}}, None),
+    ("products", {"product_id": {"$gt": "p001"}}, [("product_id", ASCENDING)]),
+    ("products", {"category": "Dairy"}, None),
+    ("products", {"$text": {"$search": "milk"}}, None),
+    ("stock", {"product_id": "p001", "quantity": {"$gte": 1}}, None),
+    ("stock_reservations", {"status": "HELD", "expires_at": {"$lte": _NOW}}, None),
+    ("stock_reservations", {"status": "PENDING", "settled": False, "updated_at": {"$lte": _NOW}}, None),
+    ("stock_reservations", {"status": {"$in": ["COMMITTED", "RELEASED", "EXPIRED"]}, "settled": False, "updated_at": {"$lte": _NOW}}, None),
+]
+
+
+# --------------------
+# Apply / check
+# --------------------
+
+class IndexBuildError(Exception):
+    pass
+
+
+def _index_batches(models):
+    # A unique index blocked by duplicate data fails its whole
+    # create_indexes call, so each one gets a call of its own
+    shared = [model for model in models if not model.document.get("unique")]
+    if shared:
+        yield shared
+    for model in models:
+        if model.document.get("unique"):
+            yield [model]
+
+
+def apply_indexes(db):
+    """
+    Create every index in INDEXES; existing ones are left untouched. Raises
+    IndexBuildError once the rest are built if any failed, so the startup
+    step keeps retrying and /readyz stays 503 until the data is fixed.
+    """
+    failed = []
+    for collection, models in INDEXES.items():
+        for batch in _index_batches(models):
+            try:
+                db[collection].create_indexes(batch)
+            except OperationFailure as e:
+                names = [model.document["name"] for model in batch]
+                log.error("Could not create indexes", extra={
+                    "collection": collection, "indexes": names, "error": str(e)
+                })
+                failed.extend(f"{collection}.{name}" for name in names)
+    if failed:
+        raise IndexBuildError(f"Could not create indexes: {', '.join(failed)}")
+
+
+def _stages(plan):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+def check_query_plans(db):
+    """explain() each canonical query; returns the ones that still COLLSCAN."""
+    failures = []
+    for collection, query, sort in CANONICAL_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in _stages(plan):
+            failures.append({"collection": collection, "query": query, "sort": sort})
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+    from app.database import db
+
+    try:
+        apply_indexes(db)
+        build_failed = False
+    except IndexBuildError as e:
+        print(e)
+        build_failed = True
+    if "--check" in sys.argv:
+        failures = check_query_plans(db)
+        for failure in failures:
+            print(f"COLLSCAN: {failure}")
+        print(f"{len(CANONICAL_QUERIES) - len(failures)}/{len(CANONICAL_QUERIES)} canonical queries use an index")
+        build_failed = build_failed or bool(failures)
+    sys.exit(1 if build_failed else 0)
@@ -0,0 +1,203 @@
+# app/lifecycle.py
+# MongoDB connection lifecycle, shared by every service. The client is
+# created with connect=False and explicit pool limits, so importing the app
+# does no I/O; startup work (indexes, seeds, backfills) runs in a background
+# thread and is retried until Mongo answers. /healthz says the process is
+# up, /readyz says it can serve: startup work done and Mongo reachable.
+# Both report pool saturation.
+
+import os
+import threading
+from collections import defaultdict
+
+import pymongo
+from fastapi.responses import JSONResponse
+from prometheus_client import Gauge
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+from app.observability import get_logger, mongo_listener
+
+log = get_logger(__name__)
+
+MONGO_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    # Connections opened at once per pool; raise for faster warm-up in a surge
+    "maxConnecting": int(os.getenv("MONGO_MAX_CONNECTING", "4")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "2000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    # Fail a request instead of queueing forever when the pool is exhausted
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+}
+READY_PING_TIMEOUT_SECONDS = float(os.getenv("READY_PING_TIMEOUT_SECONDS", "1.0"))
+STARTUP_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", "30"))
+
+
+# --------------------
+# Pool monitoring
+# --------------------
+
+# Kept up to date by PoolStats; a set_function gauge would not reach /metrics
+# when it merges the gunicorn workers' metric files
+MONGO_POOL_IN_USE = Gauge(
+    "mongo_pool_connections_in_use", "Mongo connections checked out", multiprocess_mode="livesum"
+)
+MONGO_POOL_WAITING = Gauge(
+    "mongo_pool_checkouts_waiting", "Requests waiting for a Mongo connection", multiprocess_mode="livesum"
+)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Open, checked-out and waiting connections per server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = defaultdict(lambda: {"open": 0, "in_use": 0, "waiting": 0, "timeouts": 0})
+
+    def _add(self, event, **deltas):
+        with self._lock:
+            server = self._servers[event.address]
+            for key, delta in deltas.items():
+                server[key] += delta
+        if "in_use" in deltas:
+            MONGO_POOL_IN_USE.inc(deltas["in_use"])
+        if "waiting" in deltas:
+            MONGO_POOL_WAITING.inc(deltas["waiting"])
+
+    def connection_created(self, event):
+        self._add(event, open=1)
+
+    def connection_closed(self, event):
+        self._add(event, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(event, waiting=1)
+
+    def connection_checked_out(self, event):
+        self._add(event, waiting=-1, in_use=1)
+
+    def connection_check_out_failed(self, event):
+        timed_out = event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT
+        self._add(event, waiting=-1, timeouts=int(timed_out))
+
+    def connection_checked_in(self, event):
+        self._add(event, in_use=-1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            server = self._servers.pop(event.address, None)
+        if server:
+            MONGO_POOL_IN_USE.dec(server["in_use"])
+            MONGO_POOL_WAITING.dec(server["waiting"])
+
+    def connection_ready(self, event):
+        pass
+
+    def snapshot(self):
+        with self._lock:
+            servers = {f"{host}:{port}": dict(s) for (host, port), s in self._servers.items()}
+        in_use = max((s["in_use"] for s in servers.values()), default=0)
+        return {
+            "max_pool_size": MONGO_OPTIONS["maxPoolSize"],
+            "in_use": sum(s["in_use"] for s in servers.values()),
+            "waiting": sum(s["waiting"] for s in servers.values()),
+            # Busiest server's pool, 1.0 = every connection checked out
+            "saturation": round(in_use / MONGO_OPTIONS["maxPoolSize"], 3),
+            "servers": servers,
+        }
+
+
+pool_stats = PoolStats()
+
+
+def create_client(url: str) -> MongoClient:
+    """Connects on first use, not here."""
+    return MongoClient(url, connect=False, event_listeners=[mongo_listener, pool_stats], **MONGO_OPTIONS)
+
+
+# --------------------
+# Background startup
+# --------------------
+
+class StartupTasks:
+    """Runs startup steps in order on a background thread, retrying each until it succeeds."""
+
+    def __init__(self):
+        self._state = {}
+        self._stop = threading.Event()
+
+    def run(self, *steps):
+        """steps: (name, fn) pairs, e.g. ("indexes", lambda: apply_indexes(db))."""
+        self._stop.clear()
+        for name, _ in steps:
+            self._state[name] = "pending"
+        threading.Thread(target=self._run, args=(steps,), name="startup", daemon=True).start()
+
+    def _run(self, steps):
+        for name, fn in steps:
+            delay = 0.5
+            while not self._stop.is_set():
+                self._state[name] = "running"
+                try:
+                    fn()
+                    self._state[name] = "done"
+                    break
+                except Exception as e:
+                    self._state[name] = f"retrying: {e}"
+                    log.warning("Startup step failed", extra={"step": name, "error": str(e), "retry_in": delay})
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+            else:
+                # Stopped before this step succeeded
+                return
+
+    @property
+    def ready(self) -> bool:
+        return all(state == "done" for state in self._state.values())
+
+    def status(self):
+        return dict(self._state)
+
+    def stop(self):
+        self._stop.set()
+
+
+startup = StartupTasks()
+
+
+# --------------------
+# Probes
+# --------------------
+
+def add_health_checks(app, client: MongoClient):
+    """/healthz (liveness, no I/O) and /readyz (startup done and Mongo answers a ping)."""
+
+    @app.get("/healthz", include_in_schema=False)
+    def healthz():
+        return {"status": "ok", "pool": pool_stats.snapshot()}
+
+    @app.get("/readyz", include_in_schema=False)
+    def readyz():
+        ready = startup.ready
+        body = {"startup": startup.status(), "pool": pool_stats.snapshot()}
+        if ready:
+            try:
+                with pymongo.timeout(READY_PING_TIMEOUT_SECONDS):
+                    client.admin.command("ping")
+                body["mongo"] = "ok"
+            except PyMongoError as e:
+                body["mongo"] = str(e)
+                ready = False
+        body["status"] = "ready" if ready else "not ready"
+        return JSONResponse(body, status_code=200 if ready else 503)
@@ -1,11 +1,40 @@
 from fastapi import FastAPI
-from app.routes import products
+from fastapi.middleware.gzip import GZipMiddleware
+from app.routes import products, stock
 from app.seeds import seed_products
+from app.cache import start_catalog_watcher, stop_catalog_watcher
+from app.search import start_search_index, stop_search_index
+from app.stock import ensure_stock_rows, start_sweeper, stop_sweeper
+from app.database import client, db
+from app.indexes import apply_indexes
+from app.lifecycle import add_health_checks, startup
+from app.observability import instrument
+from app.http_cache import GZIP_MIN_BYTES
 
 app = FastAPI()
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=6)
+instrument(app)
+add_health_checks(app, client)
 
 @app.on_event("startup")
 def startup_event():
-    seed_products()
+    # Serve (and answer /healthz) straight away; /readyz waits for these
+    startup.run(
+        ("indexes", lambda: apply_indexes(db)),
+        ("seed", seed_products),
+        ("stock", ensure_stock_rows)
+    )
+    start_catalog_watcher()
+    start_search_index()
+    start_sweeper()
 
-app.include_router(products.router)
\ No newline at end of file
+@app.on_event("shutdown")
+def shutdown_event():
+    stop_catalog_watcher()
+    stop_search_index()
+    stop_sweeper()
+    startup.stop()
+    client.close()
+
+app.include_router(products.router)
+app.include_router(stock.router)
@@ -1,41 +1,213 @@
-from fastapi import APIRouter, HTTPException
-from app.database import db
-from app.schemas import Product, BulkProductRequest
-from typing import List
+import hmac
+import io
+import json
+import tempfile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pymongo.errors import PyMongoError
+from app.database import MONGO_URL, db
+from app.schemas import Product, BulkProductRequest, ProductPage, SearchPage
+from app.cache import CATALOG_META_ID, META_COLLECTION, catalog_cache, current_catalog_version
+from app.catalog_import import IMPORT_TOKEN, import_lines
+from app.fast_json import FastJSONResponse, encode
+from app.lifecycle import create_client
+from app.observability import get_logger
+from app.http_cache import CATALOG_CACHE_CONTROL, cache_headers, catalog_etag, matches, not_modified
+from app.search import search
+from app.pagination import paginate, stream_ndjson, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Literal, Optional, Union
+
+log = get_logger(__name__)
 
 router = APIRouter()
 
+PRODUCT_SORT = [("product_id", 1)]
+# Catalog version the prices in a /products/bulk response were read at
+CATALOG_VERSION_HEADER = "X-Catalog-Version"
+# Exactly the Product fields, so documents can be sent without response_model
+PRODUCT_PROJECTION = {"_id": 0, **dict.fromkeys(Product.model_fields, 1)}
+
+
+@router.get("/products", response_model=Union[List[Product], ProductPage])
+def get_products(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    try:
+        if stream:
+            return StreamingResponse(
+                stream_ndjson(db.products, {}, PRODUCT_SORT, after, PRODUCT_PROJECTION),
+                media_type="application/x-ndjson"
+            )
+
+        etag = catalog_etag()
+        if matches(request, etag):
+            return not_modified(etag, CATALOG_CACHE_CONTROL)
+        headers = cache_headers(etag, CATALOG_CACHE_CONTROL)
 
-@router.get("/products", response_model=List[Product])
-def get_products():
-    return list(db.products.find({}, {"_id": 0}))
+        if limit is not None or after is not None:
+            page = paginate(
+                db.products, {}, PRODUCT_SORT, limit or DEFAULT_PAGE_SIZE, after, PRODUCT_PROJECTION
+            )
+            return FastJSONResponse(page, headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The whole catalog is cached already encoded, so a hit is a memcpy
+    body = catalog_cache.get_or_load(
+        "products:all:json",
+        lambda: encode(list(db.products.find({}, PRODUCT_PROJECTION)))
+    )
+    return FastJSONResponse(body, headers=headers)
+
+
+@router.get("/products/search", response_model=SearchPage)
+def search_products(
+    q: str = "",
+    category: Optional[List[str]] = Query(None),
+    available: Optional[bool] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Ranked prefix/fuzzy search on name and description, with category and availability facets."""
+    return search(
+        q, categories=category, available=available,
+        min_price=min_price, max_price=max_price, limit=limit, offset=offset
+    )
 
 
 @router.get("/products/{product_id}", response_model=Product)
-def get_product(product_id: str):
-    product = db.products.find_one(
-        {"product_id": product_id},
-        {"_id": 0}
+def get_product(product_id: str, request: Request):
+    etag = catalog_etag()
+    if matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+    product = catalog_cache.get_or_load(
+        f"product:{product_id}",
+        lambda: db.products.find_one({"product_id": product_id}, PRODUCT_PROJECTION)
     )
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return product
+    return FastJSONResponse(product, headers=cache_headers(etag, CATALOG_CACHE_CONTROL))
 
 
 @router.get("/categories")
-def get_categories():
-    categories = db.products.distinct("category")
-    return [{"name": c} for c in categories]
+def get_categories(request: Request):
+    etag = catalog_etag()
+    if matches(request, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+    body = catalog_cache.get_or_load(
+        "categories:json",
+        lambda: encode([{"name": c} for c in db.products.distinct("category")])
+    )
+    return FastJSONResponse(body, headers=cache_headers(etag, CATALOG_CACHE_CONTROL))
 
 
 @router.post("/products/bulk", response_model=List[Product])
 def get_products_bulk(request: BulkProductRequest):
-    products = list(
-        db.products.find(
-            {"product_id": {"$in": request.product_ids}},
-            {"_id": 0}
-        )
-    )
-    return products
+    # Read first, so the prices are never older than the version they are tagged with
+    version = current_catalog_version()
+    products = []
+    missing_ids = []
+    # Repeated ids are returned once
+    for product_id in dict.fromkeys(request.product_ids):
+        product = catalog_cache.get(f"product:{product_id}")
+        if product is None:
+            missing_ids.append(product_id)
+        else:
+            products.append(product)
+
+    if missing_ids:
+        generation = catalog_cache.generation
+        for product in db.products.find(
+            {"product_id": {"$in": missing_ids}},
+            PRODUCT_PROJECTION
+        ):
+            catalog_cache.set(f"product:{product['product_id']}", product, generation)
+            products.append(product)
+
+    return FastJSONResponse(products, headers={CATALOG_VERSION_HEADER: str(version)})
+
+
+@router.get("/catalog/version")
+def fetch_catalog_version():
+    """Cheap freshness check for clients holding prices from /products/bulk."""
+    return {"version": current_catalog_version()}
+
+
+def require_import_token(x_import_token: Optional[str] = Header(None)):
+    """Catalog writes need CATALOG_IMPORT_TOKEN; without one configured they are disabled."""
+    if not IMPORT_TOKEN:
+        raise HTTPException(status_code=403, detail="Catalog writes are disabled")
+    if not x_import_token or not hmac.compare_digest(x_import_token.encode(), IMPORT_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid import token")
+
+
+@router.post("/products/import", dependencies=[Depends(require_import_token)])
+async def import_products(
+    request: Request,
+    fmt: Literal["csv", "ndjson"] = Query("ndjson", alias="format"),
+    partial: bool = False
+):
+    """
+    Upsert a CSV/NDJSON catalog file sent as the raw request body. Responds
+    with one NDJSON progress report per batch, then a summary line.
+    """
+
+    # Receive the whole upload first: the first 8 MB stay in memory, the rest
+    # spills to a temporary file. Batches are then written as it is read
+    # back line by line, so memory stays bounded whatever the file size.
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+
+    def progress():
+        with io.TextIOWrapper(upload, encoding="utf-8-sig", newline="") as lines:
+            for report in import_lines(lines, fmt, partial):
+                yield json.dumps(report, default=str) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    return catalog_cache.stats()
+
+
+def preload_catalog():
+    """
+    Fill the catalog cache the way the routes above would, before the
+    server forks its workers so they all share one copy. Uses its own
+    short-lived client: the shared one must not connect before the fork.
+    """
+    loader = create_client(MONGO_URL)
+    try:
+        database = loader.get_database()
+        meta = database[META_COLLECTION.name].find_one({"_id": CATALOG_META_ID})
+        version = meta["version"] if meta else 0
+        products = list(database.products.find({}, PRODUCT_PROJECTION))
+        categories = database.products.distinct("category")
+    except PyMongoError as e:
+        # Workers load lazily instead
+        log.warning("Catalog preload skipped", extra={"error": str(e)})
+        return
+    finally:
+        loader.close()
+    if not products:
+        return
+
+    catalog_cache.set("catalog_version", version)
+    catalog_cache.set("products:all:json", encode(products))
+    catalog_cache.set("categories:json", encode([{"name": c} for c in categories]))
+    for product in products:
+        catalog_cache.set(f"product:{product['product_id']}", product)
+    catalog_cache.preloaded_version = version
+    log.info("Catalog preloaded", extra={"products": len(products), "version": version})
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.schemas import ReserveRequest, ReservationIdsRequest, StockLevelsRequest
+from app import stock
+from app.routes.products import require_import_token
+
+router = APIRouter(prefix="/stock", tags=["Stock"])
+
+
+@router.post("/reserve")
+def reserve_stock(request: ReserveRequest):
+    try:
+        return stock.reserve(
+            request.reservation_id,
+            [line.model_dump() for line in request.items],
+            request.ttl_seconds
+        )
+    except stock.InsufficientStock as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "product_ids": e.product_ids})
+    except stock.ReservationError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "product_ids": []})
+
+
+@router.post("/commit")
+def commit_stock(request: ReservationIdsRequest):
+    committed, failed = stock.commit(request.reservation_ids)
+    return {"committed": committed, "failed": failed}
+
+
+@router.post("/release")
+def release_stock(request: ReservationIdsRequest):
+    released, failed = stock.release(request.reservation_ids)
+    return {"released": released, "failed": failed}
+
+
+@router.post("/levels", dependencies=[Depends(require_import_token)])
+def set_stock_levels(request: StockLevelsRequest):
+    return stock.set_stock_levels([level.model_dump() for level in request.levels])
+
+
+@router.get("/{product_id}")
+def get_stock(product_id: str):
+    level = stock.get_stock(product_id)
+    if not level:
+        raise HTTPException(status_code=404, detail="No stock level for this product")
+    return level
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
 
 
 class Product(BaseModel):
@@ -14,3 +14,68 @@ class Product(BaseModel):
 
 class BulkProductRequest(BaseModel):
     product_ids: List[str]
+
+
+class ProductPage(BaseModel):
+    items: List[Product]
+    next_after: Optional[str] = None
+
+
+class ProductUpdate(BaseModel):
+    """Partial catalog row, e.g. a nightly price/availability feed."""
+    product_id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[str] = None
+    image_url: Optional[str] = None
+    available: Optional[bool] = None
+
+
+class FacetCount(BaseModel):
+    value: Any
+    count: int
+
+
+class SearchFacets(BaseModel):
+    category: List[FacetCount]
+    available: List[FacetCount]
+
+
+class SearchPage(BaseModel):
+    items: List[Product]
+    total: int
+    facets: SearchFacets
+    next_offset: Optional[int] = None
+
+
+# --------------------
+# Stock
+# --------------------
+
+# Reservation ids become field names in the stock ledger
+RESERVATION_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+class StockLine(BaseModel):
+    product_id: str
+    quantity: int = Field(gt=0)
+
+
+class ReserveRequest(BaseModel):
+    reservation_id: str = Field(pattern=RESERVATION_ID_PATTERN)
+    items: List[StockLine] = Field(min_length=1)
+    ttl_seconds: Optional[float] = Field(None, gt=0)
+
+
+class ReservationIdsRequest(BaseModel):
+    reservation_ids: List[str] = Field(min_length=1, max_length=500)
+
+
+class StockLevel(BaseModel):
+    product_id: str
+    on_hand: int = Field(ge=0)
+
+
+class StockLevelsRequest(BaseModel):
+    levels: List[StockLevel]
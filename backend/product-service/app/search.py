@@ -0,0 +1,381 @@
+# app/search.py
+# Product search. An in-memory inverted index over name and description is
+# rebuilt in the background whenever the catalog cache is invalidated, and
+# swapped in whole so searches never wait on a rebuild. Until the first build
+# finishes, or with SEARCH_BACKEND=mongo, searches use the Mongo text index.
+
+import bisect
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from pymongo.errors import PyMongoError
+
+from app.cache import catalog_cache
+from app.database import db
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")
+
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+# Score multipliers by how a query term matched an indexed term
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+FUZZY_MATCH = 0.5
+# Shorter terms only match exactly or by prefix; fuzzing them is mostly noise
+FUZZY_MIN_LENGTH = 4
+MAX_PREFIX_EXPANSIONS = 50
+PRICE_BUCKETS = 64
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str):
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _deletes(term: str):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """One insertion, deletion, substitution or adjacent swap apart."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 2 and diffs[1] == diffs[0] + 1:
+            return a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            edits += 1
+            if edits > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+            j += 1
+        else:
+            i += 1
+            j += 1
+    return edits + (len(b) - j) <= 1
+
+
+class SearchIndex:
+    """
+    Immutable snapshot of the catalog, indexed for search. Products are
+    numbered in (name, product_id) order and sets of products are Python
+    ints used as bitsets, so matching, filtering and facet counts are a few
+    big-int ANDs and popcounts instead of a loop over every matching product.
+    """
+
+    def __init__(self, products, generation: int):
+        self.generation = generation
+        self.docs = sorted(products, key=lambda p: (p["name"], p["product_id"]))
+        self.size = len(self.docs)
+
+        # term -> {weight: posting}; a posting is a doc id list, or a bitset
+        # once it is dense enough for the bitset to be the smaller of the two
+        term_docs = defaultdict(lambda: defaultdict(list))
+        categories = defaultdict(list)
+        available = []
+        for doc_id, product in enumerate(self.docs):
+            weights = Counter()
+            for term in tokenize(product.get("name")):
+                weights[term] += NAME_WEIGHT
+            for term in tokenize(product.get("description")):
+                weights[term] += DESCRIPTION_WEIGHT
+            for term, weight in weights.items():
+                term_docs[term][weight].append(doc_id)
+            categories[product["category"]].append(doc_id)
+            if product["available"]:
+                available.append(doc_id)
+
+        self.postings = {
+            term: {
+                weight: self._bits(ids) if len(ids) * 64 > self.size else ids
+                for weight, ids in levels.items()
+            }
+            for term, levels in term_docs.items()
+        }
+        self.all_docs = (1 << self.size) - 1
+        self.category_bits = {category: self._bits(ids) for category, ids in categories.items()}
+        self.available_bits = self._bits(available)
+
+        # Docs split into price-ordered buckets; range filters OR whole buckets
+        # and only check prices inside the two boundary buckets
+        by_price = sorted(range(self.size), key=lambda d: self.docs[d]["price"])
+        bucket_size = max(1, -(-self.size // PRICE_BUCKETS))
+        self.price_buckets = []
+        for i in range(0, self.size, bucket_size):
+            ids = by_price[i:i + bucket_size]
+            self.price_buckets.append((
+                self.docs[ids[0]]["price"], self.docs[ids[-1]]["price"], self._bits(ids), ids
+            ))
+
+        self.vocabulary = sorted(self.postings)
+        # Single-deletion neighbourhood of every term, for edit distance 1 lookups
+        self.deletions = defaultdict(set)
+        for term in self.vocabulary:
+            if len(term) >= FUZZY_MIN_LENGTH:
+                for variant in _deletes(term):
+                    self.deletions[variant].add(term)
+
+    def _bits(self, ids) -> int:
+        if isinstance(ids, int):
+            return ids
+        if len(ids) < 64:
+            bits = 0
+            for doc_id in ids:
+                bits |= 1 << doc_id
+            return bits
+        packed = bytearray((self.size + 7) // 8)
+        for doc_id in ids:
+            packed[doc_id >> 3] |= 1 << (doc_id & 7)
+        return int.from_bytes(packed, "little")
+
+    def _expand(self, term: str):
+        """Indexed terms matching `term`, with their match multiplier."""
+        matches = {}
+        start = bisect.bisect_left(self.vocabulary, term)
+        for candidate in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            matches[candidate] = EXACT_MATCH if candidate == term else PREFIX_MATCH
+
+        if len(term) >= FUZZY_MIN_LENGTH:
+            candidates = set(self.deletions.get(term, ()))
+            for variant in _deletes(term):
+                candidates |= self.deletions.get(variant, set())
+                if variant in self.postings:
+                    candidates.add(variant)
+            for candidate in candidates:
+                if candidate not in matches and _within_one_edit(term, candidate):
+                    matches[candidate] = FUZZY_MATCH
+        return matches
+
+    def _term_tiers(self, term: str):
+        """Disjoint (score, docs) pairs for one query term, best match per doc."""
+        by_score = defaultdict(int)
+        for candidate, multiplier in self._expand(term).items():
+            for weight, posting in self.postings[candidate].items():
+                by_score[round(weight * multiplier, 6)] |= self._bits(posting)
+        tiers = []
+        seen = 0
+        for score in sorted(by_score, reverse=True):
+            docs = by_score[score] & ~seen
+            if docs:
+                tiers.append((score, docs))
+                seen |= docs
+        return tiers
+
+    def match(self, query: str):
+        """{total score: docs} for docs matching every query term."""
+        scored = {0.0: self.all_docs}
+        for term in tokenize(query):
+            merged = defaultdict(int)
+            for score, docs in scored.items():
+                for term_score, term_docs in self._term_tiers(term):
+                    both = docs & term_docs
+                    if both:
+                        merged[round(score + term_score, 6)] |= both
+            scored = merged
+            if not scored:
+                break
+        return scored
+
+    def _price_mask(self, min_price, max_price) -> int:
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
+        mask = 0
+        edge = []
+        for first, last, bits, ids in self.price_buckets:
+            if first >= low and last <= high:
+                mask |= bits
+            elif last >= low and first <= high:
+                edge.extend(d for d in ids if low <= self.docs[d]["price"] <= high)
+        return mask | self._bits(edge)
+
+    def search(self, query: str, categories=None, available=None,
+               min_price=None, max_price=None, limit: int = 20, offset: int = 0):
+        scored = self.match(query)
+        matched = 0
+        for docs in scored.values():
+            matched |= docs
+        if min_price is not None or max_price is not None:
+            matched &= self._price_mask(min_price, max_price)
+
+        category_mask = self.all_docs
+        if categories:
+            category_mask = 0
+            for category in categories:
+                category_mask |= self.category_bits.get(category, 0)
+        available_mask = self.all_docs
+        if available is not None:
+            available_mask = self.available_bits if available else self.all_docs & ~self.available_bits
+
+        # Each facet counts results with every filter applied except its own
+        in_categories = matched & category_mask
+        with_availability = matched & available_mask
+        category_counts = Counter({
+            category: (with_availability & bits).bit_count()
+            for category, bits in self.category_bits.items()
+        })
+        available_count = (in_categories & self.available_bits).bit_count()
+        available_counts = Counter({True: available_count, False: in_categories.bit_count() - available_count})
+        facets = {"category": _facet(category_counts), "available": _facet(available_counts)}
+
+        # Best score first; within a score, lower doc id (= name order) first
+        results = in_categories & available_mask
+        page = []
+        wanted = offset + limit
+        for score in sorted(scored, reverse=True):
+            docs = scored[score] & results
+            while docs and len(page) < wanted:
+                lowest = docs & -docs
+                page.append(lowest.bit_length() - 1)
+                docs ^= lowest
+            if len(page) >= wanted:
+                break
+        items = [self.docs[doc_id] for doc_id in page[offset:]]
+        return _page(items, results.bit_count(), facets, limit, offset)
+
+
+def _facet(counts: Counter):
+    return [{"value": value, "count": count} for value, count in counts.most_common() if count]
+
+
+def _page(items, total: int, facets, limit: int, offset: int):
+    return {
+        "items": items,
+        "total": total,
+        "facets": facets,
+        "next_offset": offset + limit if offset + limit < total else None
+    }
+
+
+# --------------------
+# Mongo text index fallback
+# --------------------
+
+def search_mongo(query: str, categories=None, available=None,
+                 min_price=None, max_price=None, limit: int = 20, offset: int = 0):
+    """Same contract as SearchIndex.search on the products text index (whole words only)."""
+    match = {}
+    if query.strip():
+        match["$text"] = {"$search": query}
+    price = {}
+    if min_price is not None:
+        price["$gte"] = min_price
+    if max_price is not None:
+        price["$lte"] = max_price
+    if price:
+        match["price"] = price
+
+    category_filter = {"category": {"$in": categories}} if categories else {}
+    available_filter = {"available": available} if available is not None else {}
+    sort = {"score": -1, "name": 1, "product_id": 1} if query.strip() else {"name": 1, "product_id": 1}
+
+    pipeline = [{"$match": match}]
+    if query.strip():
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+    pipeline.append({"$facet": {
+        "items": [
+            {"$match": {**category_filter, **available_filter}},
+            {"$sort": sort},
+            {"$skip": offset},
+            {"$limit": limit},
+            {"$project": {"_id": 0, "score": 0, "created_at": 0}},
+        ],
+        "total": [{"$match": {**category_filter, **available_filter}}, {"$count": "n"}],
+        "category": [
+            {"$match": available_filter},
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+        ],
+        "available": [
+            {"$match": category_filter},
+            {"$group": {"_id": "$available", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+        ],
+    }})
+
+    result = next(db.products.aggregate(pipeline))
+    total = result["total"][0]["n"] if result["total"] else 0
+    facets = {
+        name: [{"value": f["_id"], "count": f["count"]} for f in result[name]]
+        for name in ("category", "available")
+    }
+    return _page(result["items"], total, facets, limit, offset)
+
+
+# --------------------
+# Background rebuilds
+# --------------------
+
+_index = None
+_rebuild_needed = threading.Event()
+_stop_event = threading.Event()
+_builder_thread = None
+
+
+def rebuild_index():
+    global _index
+    generation = catalog_cache.generation
+    started = time.perf_counter()
+    products = list(db.products.find({}, {"_id": 0, "created_at": 0}))
+    _index = SearchIndex(products, generation)
+    log.info("Search index built", extra={
+        "products": len(products),
+        "terms": len(_index.vocabulary),
+        "seconds": round(time.perf_counter() - started, 3)
+    })
+
+
+def search(query: str, **filters):
+    index = _index
+    if SEARCH_BACKEND == "mongo" or index is None:
+        return search_mongo(query, **filters)
+    if index.generation != catalog_cache.generation:
+        # Serve the previous snapshot while the new one is built
+        _rebuild_needed.set()
+    return index.search(query, **filters)
+
+
+def _run_builder():
+    while not _stop_event.is_set():
+        _rebuild_needed.wait()
+        if _stop_event.is_set():
+            break
+        _rebuild_needed.clear()
+        try:
+            rebuild_index()
+        except PyMongoError as e:
+            log.warning("Search index rebuild failed", extra={"error": str(e)})
+            _stop_event.wait(1)
+            _rebuild_needed.set()
+
+
+def start_search_index():
+    global _builder_thread
+    if SEARCH_BACKEND == "mongo":
+        return
+    if _builder_thread is not None and _builder_thread.is_alive():
+        return
+    _stop_event.clear()
+    catalog_cache.on_invalidate(_rebuild_needed.set)
+    _rebuild_needed.set()
+    _builder_thread = threading.Thread(target=_run_builder, name="search-index", daemon=True)
+    _builder_thread.start()
+
+
+def stop_search_index():
+    _stop_event.set()
+    _rebuild_needed.set()
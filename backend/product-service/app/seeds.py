@@ -1,8 +1,15 @@
 # app/seeds.py
 
 from app.database import db
+from app.catalog_import import import_rows
+from app.stock import set_stock_levels
+from app.observability import get_logger
 from datetime import datetime
 
+log = get_logger(__name__)
+
+SEED_STOCK_ON_HAND = 100
+
 def seed_products():
     products_collection = db["products"]
 
@@ -71,7 +78,10 @@ def seed_products():
     ]
 
     if products_collection.count_documents({}) == 0:
-        products_collection.insert_many(products)
-        print("Products seeded successfully.")
+        summary = list(import_rows(enumerate(products, start=1)))[-1]
+        set_stock_levels([
+            {"product_id": p["product_id"], "on_hand": SEED_STOCK_ON_HAND} for p in products
+        ])
+        log.info("Products seeded successfully.", extra={"upserted": summary["upserted"]})
     else:
-        print("Products already exist. Skipping seeding.")
\ No newline at end of file
+        log.info("Products already exist. Skipping seeding.")
\ No newline at end of file
@@ -0,0 +1,366 @@
+# app/stock.py
+# Stock ledger. Each SKU has one document holding its free `quantity`, the
+# `reserved` total and a `holds` map of reservation_id -> quantity. Every
+# change is a conditional $inc on that one document, so concurrent
+# checkouts never oversell and never take a lock.
+#
+#   reserve:  quantity >= q  ->  quantity -= q, reserved += q, holds[r] = q
+#   commit:   holds[r] set   ->  reserved -= q, unset holds[r]
+#   release:  holds[r] set   ->  quantity += q, reserved -= q, unset holds[r]
+#
+# Filtering commit/release on holds[r] makes both idempotent. A reservation
+# is recorded PENDING, becomes HELD only once every hold is applied, and
+# stays HELD until committed, released or expired by the sweeper thread.
+
+import os
+import threading
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.database import db
+from app.observability import get_logger
+
+log = get_logger(__name__)
+
+STOCK_COLLECTION = db["stock"]
+RESERVATION_COLLECTION = db["stock_reservations"]
+
+RESERVATION_TTL_SECONDS = float(os.getenv("STOCK_RESERVATION_TTL_SECONDS", "600"))
+MAX_RESERVATION_TTL_SECONDS = 3600
+SWEEP_SECONDS = float(os.getenv("STOCK_SWEEP_SECONDS", "5"))
+SWEEP_BATCH_SIZE = int(os.getenv("STOCK_SWEEP_BATCH_SIZE", "100"))
+# Settled reservations are kept this long for debugging (TTL index)
+RESERVATION_RETENTION_SECONDS = int(os.getenv("STOCK_RESERVATION_RETENTION_SECONDS", str(24 * 3600)))
+# Unsettled reservations older than this were abandoned by a crashed worker
+SETTLE_GRACE_SECONDS = 30
+# On-hand units for a product that has no stock row yet (see ensure_stock_rows)
+DEFAULT_ON_HAND = int(os.getenv("STOCK_DEFAULT_ON_HAND", "100"))
+ENSURE_BATCH_SIZE = 1000
+
+PENDING = "PENDING"
+HELD = "HELD"
+COMMITTED = "COMMITTED"
+RELEASED = "RELEASED"
+EXPIRED = "EXPIRED"
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids):
+        super().__init__(f"Insufficient stock for: {', '.join(product_ids)}")
+        self.product_ids = product_ids
+
+
+class ReservationError(Exception):
+    pass
+
+
+def _merge_lines(items):
+    quantities = {}
+    for item in items:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+    return [{"product_id": pid, "quantity": q} for pid, q in quantities.items()]
+
+
+def _hold(reservation_id: str):
+    return f"holds.{reservation_id}"
+
+
+# --------------------
+# Ledger operations
+# --------------------
+
+def _reserve_ops(reservation_id: str, lines):
+    return [
+        UpdateOne(
+            {"product_id": line["product_id"], "quantity": {"$gte": line["quantity"]}},
+            {
+                "$inc": {"quantity": -line["quantity"], "reserved": line["quantity"]},
+                "$set": {_hold(reservation_id): line["quantity"]}
+            }
+        )
+        for line in lines
+    ]
+
+
+def _settle_ops(reservation_id: str, lines, restock: bool):
+    ops = []
+    for line in lines:
+        inc = {"reserved": -line["quantity"]}
+        if restock:
+            inc["quantity"] = line["quantity"]
+        ops.append(UpdateOne(
+            {"product_id": line["product_id"], _hold(reservation_id): {"$exists": True}},
+            {"$inc": inc, "$unset": {_hold(reservation_id): ""}}
+        ))
+    return ops
+
+
+def _late_commit_ops(reservation_id: str, lines):
+    # The reservation expired, so its hold is being (or has been) returned.
+    # Finish returning it, then take the units again even if that drives
+    # quantity negative; the marker stops a replay from taking them twice.
+    late = f"late_commits.{reservation_id}"
+    return _settle_ops(reservation_id, lines, restock=True) + [
+        UpdateOne(
+            {"product_id": line["product_id"], late: {"$exists": False}},
+            {"$inc": {"quantity": -line["quantity"]}, "$set": {late: line["quantity"]}}
+        )
+        for line in lines
+    ]
+
+
+def _settle(reservation: dict, ops):
+    if ops:
+        STOCK_COLLECTION.bulk_write(ops, ordered=False)
+    RESERVATION_COLLECTION.update_one(
+        {"_id": reservation["_id"]},
+        {"$set": {"settled": True, "settled_at": datetime.utcnow()}}
+    )
+
+
+def _transition(reservation_id: str, from_status: str, to_status: str, **fields):
+    """Atomically move a reservation from one status to another; returns it as it was."""
+    return RESERVATION_COLLECTION.find_one_and_update(
+        {"_id": reservation_id, "status": from_status},
+        {"$set": {"status": to_status, "updated_at": datetime.utcnow(), **fields}},
+        return_document=ReturnDocument.BEFORE
+    )
+
+
+def _current_status(reservation_id: str):
+    current = RESERVATION_COLLECTION.find_one({"_id": reservation_id}, {"status": 1})
+    return current["status"] if current else None
+
+
+def reservation_response(reservation: dict):
+    return {
+        "reservation_id": reservation["_id"],
+        "status": reservation["status"],
+        "items": reservation["items"],
+        "expires_at": reservation["expires_at"]
+    }
+
+
+def reserve(reservation_id: str, items, ttl_seconds: float = None):
+    """
+    Hold every line in one bulk_write, or none of them. Retrying with the
+    same reservation_id returns the existing reservation.
+    """
+    lines = _merge_lines(items)
+    ttl = min(ttl_seconds or RESERVATION_TTL_SECONDS, MAX_RESERVATION_TTL_SECONDS)
+    now = datetime.utcnow()
+    reservation = {
+        "_id": reservation_id,
+        "items": lines,
+        "status": PENDING,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": now + timedelta(seconds=ttl),
+        "settled": False
+    }
+
+    # 1️⃣ Record the reservation first so the sweeper can undo a half-applied
+    # one; PENDING keeps commit from trusting it before its holds exist
+    try:
+        RESERVATION_COLLECTION.insert_one(reservation)
+    except DuplicateKeyError:
+        existing = RESERVATION_COLLECTION.find_one({"_id": reservation_id})
+        if existing["status"] in (HELD, COMMITTED):
+            return reservation_response(existing)
+        raise ReservationError(f"Reservation {reservation_id} is {existing['status'].lower()}")
+
+    # 2️⃣ Conditionally decrement every SKU at once
+    result = STOCK_COLLECTION.bulk_write(_reserve_ops(reservation_id, lines), ordered=False)
+    if result.matched_count == len(lines):
+        if _transition(reservation_id, PENDING, HELD) is None:
+            # The sweeper gave up on it and returned the holds
+            raise ReservationError(f"Reservation {reservation_id} is {_current_status(reservation_id).lower()}")
+        return reservation_response({**reservation, "status": HELD})
+
+    # 3️⃣ Some line was short: find which, then give back the ones we took
+    held = {
+        doc["product_id"] for doc in STOCK_COLLECTION.find(
+            {"product_id": {"$in": [l["product_id"] for l in lines]}, _hold(reservation_id): {"$exists": True}},
+            {"product_id": 1}
+        )
+    }
+    if _transition(reservation_id, PENDING, RELEASED):
+        _settle(reservation, _settle_ops(reservation_id, lines, restock=True))
+    raise InsufficientStock([l["product_id"] for l in lines if l["product_id"] not in held])
+
+
+def commit(reservation_ids):
+    """Turn holds into sales. Returns ({reservation_id: status}, {reservation_id: error})."""
+    committed = {}
+    failed = {}
+    for reservation_id in reservation_ids:
+        before = _transition(reservation_id, HELD, COMMITTED)
+        if before:
+            _settle(before, _settle_ops(reservation_id, before["items"], restock=False))
+            committed[reservation_id] = COMMITTED
+            continue
+
+        before = _transition(reservation_id, EXPIRED, COMMITTED, late=True)
+        if before:
+            log.warning("Committing an expired stock reservation", extra={"reservation_id": reservation_id})
+            _settle(before, _late_commit_ops(reservation_id, before["items"]))
+            committed[reservation_id] = COMMITTED
+            continue
+
+        status = _current_status(reservation_id)
+        if status == COMMITTED:
+            committed[reservation_id] = COMMITTED
+        else:
+            failed[reservation_id] = f"Reservation is {status.lower()}" if status else "Reservation not found"
+    return committed, failed
+
+
+def release(reservation_ids):
+    """Return held units. Returns ({reservation_id: status}, {reservation_id: error})."""
+    released = {}
+    failed = {}
+    for reservation_id in reservation_ids:
+        before = _transition(reservation_id, HELD, RELEASED)
+        if before:
+            _settle(before, _settle_ops(reservation_id, before["items"], restock=True))
+            released[reservation_id] = RELEASED
+            continue
+
+        status = _current_status(reservation_id)
+        if status in (RELEASED, EXPIRED):
+            released[reservation_id] = status
+        else:
+            failed[reservation_id] = f"Reservation is {status.lower()}" if status else "Reservation not found"
+    return released, failed
+
+
+# --------------------
+# Stock levels
+# --------------------
+
+def set_stock_levels(levels):
+    """Set on-hand counts; units held by open reservations stay held."""
+    ops = [
+        UpdateOne(
+            {"product_id": level["product_id"]},
+            [
+                {"$set": {"reserved": {"$ifNull": ["$reserved", 0]}}},
+                {"$set": {
+                    "product_id": level["product_id"],
+                    "quantity": {"$subtract": [level["on_hand"], "$reserved"]},
+                    "updated_at": "$$NOW"
+                }}
+            ],
+            upsert=True
+        )
+        for level in levels
+    ]
+    if not ops:
+        return {"upserted": 0, "modified": 0}
+    result = STOCK_COLLECTION.bulk_write(ops, ordered=False)
+    return {"upserted": result.upserted_count, "modified": result.modified_count}
+
+
+def ensure_stock_rows():
+    """
+    Give every product without a stock row DEFAULT_ON_HAND free units, so
+    products loaded before the ledger existed, or through the catalog
+    import, can be reserved. Existing rows are never touched.
+    """
+    tracked = set(STOCK_COLLECTION.distinct("product_id"))
+    missing = [pid for pid in db.products.distinct("product_id") if pid not in tracked]
+    for start in range(0, len(missing), ENSURE_BATCH_SIZE):
+        STOCK_COLLECTION.bulk_write([
+            UpdateOne(
+                {"product_id": product_id},
+                {"$setOnInsert": {
+                    "product_id": product_id,
+                    "quantity": DEFAULT_ON_HAND,
+                    "reserved": 0,
+                    "updated_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+            for product_id in missing[start:start + ENSURE_BATCH_SIZE]
+        ], ordered=False)
+    if missing:
+        log.info("Stock rows created", extra={"products": len(missing), "on_hand": DEFAULT_ON_HAND})
+    return len(missing)
+
+
+def get_stock(product_id: str):
+    return STOCK_COLLECTION.find_one(
+        {"product_id": product_id},
+        {"_id": 0, "product_id": 1, "quantity": 1, "reserved": 1}
+    )
+
+
+# --------------------
+# Sweeper
+# --------------------
+
+_stop_event = threading.Event()
+_sweeper_thread = None
+
+
+def sweep_once() -> int:
+    """Expire overdue reservations and finish any a crashed worker left unsettled."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=SETTLE_GRACE_SECONDS)
+    swept = 0
+
+    # reserve() never finished these: return whatever holds it applied
+    for reservation in RESERVATION_COLLECTION.find(
+        {"status": PENDING, "settled": False, "updated_at": {"$lte": stale}}, {"_id": 1}
+    ).limit(SWEEP_BATCH_SIZE):
+        before = _transition(reservation["_id"], PENDING, RELEASED)
+        if before:
+            _settle(before, _settle_ops(before["_id"], before["items"], restock=True))
+            swept += 1
+
+    for reservation in RESERVATION_COLLECTION.find(
+        {"status": HELD, "expires_at": {"$lte": now}}, {"_id": 1}
+    ).limit(SWEEP_BATCH_SIZE):
+        before = _transition(reservation["_id"], HELD, EXPIRED)
+        if before:
+            _settle(before, _settle_ops(before["_id"], before["items"], restock=True))
+            swept += 1
+
+    for reservation in RESERVATION_COLLECTION.find({
+        "status": {"$in": [COMMITTED, RELEASED, EXPIRED]},
+        "settled": False,
+        "updated_at": {"$lte": stale}
+    }).limit(SWEEP_BATCH_SIZE):
+        if reservation["status"] != COMMITTED:
+            ops = _settle_ops(reservation["_id"], reservation["items"], restock=True)
+        elif reservation.get("late"):
+            ops = _late_commit_ops(reservation["_id"], reservation["items"])
+        else:
+            ops = _settle_ops(reservation["_id"], reservation["items"], restock=False)
+        _settle(reservation, ops)
+        swept += 1
+
+    return swept
+
+
+def _run_sweeper():
+    while not _stop_event.wait(SWEEP_SECONDS):
+        try:
+            sweep_once()
+        except PyMongoError as e:
+            log.warning("Stock reservation sweep failed", extra={"error": str(e)})
+
+
+def start_sweeper():
+    global _sweeper_thread
+    if _sweeper_thread is not None and _sweeper_thread.is_alive():
+        return
+    _stop_event.clear()
+    _sweeper_thread = threading.Thread(target=_run_sweeper, name="stock-sweeper", daemon=True)
+    _sweeper_thread.start()
+
+
+def stop_sweeper():
+    _stop_event.set()
@@ -0,0 +1,79 @@
+# stubs/delivery_stub.py
+# In-memory stand-in for delivery-service, for running cart-order-service
+# (and its outbox dispatcher) locally without Mongo on the delivery side.
+#
+#   uvicorn stubs.delivery_stub:app --port 8004
+#   DELIVERY_SERVICE_URL=http://localhost:8004/delivery/create uvicorn app.main:app
+#
+# STUB_FAILURE_RATE (0..1) makes that share of requests return 503 so the
+# dispatcher's retry/backoff path can be exercised.
+
+import os
+import random
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import List
+
+FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", "0"))
+
+app = FastAPI(title="Delivery Service Stub")
+
+deliveries = {}
+
+
+class DeliveryCreate(BaseModel):
+    order_id: str
+    user_id: str
+
+
+class DeliveryBatchCreate(BaseModel):
+    deliveries: List[DeliveryCreate]
+
+
+def _maybe_fail():
+    if random.random() < FAILURE_RATE:
+        raise HTTPException(status_code=503, detail="Stub failure")
+
+
+def _create(delivery: DeliveryCreate):
+    if delivery.order_id in deliveries:
+        return False
+    deliveries[delivery.order_id] = {
+        "delivery_id": str(uuid4()),
+        "order_id": delivery.order_id,
+        "user_id": delivery.user_id,
+        "status": "CREATED"
+    }
+    return True
+
+
+@app.post("/delivery/create", status_code=201)
+def create_delivery(delivery: DeliveryCreate):
+    _maybe_fail()
+    _create(delivery)
+    return deliveries[delivery.order_id]
+
+
+@app.post("/delivery/batch-create", status_code=201)
+def create_deliveries(batch: DeliveryBatchCreate):
+    _maybe_fail()
+    created, existing = {}, {}
+    for delivery in batch.deliveries:
+        target = created if _create(delivery) else existing
+        target[delivery.order_id] = deliveries[delivery.order_id]["delivery_id"]
+    return JSONResponse({"created": created, "existing": existing}, status_code=201 if created else 200)
+
+
+@app.get("/delivery/{order_id}/status")
+def get_delivery_status(order_id: str):
+    if order_id not in deliveries:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return {"order_id": order_id, "status": deliveries[order_id]["status"]}
+
+
+@app.get("/stub/deliveries")
+def list_deliveries():
+    return list(deliveries.values())
@@ -1,26 +1,33 @@
-from passlib.context import CryptContext
+import os
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from bson import ObjectId  # 👈 THIS is Step 4
+from bson import ObjectId
+from bson.errors import InvalidId
 from app.database import users_collection
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.cache import TTLCache
 
 SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-security = HTTPBearer()
-
+# "true" trusts the profile claims inside the token and never reads Mongo
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() == "true"
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# Only what authenticated endpoints need — never the password hash
+PROFILE_FIELDS = {"_id": 1, "name": 1, "email": 1, "created_at": 1}
 
+token_cache = TTLCache(
+    max_entries=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_TOKEN_CACHE_TTL_SECONDS", "300"))
+)
+profile_cache = TTLCache(
+    max_entries=int(os.getenv("AUTH_PROFILE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_PROFILE_CACHE_TTL_SECONDS", "60"))
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+security = HTTPBearer()
 
 
 def create_access_token(data: dict):
@@ -30,23 +37,64 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    token = credentials.credentials
+def profile_claims(user: dict) -> dict:
+    """Claims that let AUTH_STATELESS serve the profile from the token alone."""
+    return {
+        "sub": str(user["_id"]),
+        "name": user["name"],
+        "email": user["email"],
+        "created_at": str(user["created_at"])
+    }
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
 
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
+def verify_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing the result for repeat tokens."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
 
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    # 👇 STEP 4 HAPPENS RIGHT HERE
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    token_cache.set(token, payload, expires_at=payload.get("exp"))
+    return payload
+
+
+def get_user_profile(user_id: str):
+    user = profile_cache.get(user_id)
+    if user is not None:
+        return user
+
+    try:
+        user = users_collection.find_one({"_id": ObjectId(user_id)}, PROFILE_FIELDS)
+    except InvalidId:
+        return None
+
+    if user is not None:
+        profile_cache.set(user_id, user)
+    return user
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    payload = verify_token(credentials.credentials)
+    user_id: str = payload["sub"]
+
+    if AUTH_STATELESS and "email" in payload:
+        return {
+            "_id": user_id,
+            "name": payload["name"],
+            "email": payload["email"],
+            "created_at": payload["created_at"]
+        }
+
+    user = get_user_profile(user_id)
 
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
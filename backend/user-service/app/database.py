@@ -1,12 +1,11 @@
-from pymongo import MongoClient
 import os
 
+from app.lifecycle import create_client
+
 MONGO_URL = os.getenv("MONGO_URL")
 if not MONGO_URL:
     raise ValueError("MONGO_URL is not set")
-client = MongoClient(MONGO_URL)
+# Pool limits and timeouts live in app/lifecycle.py; no I/O happens here
+client = create_client(MONGO_URL)
 db = client.get_database()
-users_collection = db["users"]
-
-# Ensure unique email
-users_collection.create_index("email", unique=True)
\ No newline at end of file
+users_collection = db["users"]
\ No newline at end of file
@@ -0,0 +1,104 @@
+# app/hashing.py
+# bcrypt runs in a dedicated process pool so a login storm can't hold the
+# GIL in the API process. At most HASH_MAX_PENDING jobs are admitted at a
+# time; beyond that requests are shed with 503 instead of queueing forever.
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(HASH_WORKERS * 4)))
+HASH_TIMEOUT_SECONDS = float(os.getenv("HASH_TIMEOUT_SECONDS", "10"))
+
+# Hashes made with a different cost are flagged by needs_update/verify_and_update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class HashingOverloaded(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Too many authentication requests, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+
+# --------------------
+# Worker-side functions (must stay importable without app.database)
+# --------------------
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+# --------------------
+# Pool
+# --------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+_admission = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork the API process with Mongo/threads running
+            _pool = ProcessPoolExecutor(
+                max_workers=HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _run(fn, *args):
+    if not _admission.acquire(blocking=False):
+        raise HashingOverloaded()
+    try:
+        future = _get_pool().submit(fn, *args)
+    except BaseException:
+        _admission.release()
+        raise
+    # The slot is held until the job is done (or cancelled before it started),
+    # not just until we stop waiting, so timed-out jobs still count as pending
+    future.add_done_callback(lambda _: _admission.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT_SECONDS)
+    except TimeoutError:
+        future.cancel()
+        raise HashingOverloaded()
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    """
+    Returns (valid, new_hash). new_hash is set when the stored hash was made
+    with a different cost and should be saved in its place.
+    """
+    return _run(_verify_and_update, plain_password, hashed_password)
+
+
+def start_pool():
+    _get_pool()
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,15 +1,32 @@
 from fastapi import FastAPI, HTTPException, Depends
 from app.schemas import RegisterRequest, LoginRequest, UserResponse
 from app.models import User
-from app.database import users_collection
-from app.auth import hash_password, verify_password, create_access_token
+from app.database import client, db, users_collection
+from app.indexes import apply_indexes
+from app.lifecycle import add_health_checks, startup
+from app.observability import instrument
+from app.auth import create_access_token, profile_claims
+from app.hashing import hash_password, verify_password, start_pool, shutdown_pool
 from bson import ObjectId
 from app.auth import get_current_user
 
 app = FastAPI(title="User Service")
+instrument(app)
+add_health_checks(app, client)
 
 HARD_CODED_OTP = "1234"
 
+@app.on_event("startup")
+def startup_event():
+    startup.run(("indexes", lambda: apply_indexes(db)))
+    start_pool()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_pool()
+    startup.stop()
+    client.close()
+
 @app.post("/register", response_model=UserResponse)
 def register(req: RegisterRequest):
     if req.otp != HARD_CODED_OTP:
@@ -26,10 +43,18 @@ def register(req: RegisterRequest):
 @app.post("/login")
 def login(req: LoginRequest):
     user = users_collection.find_one({"email": req.email})
-    if not user or not verify_password(req.password, user["password"]):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": str(user["_id"])})
+    valid, new_hash = verify_password(req.password, user["password"])
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # BCRYPT_ROUNDS changed since this hash was made
+    if new_hash:
+        users_collection.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+
+    token = create_access_token(profile_claims(user))
     return {"access_token": token, "token_type": "bearer"}
 
 @app.get("/profile", response_model=UserResponse)
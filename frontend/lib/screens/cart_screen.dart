@@ -33,6 +33,8 @@ class _CartScreenState extends State<CartScreen> {
   }
 
   double get _total => _cartItems.fold(0.0, (sum, item) {
+    // Unavailable lines stay in the cart but are not charged
+    if (item['available'] == false) return sum;
     final price = (item['price'] ?? item['unit_price'] ?? 0.0) as num;
     final qty   = (item['quantity'] ?? 1) as num;
     return sum + price * qty;
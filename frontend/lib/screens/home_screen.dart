@@ -18,6 +18,9 @@ class _HomeScreenState extends State<HomeScreen> {
   List<dynamic> _products    = [];
   String _selectedCategory   = 'All';
   bool _loading              = true;
+  String? _nextAfter;          // cursor for the next product page
+  bool _loadingMore          = false;
+  int _cartCount             = 0;
 
   @override
   void initState() {
@@ -26,16 +29,45 @@ class _HomeScreenState extends State<HomeScreen> {
   }
 
   Future<void> _loadData() async {
-    final cats  = await ApiService.getCategories();
-    final prods = await ApiService.getProducts();
+    // One round trip for the whole screen; fall back per missing section
+    final home = await ApiService.getHome(widget.userId, widget.token);
+    final cats = home?['categories'] as List<dynamic>? ??
+        await ApiService.getCategories();
+
+    List<dynamic> prods;
+    String? nextAfter;
+    final page = home?['products'] as Map<String, dynamic>?;
+    if (page != null) {
+      prods     = page['items'] as List<dynamic>;
+      nextAfter = page['next_after'] as String?;
+    } else {
+      prods = await ApiService.getProducts();
+    }
+
+    final cart = home?['cart'] as Map<String, dynamic>?;
+    final items = cart?['items'] as List<dynamic>? ?? [];
     if (!mounted) return;
     setState(() {
       _categories = [{'name': 'All'}, ...cats];
       _products   = prods;
+      _nextAfter  = nextAfter;
+      _cartCount  = items.fold<int>(0, (n, i) => n + ((i['quantity'] as num?)?.toInt() ?? 0));
       _loading    = false;
     });
   }
 
+  Future<void> _loadMore() async {
+    if (_loadingMore || _nextAfter == null) return;
+    _loadingMore = true;
+    final page = await ApiService.getProductPage(after: _nextAfter);
+    _loadingMore = false;
+    if (!mounted || page == null) return;
+    setState(() {
+      _products  = [..._products, ...page['items'] as List<dynamic>];
+      _nextAfter = page['next_after'] as String?;
+    });
+  }
+
   List<dynamic> get _filteredProducts {
     if (_selectedCategory == 'All') return _products;
     return _products
@@ -82,7 +114,12 @@ class _HomeScreenState extends State<HomeScreen> {
         ),
         actions: [
           IconButton(
-            icon: const Icon(Icons.shopping_cart_outlined, color: Color(0xFF000000)),
+            icon: Badge(
+              isLabelVisible: _cartCount > 0,
+              label: Text('$_cartCount'),
+              backgroundColor: const Color(0xFFfb542b),
+              child: const Icon(Icons.shopping_cart_outlined, color: Color(0xFF000000)),
+            ),
             onPressed: () => Navigator.push(context,
               MaterialPageRoute(
                 builder: (_) => CartScreen(
@@ -141,17 +178,21 @@ class _HomeScreenState extends State<HomeScreen> {
                     padding: const EdgeInsets.symmetric(horizontal: 12),
                     sliver: SliverGrid(
                       delegate: SliverChildBuilderDelegate(
-                        (ctx, i) => _ProductCard(
-                          product: _filteredProducts[i],
-                          onAddToCart: () => _addToCart(_filteredProducts[i]),
-                          onTap: () => Navigator.push(context,
-                            MaterialPageRoute(
-                              builder: (_) => ProductDetailScreen(
-                                product: _filteredProducts[i],
-                                userId: widget.userId,
-                                token: widget.token,
-                              ))),
-                        ),
+                        (ctx, i) {
+                          // Fetch the next page as the grid nears its end
+                          if (i >= _filteredProducts.length - 4) _loadMore();
+                          return _ProductCard(
+                            product: _filteredProducts[i],
+                            onAddToCart: () => _addToCart(_filteredProducts[i]),
+                            onTap: () => Navigator.push(context,
+                              MaterialPageRoute(
+                                builder: (_) => ProductDetailScreen(
+                                  product: _filteredProducts[i],
+                                  userId: widget.userId,
+                                  token: widget.token,
+                                ))),
+                          );
+                        },
                         childCount: _filteredProducts.length,
                       ),
                       gridDelegate:
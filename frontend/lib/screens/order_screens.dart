@@ -110,7 +110,10 @@ class _OrderCard extends StatelessWidget {
                       order['_id']?.toString() ?? '';
     final total     = order['total_amount'] ?? order['total'] ?? 0;
     final createdAt = order['created_at']?.toString() ?? '';
-    final items     = order['items'] as List<dynamic>? ?? [];
+    // Order history rows are summaries: a short item preview plus the count
+    final items     = order['preview'] as List<dynamic>? ??
+                      order['items'] as List<dynamic>? ?? [];
+    final itemCount = order['item_count'] as int? ?? items.length;
 
     // Format date nicely if possible
     String dateStr = '';
@@ -180,8 +183,8 @@ class _OrderCard extends StatelessWidget {
                   ),
                 );
               }),
-              if (items.length > 3)
-                Text('+${items.length - 3} more items',
+              if (itemCount > 3)
+                Text('+${itemCount - 3} more items',
                   style: const TextStyle(color: Colors.grey, fontSize: 12)),
             ],
 
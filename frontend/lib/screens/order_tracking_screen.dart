@@ -1,4 +1,5 @@
 import 'dart:async';
+import 'package:flutter/foundation.dart' show kIsWeb;
 import 'package:flutter/material.dart';
 import '../services/api_service.dart';
 
@@ -15,6 +16,7 @@ class _OrderTrackingScreenState extends State<OrderTrackingScreen> {
   String _status = 'PLACED';
   bool _loading  = true;
   Timer? _timer;
+  StreamSubscription<String>? _updates;
 
   // Status flow matching backend
   static const _steps = [
@@ -41,17 +43,43 @@ class _OrderTrackingScreenState extends State<OrderTrackingScreen> {
   @override
   void initState() {
     super.initState();
-    _fetchStatus();
-    // Poll every 10 seconds
-    _timer = Timer.periodic(const Duration(seconds: 10), (_) => _fetchStatus());
+    if (kIsWeb) {
+      // Browser http client buffers whole responses, so no streaming: poll
+      _fetchStatus();
+      _timer = Timer.periodic(const Duration(seconds: 10), (_) => _fetchStatus());
+    } else {
+      _listen();
+    }
   }
 
   @override
   void dispose() {
     _timer?.cancel();
+    _updates?.cancel();
     super.dispose();
   }
 
+  // Status updates are pushed by the delivery service
+  void _listen() {
+    _updates = ApiService.watchOrderStatus(widget.orderId, widget.token).listen(
+      (s) {
+        if (!mounted) return;
+        setState(() { _status = s; _loading = false; });
+      },
+      onError: (_) => _reconnect(),
+      onDone: _reconnect,
+      cancelOnError: true,
+    );
+  }
+
+  // Stream dropped: show the latest status and try again shortly
+  void _reconnect() {
+    if (!mounted || _isDelivered) return;
+    _fetchStatus();
+    _timer?.cancel();
+    _timer = Timer(const Duration(seconds: 10), _listen);
+  }
+
   Future<void> _fetchStatus() async {
     final s = await ApiService.getOrderStatus(widget.orderId, widget.token);
     if (!mounted) return;
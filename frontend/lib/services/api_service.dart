@@ -9,6 +9,26 @@ class ApiService {
   static const String productBase  = 'http://$_host:8002';
   static const String cartBase     = 'http://$_host:8003';
   static const String deliveryBase = 'http://$_host:8004';
+  static const String bffBase      = 'http://$_host:8005';
+
+  // ETag and body of the last 200 per URL, replayed when the server says 304
+  static final Map<String, ({String etag, String body})> _etagCache = {};
+
+  /// GET with If-None-Match. Returns the body of a 200, the remembered body
+  /// on 304 (nothing changed, nothing downloaded), or null otherwise.
+  static Future<String?> _getCached(Uri uri, {Map<String, String>? headers}) async {
+    final key = uri.toString();
+    final cached = _etagCache[key];
+    final res = await http.get(uri, headers: {
+      ...?headers,
+      if (cached != null) 'If-None-Match': cached.etag,
+    });
+    if (res.statusCode == 304 && cached != null) return cached.body;
+    if (res.statusCode != 200) return null;
+    final etag = res.headers['etag'];
+    if (etag != null) _etagCache[key] = (etag: etag, body: res.body);
+    return res.body;
+  }
 
   // ─────────────────────────────── USER ────────────────────────────────
 
@@ -49,18 +69,17 @@ class ApiService {
 
   static Future<List<dynamic>> getCategories() async {
     try {
-      final res = await http.get(Uri.parse('$productBase/categories'));
-      if (res.statusCode == 200) return jsonDecode(res.body) as List<dynamic>;
+      final body = await _getCached(Uri.parse('$productBase/categories'));
+      if (body != null) return jsonDecode(body) as List<dynamic>;
     } catch (_) {}
     return [];
   }
 
   static Future<List<dynamic>> getProducts({String? category}) async {
     try {
-      final uri = Uri.parse('$productBase/products');
-      final res = await http.get(uri);
-      if (res.statusCode == 200) {
-        final all = jsonDecode(res.body) as List<dynamic>;
+      final body = await _getCached(Uri.parse('$productBase/products'));
+      if (body != null) {
+        final all = jsonDecode(body) as List<dynamic>;
         if (category != null && category != 'All') {
           return all
               .where((p) => p['category'] == category)
@@ -72,17 +91,50 @@ class ApiService {
     return [];
   }
 
-  static Future<Map<String, dynamic>> getProduct(String productId) async {
+  /// One page of the catalog; pass the previous page's `next_after`.
+  static Future<Map<String, dynamic>?> getProductPage(
+      {String? after, int limit = 50}) async {
     try {
-      final res =
-          await http.get(Uri.parse('$productBase/products/$productId'));
+      final res = await http.get(Uri.parse('$productBase/products').replace(
+        queryParameters: {'limit': '$limit', if (after != null) 'after': after},
+      ));
       if (res.statusCode == 200) {
         return jsonDecode(res.body) as Map<String, dynamic>;
       }
     } catch (_) {}
+    return null;
+  }
+
+  static Future<Map<String, dynamic>> getProduct(String productId) async {
+    try {
+      final body =
+          await _getCached(Uri.parse('$productBase/products/$productId'));
+      if (body != null) {
+        return jsonDecode(body) as Map<String, dynamic>;
+      }
+    } catch (_) {}
     return {};
   }
 
+  // ─────────────────────────────── HOME ────────────────────────────────
+
+  /// GET /home/{user_id} on the BFF: categories, the first product page,
+  /// the cart and active deliveries in one round trip. Sections the server
+  /// could not load are null. Returns null if the BFF is unreachable.
+  static Future<Map<String, dynamic>?> getHome(String userId, String token,
+      {int limit = 50}) async {
+    try {
+      final res = await http.get(
+        Uri.parse('$bffBase/home/$userId?limit=$limit'),
+        headers: {'Authorization': 'Bearer $token'},
+      );
+      if (res.statusCode == 200) {
+        return jsonDecode(res.body) as Map<String, dynamic>;
+      }
+    } catch (_) {}
+    return null;
+  }
+
   // ─────────────────────────────── CART ────────────────────────────────
 
   static Future<bool> addToCart(
@@ -109,12 +161,12 @@ class ApiService {
   /// GET /cart/{user_id}
   static Future<List<dynamic>> getCart(String userId, String token) async {
     try {
-      final res = await http.get(
+      final body = await _getCached(
         Uri.parse('$cartBase/cart/$userId'),   // ← fixed URL
         headers: {'Authorization': 'Bearer $token'},
       );
-      if (res.statusCode == 200) {
-        final data = jsonDecode(res.body) as Map<String, dynamic>;
+      if (body != null) {
+        final data = jsonDecode(body) as Map<String, dynamic>;
         return data["items"] as List<dynamic>? ?? [];
       }
     } catch (_) {}
@@ -187,4 +239,29 @@ class ApiService {
     } catch (_) {}
     return 'UNKNOWN';
   }
+
+  /// GET /delivery/{order_id}/events  — server-sent status updates.
+  /// Yields the current status, then each change; ends when the server
+  /// closes the stream (after DELIVERED) or the connection drops.
+  static Stream<String> watchOrderStatus(String orderId, String token) async* {
+    final client = http.Client();
+    try {
+      final req = http.Request(
+        'GET', Uri.parse('$deliveryBase/delivery/$orderId/events'))
+        ..headers['Authorization'] = 'Bearer $token'
+        ..headers['Accept'] = 'text/event-stream';
+      final res = await client.send(req);
+      if (res.statusCode != 200) return;
+      final lines = res.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter());
+      await for (final line in lines) {
+        if (!line.startsWith('data:')) continue;
+        final status = jsonDecode(line.substring(5))['status'] as String?;
+        if (status != null) yield status;
+      }
+    } finally {
+      client.close();
+    }
+  }
 }
\ No newline at end of file